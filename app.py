@@ -28,6 +28,14 @@ from resources.company_resource import (
     SocieteHistoriqueRessource,
     SocietesPopulairesRessource
 )
+from commands import register_commands
+from repositories.indexes import assurer_index
+from services.upstream import statistiques_amont
+from services.single_flight import vols_amont
+from repositories.cache import cache_documents
+from services.scheduler import planificateur
+from resources.compression import compression
+from resources.representations import output_json
 
 
 import os
@@ -46,8 +54,26 @@ app.secret_key = app.config['JWT_SECRET_KEY']
 
 # Initialiser les extensions
 api = Api(app)
+api.representations['application/json'] = output_json
 jwt = JWTManager(app)
-CORS(app)
+# En-têtes de pagination lisibles par les clients navigateur
+CORS(app, expose_headers=["Link", "X-Next-Cursor", "X-Total-Count"])
+register_commands(app)
+
+# Compression gzip/brotli négociée des réponses JSON volumineuses
+if app.config['COMPRESSION_ENABLED']:
+    compression.init_app(app)
+
+# Créer les index MongoDB au démarrage (idempotent)
+if app.config['MONGODB_AUTO_INDEX']:
+    try:
+        assurer_index()
+    except Exception as err:
+        app.logger.error("Création automatique des index impossible : %s", err)
+
+# Rafraîchissement planifié dans le processus (sinon : flask rafraichir)
+if app.config['REFRESH_SCHEDULER_ENABLED']:
+    planificateur.demarrer()
 
 @jwt.unauthorized_loader
 def unauthorized_callback(reason):
@@ -103,6 +129,16 @@ app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 def health():
     return jsonify({"status": "ok"})
 
+# Compteurs internes (latences et erreurs des fournisseurs externes)
+@app.route('/metriques')
+def metriques():
+    return jsonify({
+        "amont": statistiques_amont(),
+        "vols_regroupes": vols_amont.statistiques(),
+        "cache": cache_documents.statistiques(),
+        "compression": compression.statistiques()
+    })
+
 @app.route('/')
 def startApp():
     return (
@@ -0,0 +1,77 @@
+"""
+Compare l'encodeur JSON standard (Flask-RESTful par défaut) et l'encodeur rapide
+sur des réponses représentatives des endpoints d'historique.
+
+    python benchmarks/bench_json.py
+"""
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.currency import Devise
+from models.stock import Action
+from models.company import Societe
+from schemas.currency import DeviseSchema
+from schemas.stock import ActionSchema
+from schemas.company import SocieteSchema
+from resources.representations import encoder_json_standard, encoder_json_rapide, orjson
+
+REPETITIONS = 20
+
+
+def _dates(n):
+    return [f"2024-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}" for i in range(n)]
+
+
+def charges_representatives():
+    """
+    Un an de devises (≈160 taux chacune), un an d'actions et 30 instantanés de société.
+    """
+    codes = [f"C{i:02d}" for i in range(160)]
+    devises = [
+        Devise(nom="EUR", taux=1.0, date_maj=d, base_code="EUR",
+               conversion_rates={c: random.uniform(0.01, 500) for c in codes}, _id=f"d{i}")
+        for i, d in enumerate(_dates(365))
+    ]
+    actions = [
+        Action(symbole="AAPL", date=d, open=random.uniform(100, 200), high=random.uniform(100, 200),
+               low=random.uniform(100, 200), close=random.uniform(100, 200),
+               volume=random.randint(10 ** 6, 10 ** 8), _id=f"a{i}")
+        for i, d in enumerate(_dates(365))
+    ]
+    societes = [
+        Societe(symbole="AAPL", date_maj=d, companyName="Apple Inc.", price=190.5, marketCap=2.9e12,
+                beta=1.2, volume=50_000_000, currency="USD", description="Apple Inc. " * 120,
+                ceo="Tim Cook", sector="Technology", country="US", _id=f"s{i}")
+        for i, d in enumerate(_dates(30))
+    ]
+    return {
+        "devises (365)": DeviseSchema().dump(devises, many=True),
+        "actions (365)": ActionSchema().dump(actions, many=True),
+        "societes (30)": SocieteSchema().dump(societes, many=True),
+    }
+
+
+def main():
+    encodeurs = {"json (Flask-RESTful)": lambda data: json.dumps(data) + "\n",
+                 "json standard (NaN -> null)": encoder_json_standard}
+    if orjson is not None:
+        encodeurs["orjson"] = encoder_json_rapide
+    else:
+        print("orjson non installé : seul l'encodeur standard est mesuré")
+
+    for nom_charge, charge in charges_representatives().items():
+        reference = json.loads(encoder_json_standard(charge))
+        print(f"\n{nom_charge}")
+        for nom_encodeur, encodeur in encodeurs.items():
+            assert json.loads(encodeur(charge)) == reference
+            duree = timeit.timeit(lambda: encodeur(charge), number=REPETITIONS) / REPETITIONS
+            print(f"  {nom_encodeur:<30} {duree * 1000:8.2f} ms  {len(encodeur(charge)):>10} octets")
+
+
+if __name__ == "__main__":
+    main()
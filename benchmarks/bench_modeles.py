@@ -0,0 +1,91 @@
+"""
+Mémoire et débit du chargement d'un historique de 10 000 documents :
+modèles à __slots__ (from_dict généré) contre des objets équivalents à __dict__ par instance.
+
+    python benchmarks/bench_modeles.py
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bson import ObjectId
+from models.currency import Devise
+from models.stock import Action
+from models.company import Societe
+
+N = 10_000
+
+
+class ObjetADict:
+    """
+    Représentation précédente des modèles : un __dict__ par instance.
+    """
+
+
+def charger_avec_dict(cls, docs):
+    champs = [c for c in cls.__slots__ if c != "id"]
+    objets = []
+    for doc in docs:
+        obj = ObjetADict()
+        obj.id = str(doc["_id"]) if doc.get("_id") else None
+        for champ in champs:
+            setattr(obj, champ, doc.get(champ))
+        objets.append(obj)
+    return objets
+
+
+def charger_avec_slots(cls, docs):
+    return [cls.from_dict(doc) for doc in docs]
+
+
+def documents():
+    codes = [f"C{i:02d}" for i in range(160)]
+    dates = [f"20{10 + i // 336:02d}-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}" for i in range(N)]
+    return {
+        "Action": (Action, [
+            {"_id": ObjectId(), "symbole": "AAPL", "date": d, "open": random.uniform(100, 200),
+             "high": random.uniform(100, 200), "low": random.uniform(100, 200),
+             "close": random.uniform(100, 200), "volume": random.randint(10 ** 6, 10 ** 8)}
+            for d in dates
+        ]),
+        "Devise": (Devise, [
+            {"_id": ObjectId(), "nom": "EUR", "taux": 1.0, "date_maj": d, "base_code": "EUR",
+             "conversion_rates": dict.fromkeys(codes, 1.5)}
+            for d in dates
+        ]),
+        "Societe": (Societe, [
+            {"_id": ObjectId(), "symbole": "AAPL", "date_maj": d, "companyName": "Apple Inc.",
+             "price": 190.5, "marketCap": 2.9e12, "description": "Apple Inc. designs...", "isEtf": False}
+            for d in dates
+        ]),
+    }
+
+
+def mesurer(chargeur, cls, docs):
+    gc.collect()
+    tracemalloc.start()
+    debut = time.perf_counter()
+    objets = chargeur(cls, docs)
+    duree = time.perf_counter() - debut
+    memoire, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objets
+    return duree, memoire
+
+
+def main():
+    for nom, (cls, docs) in documents().items():
+        print(f"\n{nom} ({N} documents)")
+        for libelle, chargeur in (("__dict__", charger_avec_dict), ("__slots__", charger_avec_slots)):
+            duree, memoire = mesurer(chargeur, cls, docs)
+            print(f"  {libelle:<10} {duree * 1000:8.1f} ms  {memoire / 1024 / 1024:7.2f} Mo retenus "
+                  f"({memoire / N:.0f} o/document)")
+
+
+if __name__ == "__main__":
+    main()
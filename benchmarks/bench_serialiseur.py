@@ -0,0 +1,65 @@
+"""
+Compare schema.dump (marshmallow) et le sérialiseur compilé sur des historiques représentatifs.
+
+    python benchmarks/bench_serialiseur.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.currency import Devise
+from models.stock import Action
+from models.company import Societe
+from models.user import Utilisateur
+from schemas.currency import DeviseSchema
+from schemas.stock import ActionSchema
+from schemas.company import SocieteSchema
+from schemas.user import UtilisateurSchema
+from schemas.serialiseur import compiler
+
+REPETITIONS = 20
+
+
+def _dates(n):
+    return [f"2024-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}" for i in range(n)]
+
+
+def charges_representatives():
+    codes = [f"C{i:02d}" for i in range(160)]
+    return {
+        "ActionSchema (365)": (ActionSchema(), [
+            Action("AAPL", d, random.uniform(100, 200), random.uniform(100, 200), random.uniform(100, 200),
+                   random.uniform(100, 200), random.randint(10 ** 6, 10 ** 8), _id=f"a{i}")
+            for i, d in enumerate(_dates(365))
+        ]),
+        "DeviseSchema (365)": (DeviseSchema(), [
+            Devise("EUR", 1.0, d, "EUR", {c: random.uniform(0.01, 500) for c in codes}, _id=f"d{i}")
+            for i, d in enumerate(_dates(365))
+        ]),
+        "SocieteSchema (365)": (SocieteSchema(), [
+            Societe(symbole="AAPL", date_maj=d, companyName="Apple Inc.", price=190.5, marketCap=2.9e12,
+                    beta=1.2, volume=50_000_000, currency="USD", description="Apple Inc. " * 120,
+                    isEtf=False, isActivelyTrading=True, _id=f"s{i}")
+            for i, d in enumerate(_dates(365))
+        ]),
+        "UtilisateurSchema (1000)": (UtilisateurSchema(), [
+            Utilisateur(f"u{i}@mail.com", "secret", f"U{i}", _id=f"u{i}") for i in range(1000)
+        ]),
+    }
+
+
+def main():
+    for nom, (schema, objets) in charges_representatives().items():
+        serialiseur = compiler(schema)
+        assert repr(serialiseur.dump(objets, many=True)) == repr(schema.dump(objets, many=True))
+        marshmallow = timeit.timeit(lambda: schema.dump(objets, many=True), number=REPETITIONS) / REPETITIONS
+        compile_ = timeit.timeit(lambda: serialiseur.dump(objets, many=True), number=REPETITIONS) / REPETITIONS
+        print(f"{nom:<26} marshmallow {marshmallow * 1000:8.2f} ms   compilé {compile_ * 1000:8.2f} ms"
+              f"   x{marshmallow / compile_:.1f}")
+
+
+if __name__ == "__main__":
+    main()
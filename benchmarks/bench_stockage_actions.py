@@ -0,0 +1,84 @@
+"""
+Stockage des actions : un document par jour ("documents") contre un document par symbole et par mois ("mensuel").
+Mesure la taille des collections et la latence de lecture d'un historique d'un an.
+Nécessite MONGODB_URI ; les données sont écrites dans une base temporaire supprimée à la fin.
+
+    python benchmarks/bench_stockage_actions.py
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bson import ObjectId
+from repositories.database import get_client
+from repositories.indexes import INDEX
+from repositories.stock_storage import stockage_actions
+from models.stock import Action
+
+SYMBOLES = [f"S{i:03d}" for i in range(20)]
+ANNEES = 5
+REPETITIONS = 50
+BASE = "bench_stockage_actions"
+
+
+def barres():
+    jours = [date(2020, 1, 1) + timedelta(days=i) for i in range(365 * ANNEES)]
+    jours = [j.isoformat() for j in jours if j.weekday() < 5]
+    return [
+        {"_id": ObjectId(), "symbole": symbole, "date": jour, "open": random.uniform(100, 200),
+         "high": random.uniform(100, 200), "low": random.uniform(100, 200),
+         "close": random.uniform(100, 200), "volume": random.randint(10 ** 6, 10 ** 8)}
+        for symbole in SYMBOLES for jour in jours
+    ]
+
+
+def taille(db, nom):
+    stats = db.command("collStats", nom)
+    return stats["size"], stats["storageSize"], stats["totalIndexSize"]
+
+
+def lecture_un_an(stockage):
+    durees = []
+    for _ in range(REPETITIONS):
+        symbole = random.choice(SYMBOLES)
+        debut = time.perf_counter()
+        actions = [Action.from_dict(doc) for doc in stockage.iterer_periode(symbole, "2023-01-01", "2023-12-31")]
+        durees.append(time.perf_counter() - debut)
+    return len(actions), statistics.median(durees), max(durees)
+
+
+def main():
+    client = get_client()
+    client.drop_database(BASE)
+    db = client[BASE]
+    for nom_collection, cles, unique in INDEX:
+        if nom_collection.startswith("actions"):
+            db[nom_collection].create_index(cles, unique=unique)
+    donnees = barres()
+    print(f"{len(donnees)} barres ({len(SYMBOLES)} symboles, {ANNEES} ans)")
+    try:
+        for mode in ("documents", "mensuel"):
+            stockage = stockage_actions(db, mode)
+            debut = time.perf_counter()
+            for i in range(0, len(donnees), 1000):
+                stockage.inserer_plusieurs([dict(d) for d in donnees[i:i + 1000]])
+            ecriture = time.perf_counter() - debut
+            donnees_octets, stockage_octets, index_octets = taille(db, stockage.collection.name)
+            nombre, mediane, pire = lecture_un_an(stockage)
+            print(f"\n{mode}")
+            print(f"  documents   {stockage.collection.estimated_document_count():>10}")
+            print(f"  données     {donnees_octets / 1024 / 1024:10.2f} Mo  "
+                  f"(stockage {stockage_octets / 1024 / 1024:.2f} Mo, index {index_octets / 1024 / 1024:.2f} Mo)")
+            print(f"  écriture    {ecriture:10.2f} s")
+            print(f"  lecture 1 an ({nombre} barres) : médiane {mediane * 1000:.2f} ms, pire {pire * 1000:.2f} ms")
+    finally:
+        client.drop_database(BASE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import json
+import click
+from repositories.indexes import assurer_index
+from services.scheduler import planificateur
+
+
+def register_commands(app):
+    """
+    Enregistre les commandes CLI de maintenance (flask <commande>).
+    """
+
+    @app.cli.command("init-index")
+    @click.option("--corriger-doublons", is_flag=True,
+                  help="Supprime les doublons (garde le plus ancien) avant de créer les index uniques.")
+    def init_index(corriger_doublons):
+        """Crée les index MongoDB et signale les doublons bloquants."""
+        rapport = assurer_index(corriger_doublons=corriger_doublons)
+        click.echo(json.dumps(rapport, indent=2, ensure_ascii=False, default=str))
+        if any(entree["statut"] != "ok" for entree in rapport):
+            raise SystemExit(1)
+
+    @app.cli.command("rafraichir")
+    @click.option("--une-fois", is_flag=True, help="Effectue un seul rafraîchissement puis quitte (cron).")
+    def rafraichir(une_fois):
+        """Rafraîchit les listes populaires et les favoris selon le planning (ou une seule fois)."""
+        if une_fois:
+            rapport = planificateur.executer_une_fois()
+            click.echo(json.dumps(rapport, indent=2, ensure_ascii=False))
+            return
+        try:
+            planificateur.boucle()
+        except KeyboardInterrupt:
+            planificateur.arreter()
+
+    @app.cli.command("migrer-profils-societes")
+    @click.option("--taille-lot", default=500, show_default=True, help="Documents convertis par écriture groupée.")
+    def migrer_profils_societes(taille_lot):
+        """Sépare les sociétés de l'ancien format en profils partagés et cotations quotidiennes."""
+        from repositories.company_repository import SocieteRepository
+        convertis = SocieteRepository().migrer_profils(taille_lot=taille_lot)
+        click.echo(json.dumps({"convertis": convertis}, ensure_ascii=False))
+
+    @app.cli.command("migrer-actions")
+    @click.option("--vers", "destination", type=click.Choice(["mensuel", "documents"]), required=True,
+                  help="Stockage de destination des barres quotidiennes.")
+    @click.option("--taille-lot", default=500, show_default=True, help="Barres copiées par écriture groupée.")
+    def migrer_actions(destination, taille_lot):
+        """Copie les actions vers l'autre stockage (à activer ensuite avec STOCK_STORAGE_MODE)."""
+        from repositories.database import get_db
+        from repositories.stock_storage import migrer_stockage, stockage_actions
+        source = "documents" if destination == "mensuel" else "mensuel"
+        rapport = migrer_stockage(
+            stockage_actions(get_db(), source), stockage_actions(get_db(), destination), taille_lot=taille_lot
+        )
+        click.echo(json.dumps(rapport, ensure_ascii=False))
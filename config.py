@@ -5,6 +5,9 @@ from datetime import timedelta
 class Config:
     MONGODB_URI = os.getenv("MONGODB_URI")
     MONGODB_DBNAME = os.getenv("MONGODB_DBNAME")
+    MONGODB_AUTO_INDEX = os.getenv("MONGODB_AUTO_INDEX", "true").lower() == "true"
+    REFRESH_SCHEDULER_ENABLED = os.getenv("REFRESH_SCHEDULER_ENABLED", "false").lower() == "true"
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
     JWT_SECRET_KEY = os.getenv("JWT_SECRET")
     SWAGGER_URL = "/swagger"
     API_URL = "/static/swagger.json"
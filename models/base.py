@@ -0,0 +1,46 @@
+class ModeleCompact:
+    """
+    Base des modèles MongoDB : attributs déclarés dans __slots__ (pas de __dict__ par instance)
+    et to_dict/from_dict générés une fois par classe à partir de __slots__.
+    Chaque attribut est stocké sous la clé MongoDB de même nom ; "id" correspond à "_id".
+    """
+    __slots__ = ()
+
+    # Valeurs par défaut de from_dict quand la clé est absente : {clé: fabrique}
+    DEFAUTS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        champs = [champ for champ in cls.__slots__ if champ != "id"]
+        cls.to_dict = _generer_to_dict(cls, champs)
+        cls.from_dict = staticmethod(_generer_from_dict(cls, champs))
+
+
+def _compiler(nom, lignes, contexte):
+    exec("\n".join(lignes), contexte)
+    return contexte[nom]
+
+
+def _generer_to_dict(cls, champs):
+    lignes = ["def to_dict(self):", "    data = {"]
+    lignes += [f"        {champ!r}: self.{champ}," for champ in champs]
+    lignes += ["    }", "    if self.id:", "        data['_id'] = self.id", "    return data"]
+    to_dict = _compiler("to_dict", lignes, {})
+    to_dict.__doc__ = f"Convertit l'objet {cls.__name__} en dictionnaire pour MongoDB."
+    return to_dict
+
+
+def _generer_from_dict(cls, champs):
+    contexte = {"_nouveau": cls.__new__, "_cls": cls}
+    lignes = ["def from_dict(data):", "    obj = _nouveau(_cls)", "    get = data.get",
+              "    _id = get('_id')", "    obj.id = str(_id) if _id else None"]
+    for champ in champs:
+        if champ in cls.DEFAUTS:
+            contexte[f"_defaut_{champ}"] = cls.DEFAUTS[champ]
+            lignes.append(f"    obj.{champ} = data[{champ!r}] if {champ!r} in data else _defaut_{champ}()")
+        else:
+            lignes.append(f"    obj.{champ} = get({champ!r})")
+    lignes.append("    return obj")
+    from_dict = _compiler("from_dict", lignes, contexte)
+    from_dict.__doc__ = f"Crée un objet {cls.__name__} à partir d'un dictionnaire MongoDB."
+    return from_dict
@@ -1,10 +1,17 @@
-from typing import Dict, Any
+from models.base import ModeleCompact
 
-class Societe:
+class Societe(ModeleCompact):
     """
     Modèle de société pour la base de données MongoDB.
     Représente les informations détaillées d'une société cotée en bourse.
     """
+    __slots__ = (
+        "id", "symbole", "date_maj", "companyName", "price", "marketCap", "beta", "lastDividend",
+        "range", "change", "changePercentage", "volume", "averageVolume", "currency", "cik", "isin",
+        "cusip", "exchangeFullName", "exchange", "industry", "website", "description", "ceo", "sector",
+        "country", "fullTimeEmployees", "phone", "address", "city", "state", "zip", "image", "ipoDate",
+        "defaultImage", "isEtf", "isActivelyTrading", "isAdr", "isFund"
+    )
 
     def __init__(
         self,
@@ -85,96 +92,3 @@ class Societe:
         self.isActivelyTrading = isActivelyTrading
         self.isAdr = isAdr
         self.isFund = isFund
-
-    def to_dict(self) -> Dict[str, Any]:
-        """
-        Convertit l'objet Societe en dictionnaire pour MongoDB.
-        """
-        data = {
-            "symbole": self.symbole,
-            "date_maj": self.date_maj,
-            "companyName": self.companyName,
-            "price": self.price,
-            "marketCap": self.marketCap,
-            "beta": self.beta,
-            "lastDividend": self.lastDividend,
-            "range": self.range,
-            "change": self.change,
-            "changePercentage": self.changePercentage,
-            "volume": self.volume,
-            "averageVolume": self.averageVolume,
-            "currency": self.currency,
-            "cik": self.cik,
-            "isin": self.isin,
-            "cusip": self.cusip,
-            "exchangeFullName": self.exchangeFullName,
-            "exchange": self.exchange,
-            "industry": self.industry,
-            "website": self.website,
-            "description": self.description,
-            "ceo": self.ceo,
-            "sector": self.sector,
-            "country": self.country,
-            "fullTimeEmployees": self.fullTimeEmployees,
-            "phone": self.phone,
-            "address": self.address,
-            "city": self.city,
-            "state": self.state,
-            "zip": self.zip,
-            "image": self.image,
-            "ipoDate": self.ipoDate,
-            "defaultImage": self.defaultImage,
-            "isEtf": self.isEtf,
-            "isActivelyTrading": self.isActivelyTrading,
-            "isAdr": self.isAdr,
-            "isFund": self.isFund
-        }
-        if self.id:
-            data["_id"] = self.id
-        return data
-
-    @staticmethod
-    def from_dict(data: Dict[str, Any]) -> "Societe":
-        """
-        Crée un objet Societe à partir d'un dictionnaire MongoDB.
-        """
-        return Societe(
-            symbole=data.get("symbole"),
-            date_maj=data.get("date_maj"),
-            companyName=data.get("companyName"),
-            price=data.get("price"),
-            marketCap=data.get("marketCap"),
-            beta=data.get("beta"),
-            lastDividend=data.get("lastDividend"),
-            range_=data.get("range"),
-            change=data.get("change"),
-            changePercentage=data.get("changePercentage"),
-            volume=data.get("volume"),
-            averageVolume=data.get("averageVolume"),
-            currency=data.get("currency"),
-            cik=data.get("cik"),
-            isin=data.get("isin"),
-            cusip=data.get("cusip"),
-            exchangeFullName=data.get("exchangeFullName"),
-            exchange=data.get("exchange"),
-            industry=data.get("industry"),
-            website=data.get("website"),
-            description=data.get("description"),
-            ceo=data.get("ceo"),
-            sector=data.get("sector"),
-            country=data.get("country"),
-            fullTimeEmployees=data.get("fullTimeEmployees"),
-            phone=data.get("phone"),
-            address=data.get("address"),
-            city=data.get("city"),
-            state=data.get("state"),
-            zip_=data.get("zip"),
-            image=data.get("image"),
-            ipoDate=data.get("ipoDate"),
-            defaultImage=data.get("defaultImage"),
-            isEtf=data.get("isEtf"),
-            isActivelyTrading=data.get("isActivelyTrading"),
-            isAdr=data.get("isAdr"),
-            isFund=data.get("isFund"),
-            _id=data.get("_id")
-        )
\ No newline at end of file
@@ -1,7 +1,11 @@
-class Action:
+from models.base import ModeleCompact
+
+class Action(ModeleCompact):
     """
     Modèle d'action d'une société pour MongoDB.
     """
+    __slots__ = ("id", "symbole", "date", "open", "high", "low", "close", "volume")
+
     def __init__(self, symbole, date, open, high, low, close, volume, _id=None):
         self.id = str(_id) if _id else None
         self.symbole = symbole  # Symbole de l'action, ex: "AAPL"
@@ -11,36 +15,3 @@ class Action:
         self.low = low          # Prix le plus bas
         self.close = close      # Prix de clôture
         self.volume = volume    # Volume échangé
-
-    def to_dict(self):
-        """
-        Convertit l'objet Action en dictionnaire pour MongoDB.
-        """
-        data = {
-            "symbole": self.symbole,
-            "date": self.date,
-            "open": self.open,
-            "high": self.high,
-            "low": self.low,
-            "close": self.close,
-            "volume": self.volume
-        }
-        if self.id:
-            data["_id"] = self.id
-        return data
-
-    @staticmethod
-    def from_dict(data):
-        """
-        Crée un objet Action à partir d'un dictionnaire MongoDB.
-        """
-        return Action(
-            symbole=data.get("symbole"),
-            date=data.get("date"),
-            open=data.get("open"),
-            high=data.get("high"),
-            low=data.get("low"),
-            close=data.get("close"),
-            volume=data.get("volume"),
-            _id=data.get("_id")
-        )
\ No newline at end of file
@@ -0,0 +1,305 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from repositories.cache_l2 import CacheL2Memoire, CacheL2Redis
+
+logger = logging.getLogger(__name__)
+
+
+def estimer_taille(objet):
+    """
+    Estime la taille mémoire (en octets) d'un document : dictionnaires, listes et scalaires.
+    """
+    taille = sys.getsizeof(objet)
+    if isinstance(objet, dict):
+        for cle, valeur in objet.items():
+            taille += estimer_taille(cle) + estimer_taille(valeur)
+    elif isinstance(objet, (list, tuple)):
+        for valeur in objet:
+            taille += estimer_taille(valeur)
+    return taille
+
+
+class CacheLRU:
+    """
+    Cache mémoire borné en nombre d'entrées et en octets, avec expiration (TTL).
+    Les entrées les moins récemment utilisées sont évincées en premier.
+    """
+
+    def __init__(self, max_entrees=2048, max_octets=64 * 1024 * 1024, ttl_secondes=300, horloge=time.monotonic):
+        self.max_entrees = max_entrees
+        self.max_octets = max_octets
+        self.ttl_secondes = ttl_secondes
+        self._horloge = horloge
+        self._verrou = threading.Lock()
+        # cle -> (document, expire_a, taille)
+        self._entrees = OrderedDict()
+        self._octets = 0
+        self._compteurs = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def obtenir(self, cle):
+        """
+        Retourne le document en cache pour la clé, ou None (absent ou expiré).
+        """
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                self._compteurs["misses"] += 1
+                return None
+            document, expire_a, _ = entree
+            if expire_a <= self._horloge():
+                self._retirer(cle)
+                self._compteurs["expirations"] += 1
+                self._compteurs["misses"] += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self._compteurs["hits"] += 1
+            return document
+
+    def stocker(self, cle, document, ttl_secondes=None):
+        """
+        Ajoute ou remplace le document pour la clé, puis évince si les limites sont dépassées.
+        """
+        taille = estimer_taille(document)
+        if taille > self.max_octets:
+            return
+        ttl = self.ttl_secondes if ttl_secondes is None else ttl_secondes
+        with self._verrou:
+            if cle in self._entrees:
+                self._retirer(cle)
+            self._entrees[cle] = (document, self._horloge() + ttl, taille)
+            self._octets += taille
+            while len(self._entrees) > self.max_entrees or self._octets > self.max_octets:
+                ancienne = next(iter(self._entrees))
+                self._retirer(ancienne)
+                self._compteurs["evictions"] += 1
+
+    def invalider(self, cle):
+        """
+        Retire la clé du cache (après une écriture en base).
+        """
+        with self._verrou:
+            if cle in self._entrees:
+                self._retirer(cle)
+                self._compteurs["invalidations"] += 1
+
+    def obtenir_ou_charger(self, cle, chargeur):
+        """
+        Lecture traversante : retourne le document en cache, sinon le charge, le met en cache et le retourne.
+        """
+        document = self.obtenir(cle)
+        if document is None:
+            document = chargeur()
+            if document:
+                document = document_cachable(document)
+                self.stocker(cle, document)
+        return document
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+            self._octets = 0
+
+    def _retirer(self, cle):
+        _, _, taille = self._entrees.pop(cle)
+        self._octets -= taille
+
+    def statistiques(self):
+        with self._verrou:
+            stats = dict(self._compteurs)
+            stats["entrees"] = len(self._entrees)
+            stats["octets"] = self._octets
+        stats["max_entrees"] = self.max_entrees
+        stats["max_octets"] = self.max_octets
+        return stats
+
+    def reinitialiser_verrou(self):
+        # Le verrou hérité d'un fork peut être dans un état verrouillé
+        self._verrou = threading.Lock()
+
+
+def document_cachable(doc):
+    """
+    Copie un document MongoDB en remplaçant son ObjectId par une chaîne.
+    """
+    doc = dict(doc)
+    if "_id" in doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+
+class CacheDeuxNiveaux:
+    """
+    Cache à deux niveaux : L1 en mémoire du processus, L2 partagé entre les workers.
+    Lecture : L1, puis L2 (qui réalimente L1), puis le chargeur (MongoDB).
+    Écriture : L1 et L2 (write-through). Si le L2 est indisponible, il est ignoré
+    pendant pause_secondes et les lectures retombent sur MongoDB. Les invalidations
+    échouées sont rejouées avant tout nouvel accès au L2, pour qu'il ne serve pas un document périmé.
+    """
+
+    def __init__(self, l1, l2, ttl_par_espace=None, ttl_defaut=3600, prefixe="webcur:",
+                 pause_secondes=30, horloge=time.monotonic):
+        self.l1 = l1
+        self.l2 = l2
+        self.ttl_par_espace = ttl_par_espace or {}
+        self.ttl_defaut = ttl_defaut
+        self.prefixe = prefixe
+        self.pause_secondes = pause_secondes
+        self._horloge = horloge
+        self._indisponible_jusqua = 0.0
+        self._verrou = threading.Lock()
+        self._compteurs = {"hits": 0, "misses": 0, "erreurs": 0, "ignores": 0}
+        self._suppressions_en_attente = set()
+
+    def _cle_l2(self, cle):
+        return self.prefixe + ":".join(str(partie) for partie in cle)
+
+    def _ttl(self, cle):
+        return self.ttl_par_espace.get(cle[0], self.ttl_defaut)
+
+    def _compter(self, nom):
+        with self._verrou:
+            self._compteurs[nom] += 1
+
+    def _l2_disponible(self):
+        if self._horloge() < self._indisponible_jusqua:
+            self._compter("ignores")
+            return False
+        return self._rejouer_suppressions()
+
+    def _rejouer_suppressions(self):
+        # Retourne False si le L2 est toujours en panne (les suppressions restent en attente)
+        if not self._suppressions_en_attente:
+            return True
+        with self._verrou:
+            cles = list(self._suppressions_en_attente)
+        for cle_l2 in cles:
+            try:
+                self.l2.delete(cle_l2)
+            except Exception as err:
+                self._echec_l2(err)
+                return False
+            with self._verrou:
+                self._suppressions_en_attente.discard(cle_l2)
+        return True
+
+    def _echec_l2(self, err):
+        self._compter("erreurs")
+        self._indisponible_jusqua = self._horloge() + self.pause_secondes
+        logger.warning("Cache L2 indisponible, repli sur MongoDB pendant %ss : %s", self.pause_secondes, err)
+
+    def obtenir(self, cle):
+        document = self.l1.obtenir(cle)
+        if document is not None or not self._l2_disponible():
+            return document
+        try:
+            brut = self.l2.get(self._cle_l2(cle))
+        except Exception as err:
+            self._echec_l2(err)
+            return None
+        if brut is None:
+            self._compter("misses")
+            return None
+        self._compter("hits")
+        document = json.loads(brut)
+        self.l1.stocker(cle, document)
+        return document
+
+    def stocker(self, cle, document):
+        self.l1.stocker(cle, document)
+        if not self._l2_disponible():
+            return
+        try:
+            self.l2.set(self._cle_l2(cle), json.dumps(document), ex=int(self._ttl(cle)))
+        except Exception as err:
+            self._echec_l2(err)
+
+    def invalider(self, cle):
+        self.l1.invalider(cle)
+        cle_l2 = self._cle_l2(cle)
+        # Tentée même pendant la pause ; en cas d'échec, rejouée quand le L2 revient
+        try:
+            self.l2.delete(cle_l2)
+        except Exception as err:
+            with self._verrou:
+                self._suppressions_en_attente.add(cle_l2)
+            self._echec_l2(err)
+
+    def obtenir_ou_charger(self, cle, chargeur):
+        """
+        Lecture traversante : retourne le document en cache, sinon le charge, le met en cache et le retourne.
+        """
+        document = self.obtenir(cle)
+        if document is None:
+            document = chargeur()
+            if document:
+                document = document_cachable(document)
+                self.stocker(cle, document)
+        return document
+
+    def vider(self):
+        self.l1.vider()
+
+    def statistiques(self):
+        stats = self.l1.statistiques()
+        with self._verrou:
+            stats["l2"] = dict(self._compteurs)
+            stats["l2"]["suppressions_en_attente"] = len(self._suppressions_en_attente)
+        stats["l2"]["disponible"] = self._horloge() >= self._indisponible_jusqua
+        return stats
+
+    def reinitialiser_verrou(self):
+        self._verrou = threading.Lock()
+        self.l1.reinitialiser_verrou()
+
+
+def construire_cache():
+    """
+    Construit le cache des dépôts à partir des variables d'environnement :
+    L1 seul, ou L1 + L2 si CACHE_L2_BACKEND vaut "redis" ou "memoire".
+    """
+    l1 = CacheLRU(
+        max_entrees=int(os.getenv("CACHE_MAX_ENTRIES", "2048")),
+        max_octets=int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        ttl_secondes=float(os.getenv("CACHE_TTL_SECONDS", "300")),
+    )
+    backend = os.getenv("CACHE_L2_BACKEND", "").lower()
+    if not backend:
+        return l1
+    if backend == "memoire":
+        l2 = CacheL2Memoire()
+    elif backend == "redis":
+        try:
+            l2 = CacheL2Redis(
+                os.getenv("CACHE_L2_URL", "redis://localhost:6379/0"),
+                float(os.getenv("CACHE_L2_SOCKET_TIMEOUT", "0.2"))
+            )
+        except ImportError:
+            logger.error("CACHE_L2_BACKEND=redis mais le paquet redis n'est pas installé : cache L2 désactivé")
+            return l1
+    else:
+        logger.error("CACHE_L2_BACKEND inconnu : %s (cache L2 désactivé)", backend)
+        return l1
+    ttl_defaut = float(os.getenv("CACHE_L2_TTL_SECONDS", "3600"))
+    ttl_par_espace = {
+        espace: float(os.getenv(f"CACHE_L2_TTL_{espace.upper()}", str(ttl_defaut)))
+        for espace in ("devises", "actions", "societes")
+    }
+    return CacheDeuxNiveaux(
+        l1, l2,
+        ttl_par_espace=ttl_par_espace,
+        ttl_defaut=ttl_defaut,
+        prefixe=os.getenv("CACHE_L2_PREFIX", "webcur:"),
+        pause_secondes=float(os.getenv("CACHE_L2_RETRY_SECONDS", "30")),
+    )
+
+
+# Cache partagé par les dépôts, clés de la forme (collection, symbole_ou_nom, date)
+cache_documents = construire_cache()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=cache_documents.reinitialiser_verrou)
@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class CacheL2Memoire:
+    """
+    Backend L2 local (dictionnaire en mémoire) reproduisant le sous-ensemble de Redis utilisé :
+    GET, SET avec expiration (EX) et DEL. Sert de remplaçant pour le développement et les tests.
+    """
+
+    def __init__(self, horloge=time.monotonic):
+        self._horloge = horloge
+        self._verrou = threading.Lock()
+        self._valeurs = {}
+
+    def get(self, cle):
+        with self._verrou:
+            entree = self._valeurs.get(cle)
+            if entree is None:
+                return None
+            valeur, expire_a = entree
+            if expire_a is not None and expire_a <= self._horloge():
+                del self._valeurs[cle]
+                return None
+            return valeur
+
+    def set(self, cle, valeur, ex=None):
+        with self._verrou:
+            self._valeurs[cle] = (valeur, self._horloge() + ex if ex else None)
+
+    def delete(self, cle):
+        with self._verrou:
+            self._valeurs.pop(cle, None)
+
+
+class CacheL2Redis:
+    """
+    Backend L2 Redis (dépendance optionnelle : paquet redis).
+    """
+
+    def __init__(self, url, timeout_secondes=0.2):
+        import redis
+        self.client = redis.Redis.from_url(
+            url, socket_timeout=timeout_secondes, socket_connect_timeout=timeout_secondes
+        )
+
+    def get(self, cle):
+        return self.client.get(cle)
+
+    def set(self, cle, valeur, ex=None):
+        self.client.set(cle, valeur, ex=ex)
+
+    def delete(self, cle):
+        self.client.delete(cle)
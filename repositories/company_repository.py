@@ -1,53 +1,244 @@
-from pymongo import MongoClient
-import os
+import hashlib
+import json
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from repositories.database import get_client, get_db
+from repositories.cache import cache_documents, document_cachable
 from models.company import Societe
 
+# Champs qui évoluent chaque jour : stockés dans la cotation quotidienne (collection "societes")
+CHAMPS_COTATION = (
+    "price", "marketCap", "beta", "lastDividend", "range", "change", "changePercentage", "volume", "averageVolume"
+)
+# Tous les autres champs forment le profil, stocké une fois par version (collection "societes_profils")
+CHAMPS_PROFIL = tuple(
+    champ for champ in Societe.__slots__ if champ not in ("id", "symbole", "date_maj", *CHAMPS_COTATION)
+)
+
+
+def separer(data):
+    """
+    Sépare un document société complet en (profil, cotation).
+    Le profil est identifié par "<symbole>:<empreinte de son contenu>" : un profil inchangé
+    garde le même _id, seule une modification crée une nouvelle version.
+    """
+    contenu = {champ: data.get(champ) for champ in CHAMPS_PROFIL}
+    empreinte = hashlib.blake2b(
+        json.dumps(contenu, sort_keys=True, default=str).encode(), digest_size=10
+    ).hexdigest()
+    profil = {"_id": f"{data['symbole']}:{empreinte}", "symbole": data["symbole"], **contenu}
+    cotation = {
+        "symbole": data["symbole"],
+        "date_maj": data["date_maj"],
+        **{champ: data.get(champ) for champ in CHAMPS_COTATION},
+        "profil": profil["_id"],
+    }
+    if "_id" in data:
+        cotation["_id"] = data["_id"]
+    return profil, cotation
+
+
+def joindre(cotation, profil):
+    """
+    Reconstitue le document complet d'une cotation et de son profil.
+    Une cotation sans champ "profil" (ancien format, non migré) est déjà complète.
+    """
+    doc = dict(cotation)
+    doc.pop("profil", None)
+    if profil:
+        for champ in CHAMPS_PROFIL:
+            if champ in profil:
+                doc[champ] = profil[champ]
+    return doc
+
+
+def projection_champs(champs):
+    """
+    Projection MongoDB des cotations pour les champs demandés (None : document complet). "_id" est toujours lu.
+    Les champs de profil restent projetés pour les documents de l'ancien format ; "profil" est
+    ajouté pour la jointure si au moins un champ de profil est demandé.
+    """
+    if champs is None:
+        return None
+    projection = {champ: 1 for champ in champs if champ != "id"}
+    if any(champ in CHAMPS_PROFIL for champ in champs):
+        projection["profil"] = 1
+    return projection
+
+
+def projection_profils(champs):
+    """
+    Projection des profils pour les champs demandés : None (profil complet), ou False si aucun
+    champ de profil n'est demandé (pas de jointure).
+    """
+    if champs is None:
+        return None
+    projection = {champ: 1 for champ in champs if champ in CHAMPS_PROFIL}
+    return projection or False
+
+
 class SocieteRepository:
     """
     Dépôt pour la gestion des sociétés en base MongoDB.
     """
 
     def __init__(self):
-        uri = os.getenv("MONGODB_URI")
-        dbname = os.getenv("MONGODB_DBNAME")
-        self.client = MongoClient(uri)
-        self.db = self.client[dbname]
+        self.client = get_client()
+        self.db = get_db()
+        # Cotations quotidiennes (une par symbole et date) et versions des profils
         self.collection = self.db["societes"]
+        self.profils = self.db["societes_profils"]
+
+    def _joindre_un(self, cotation, champs=None):
+        projection = projection_profils(champs)
+        if not cotation or "profil" not in cotation or projection is False:
+            return cotation
+        return joindre(cotation, self.profils.find_one({"_id": cotation["profil"]}, projection))
+
+    def _joindre_tous(self, cotations, champs=None):
+        """
+        Joint une liste de cotations à leurs profils (une seule requête pour les profils distincts).
+        """
+        projection = projection_profils(champs)
+        ids = list({c["profil"] for c in cotations if "profil" in c})
+        if not ids or projection is False:
+            return [joindre(c, None) for c in cotations]
+        profils = {p["_id"]: p for p in self.profils.find({"_id": {"$in": ids}}, projection)}
+        return [joindre(c, profils.get(c.get("profil"))) for c in cotations]
+
+    def _enregistrer_profil(self, profil):
+        # Profil déjà connu (même contenu) : rien n'est écrit
+        contenu = {cle: valeur for cle, valeur in profil.items() if cle != "_id"}
+        try:
+            self.profils.update_one({"_id": profil["_id"]}, {"$setOnInsert": contenu}, upsert=True)
+        except DuplicateKeyError:
+            # Upsert concurrent du même profil
+            pass
 
-    def chercher_par_symbole_et_date(self, symbole, date_maj):
+    def chercher_par_symbole_et_date(self, symbole, date_maj, champs=None):
         """
         Cherche une société par son symbole et la date de mise à jour.
+        Avec `champs`, seuls ces champs sont lus si le document complet n'est pas déjà en cache.
         """
-        doc = self.collection.find_one({"symbole": symbole, "date_maj": date_maj})
+        if champs is not None:
+            # Lecture partielle : non mise en cache, le cache ne contient que des documents complets
+            doc = cache_documents.obtenir(("societes", symbole, date_maj)) or self._joindre_un(
+                self.collection.find_one({"symbole": symbole, "date_maj": date_maj}, projection_champs(champs)),
+                champs
+            )
+            return Societe.from_dict(doc) if doc else None
+        doc = cache_documents.obtenir_ou_charger(
+            ("societes", symbole, date_maj),
+            lambda: self._joindre_un(self.collection.find_one({"symbole": symbole, "date_maj": date_maj}))
+        )
         if doc:
             return Societe.from_dict(doc)
         return None
 
+    def chercher_derniere(self, symbole):
+        """
+        Cherche la société la plus récente enregistrée pour ce symbole.
+        """
+        doc = self._joindre_un(self.collection.find_one({"symbole": symbole}, sort=[("date_maj", -1)]))
+        if doc:
+            return Societe.from_dict(doc)
+        return None
+
+    def chercher_date_derniere(self, symbole):
+        """
+        Date (date_maj) de la cotation la plus récente enregistrée pour ce symbole, ou None.
+        """
+        doc = self.collection.find_one({"symbole": symbole}, {"date_maj": 1, "_id": 0}, sort=[("date_maj", -1)])
+        return doc["date_maj"] if doc else None
+
     def creer(self, societe: Societe):
         """
         Ajoute une nouvelle société à la base de données.
         """
         data = societe.to_dict()
-        result = self.collection.insert_one(data)
+        cache_documents.invalider(("societes", societe.symbole, societe.date_maj))
+        profil, cotation = separer(data)
+        self._enregistrer_profil(profil)
+        try:
+            result = self.collection.insert_one(cotation)
+        except DuplicateKeyError:
+            # Déjà insérée par une autre requête : on reprend l'identifiant existant
+            existant = self.collection.find_one({"symbole": societe.symbole, "date_maj": societe.date_maj}, {"_id": 1})
+            societe.id = str(existant["_id"]) if existant else None
+            return societe
         societe.id = str(result.inserted_id)
+        data["_id"] = result.inserted_id
+        # Écriture traversante : le nouveau document est servi par le cache à tous les workers
+        cache_documents.stocker(("societes", societe.symbole, societe.date_maj), document_cachable(data))
         return societe
 
-    def lire_historique_par_symbole(self, symbole, dates):
+    def lire_historique_par_symbole(self, symbole, dates, champs=None):
         """
         Récupère l'historique d'une société pour une liste de dates.
         """
         cursor = self.collection.find({
             "symbole": symbole,
             "date_maj": {"$in": dates}
-        })
-        return [Societe.from_dict(doc) for doc in cursor]
+        }, projection_champs(champs))
+        return [Societe.from_dict(doc) for doc in self._joindre_tous(list(cursor), champs)]
 
-    def lire_historique_sur_periode(self, symbole, date_debut, date_fin):
+    def lire_historique_sur_periode(self, symbole, date_debut, date_fin, champs=None):
         """
         Récupère l'historique d'une société pour une période donnée (dates inclusives).
         """
         cursor = self.collection.find({
             "symbole": symbole,
             "date_maj": {"$gte": date_debut, "$lte": date_fin}
-        }).sort("date_maj", 1)
-        return [Societe.from_dict(doc) for doc in cursor]
\ No newline at end of file
+        }, projection_champs(champs)).sort("date_maj", 1)
+        return [Societe.from_dict(doc) for doc in self._joindre_tous(list(cursor), champs)]
+
+    def iterer_historique_sur_periode(self, symbole, date_debut, date_fin, taille_lot=500, champs=None):
+        """
+        Comme lire_historique_sur_periode, mais parcourt le curseur par lots sans construire de liste.
+        """
+        cursor = self.collection.find({
+            "symbole": symbole,
+            "date_maj": {"$gte": date_debut, "$lte": date_fin}
+        }, projection_champs(champs)).sort("date_maj", 1).batch_size(taille_lot)
+        lot = []
+        for doc in cursor:
+            lot.append(doc)
+            if len(lot) >= taille_lot:
+                yield from (Societe.from_dict(d) for d in self._joindre_tous(lot, champs))
+                lot = []
+        yield from (Societe.from_dict(d) for d in self._joindre_tous(lot, champs))
+
+    def migrer_profils(self, taille_lot=500):
+        """
+        Convertit les sociétés de l'ancien format (profil complet copié chaque jour) en
+        cotation + profil partagé. Idempotent ; retourne le nombre de documents convertis.
+        """
+        convertis = 0
+        lot = []
+        for doc in self.collection.find({"profil": {"$exists": False}}).batch_size(taille_lot):
+            lot.append(doc)
+            if len(lot) >= taille_lot:
+                convertis += self._migrer_lot(lot)
+                lot = []
+        if lot:
+            convertis += self._migrer_lot(lot)
+        return convertis
+
+    def _migrer_lot(self, docs):
+        profils = {}
+        cotations = []
+        for doc in docs:
+            profil, cotation = separer(doc)
+            profils[profil["_id"]] = profil
+            cotations.append(ReplaceOne({"_id": doc["_id"]}, cotation))
+        try:
+            self.profils.bulk_write([
+                UpdateOne({"_id": _id}, {"$setOnInsert": {k: v for k, v in p.items() if k != "_id"}}, upsert=True)
+                for _id, p in profils.items()
+            ], ordered=False)
+        except BulkWriteError as err:
+            # Upserts concurrents du même profil (code 11000) : le profil existe déjà
+            if any(e.get("code") != 11000 for e in err.details.get("writeErrors", [])):
+                raise
+        self.collection.bulk_write(cotations, ordered=False)
+        return len(cotations)
@@ -1,6 +1,7 @@
-from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
+from repositories.database import get_client, get_db
+from repositories.cache import cache_documents, document_cachable
 from models.currency import Devise
-import os
 
 class CurrencyRepository:
     """
@@ -8,10 +9,8 @@ class CurrencyRepository:
     """
 
     def __init__(self):
-        uri = os.getenv("MONGODB_URI")
-        dbname = os.getenv("MONGODB_DBNAME")
-        self.client = MongoClient(uri)
-        self.db = self.client[dbname]
+        self.client = get_client()
+        self.db = get_db()
         self.collection = self.db["devises"]
         self.favoris_collection = self.db["favoris_devises"]
 
@@ -19,11 +18,30 @@ class CurrencyRepository:
         """
         Cherche une devise par son nom et la date de mise à jour.
         """
-        doc = self.collection.find_one({"nom": nom, "date_maj": date_maj})
+        doc = cache_documents.obtenir_ou_charger(
+            ("devises", nom, date_maj),
+            lambda: self.collection.find_one({"nom": nom, "date_maj": date_maj})
+        )
+        if doc:
+            return Devise.from_dict(doc)
+        return None
+
+    def chercher_derniere(self, nom):
+        """
+        Cherche la devise la plus récente enregistrée pour ce nom.
+        """
+        doc = self.collection.find_one({"nom": nom}, sort=[("date_maj", -1)])
         if doc:
             return Devise.from_dict(doc)
         return None
 
+    def chercher_date_derniere(self, nom):
+        """
+        Date (date_maj) de la devise la plus récente enregistrée pour ce nom, ou None.
+        """
+        doc = self.collection.find_one({"nom": nom}, {"date_maj": 1, "_id": 0}, sort=[("date_maj", -1)])
+        return doc["date_maj"] if doc else None
+
     def lire_historique_par_nom(self, nom: str, dates: list) -> list:
         """
         Récupère l'historique d'une devise pour une liste de dates.
@@ -44,13 +62,33 @@ class CurrencyRepository:
         }).sort("date_maj", 1)
         return [Devise.from_dict(doc) for doc in cursor]
 
+    def iterer_historique_sur_periode(self, nom: str, date_debut: str, date_fin: str, taille_lot: int = 500):
+        """
+        Comme lire_historique_sur_periode, mais parcourt le curseur par lots sans construire de liste.
+        """
+        cursor = self.collection.find({
+            "nom": nom,
+            "date_maj": {"$gte": date_debut, "$lte": date_fin}
+        }).sort("date_maj", 1).batch_size(taille_lot)
+        for doc in cursor:
+            yield Devise.from_dict(doc)
+
     def creer(self, devise: Devise):
         """
         Crée une nouvelle devise dans la base de données.
         """
         data = devise.to_dict()
-        result = self.collection.insert_one(data)
+        cache_documents.invalider(("devises", devise.nom, devise.date_maj))
+        try:
+            result = self.collection.insert_one(data)
+        except DuplicateKeyError:
+            # Déjà insérée par une autre requête : on reprend l'identifiant existant
+            existant = self.collection.find_one({"nom": devise.nom, "date_maj": devise.date_maj}, {"_id": 1})
+            devise.id = str(existant["_id"]) if existant else None
+            return devise
         devise.id = str(result.inserted_id)
+        # Écriture traversante : le nouveau document est servi par le cache à tous les workers
+        cache_documents.stocker(("devises", devise.nom, devise.date_maj), document_cachable(data))
         return devise
 
     def mettre_a_jour(self, nom, date_maj, data):
@@ -61,6 +99,7 @@ class CurrencyRepository:
             {"nom": nom, "date_maj": date_maj},
             {"$set": data}
         )
+        cache_documents.invalider(("devises", nom, date_maj))
         return result.modified_count > 0
 
     def lire_les_plus_populaires(self, popular_currencies, date_maj):
@@ -98,4 +137,10 @@ class CurrencyRepository:
         Récupère la liste des devises favorites de l'utilisateur.
         """
         doc = self.favoris_collection.find_one({"user_id": user_id})
-        return doc["devises"] if doc and "devises" in doc else []
\ No newline at end of file
+        return doc["devises"] if doc and "devises" in doc else []
+
+    def lire_tous_les_favoris(self):
+        """
+        Retourne la liste distincte des devises mises en favori par au moins un utilisateur.
+        """
+        return self.favoris_collection.distinct("devises")
\ No newline at end of file
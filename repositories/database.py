@@ -0,0 +1,72 @@
+import atexit
+import os
+import threading
+from pymongo import MongoClient
+
+# Registre unique du client MongoDB pour tout le processus.
+# Tous les dépôts partagent le même MongoClient (et donc le même pool de connexions).
+_verrou = threading.Lock()
+_client = None
+_pid = None
+
+
+def _options_pool():
+    """
+    Construit les options de pool de connexions à partir des variables d'environnement.
+    """
+    return {
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "10000")),
+    }
+
+
+def get_client():
+    """
+    Retourne le MongoClient partagé du processus, en le créant au premier appel.
+    Après un fork (serveur pre-fork), un nouveau client est créé dans le processus enfant.
+    """
+    global _client, _pid
+    if _client is not None and _pid == os.getpid():
+        return _client
+    with _verrou:
+        if _client is None or _pid != os.getpid():
+            _client = MongoClient(os.getenv("MONGODB_URI"), **_options_pool())
+            _pid = os.getpid()
+    return _client
+
+
+def get_db():
+    """
+    Retourne la base de données configurée (MONGODB_DBNAME) sur le client partagé.
+    """
+    return get_client()[os.getenv("MONGODB_DBNAME")]
+
+
+def fermer_client():
+    """
+    Ferme le client partagé et libère son pool de connexions.
+    """
+    global _client, _pid
+    with _verrou:
+        if _client is not None and _pid == os.getpid():
+            _client.close()
+        _client = None
+        _pid = None
+
+
+def _reinitialiser_apres_fork():
+    # Le client hérité du parent n'est pas utilisable dans l'enfant : on l'oublie
+    # sans le fermer (les sockets appartiennent au parent).
+    global _client, _pid, _verrou
+    _verrou = threading.Lock()
+    _client = None
+    _pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinitialiser_apres_fork)
+
+atexit.register(fermer_client)
@@ -0,0 +1,128 @@
+import logging
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+from repositories.database import get_db
+
+logger = logging.getLogger(__name__)
+
+# Index attendus pour chaque collection : (collection, clés, unique)
+INDEX = [
+    ("actions", [("symbole", ASCENDING), ("date", ASCENDING)], True),
+    ("actions_mensuelles", [("symbole", ASCENDING), ("mois", ASCENDING)], True),
+    ("devises", [("nom", ASCENDING), ("date_maj", ASCENDING)], True),
+    ("societes", [("symbole", ASCENDING), ("date_maj", ASCENDING)], True),
+    ("utilisateurs", [("email", ASCENDING)], True),
+    ("favoris_actions", [("user_id", ASCENDING)], True),
+    ("favoris_devises", [("user_id", ASCENDING)], True),
+]
+
+# Index TTL : (collection, champ date d'expiration)
+INDEX_TTL = [
+    ("verrous", "expire_a"),
+]
+
+
+def _nom_index(cles):
+    return "_".join(f"{champ}_{sens}" for champ, sens in cles)
+
+
+def _groupes_doublons(collection, cles, limite=None):
+    champs = [champ for champ, _ in cles]
+    pipeline = [
+        {"$group": {
+            "_id": {champ: f"${champ}" for champ in champs},
+            "ids": {"$push": "$_id"},
+            "nombre": {"$sum": 1}
+        }},
+        {"$match": {"nombre": {"$gt": 1}}},
+        {"$sort": {"nombre": -1}},
+    ]
+    if limite:
+        pipeline.append({"$limit": limite})
+    return list(collection.aggregate(pipeline, allowDiskUse=True))
+
+
+def chercher_doublons(collection, cles, limite=20):
+    """
+    Retourne les groupes de documents qui empêchent la création d'un index unique
+    sur les clés données : [{"cle": {...}, "ids": [...], "nombre": n}, ...].
+    """
+    return [
+        {"cle": groupe["_id"], "ids": [str(i) for i in groupe["ids"]], "nombre": groupe["nombre"]}
+        for groupe in _groupes_doublons(collection, cles, limite)
+    ]
+
+
+def supprimer_doublons(collection, cles):
+    """
+    Supprime les doublons en conservant le plus ancien document de chaque groupe.
+    Retourne le nombre de documents supprimés.
+    """
+    supprimes = 0
+    for groupe in _groupes_doublons(collection, cles):
+        ids = sorted(groupe["ids"], key=str)[1:]
+        supprimes += collection.delete_many({"_id": {"$in": ids}}).deleted_count
+    return supprimes
+
+
+def _index_existe(collection, cles, unique):
+    for info in collection.index_information().values():
+        if list(info["key"]) == cles and bool(info.get("unique")) == unique:
+            return True
+    return False
+
+
+def _creer_index(collection, cles, unique, entree):
+    """
+    Crée l'index ; retourne False seulement si un index unique est bloqué par des doublons (11000).
+    Toute autre erreur est consignée dans l'entrée du rapport.
+    """
+    try:
+        collection.create_index(cles, unique=unique, name=entree["index"])
+    except OperationFailure as err:
+        if unique and err.code == 11000:
+            return False
+        entree["statut"] = "erreur"
+        entree["erreur"] = str(err)
+        logger.error("Création de l'index %s sur %s impossible : %s", entree["index"], collection.name, err)
+    return True
+
+
+def assurer_index(db=None, corriger_doublons=False):
+    """
+    Crée (de façon idempotente) tous les index déclarés dans INDEX.
+    Un index déjà présent n'est pas revérifié. La recherche de doublons (parcours complet
+    de la collection) n'a lieu que si la création d'un index unique échoue en doublon :
+    les doublons sont alors signalés dans le rapport, ou supprimés si corriger_doublons est vrai.
+    Retourne un rapport par collection.
+    """
+    db = db if db is not None else get_db()
+    rapport = []
+    for nom_collection, cles, unique in INDEX:
+        collection = db[nom_collection]
+        entree = {"collection": nom_collection, "index": _nom_index(cles), "unique": unique,
+                  "statut": "ok", "doublons": []}
+        rapport.append(entree)
+        if _index_existe(collection, cles, unique) or _creer_index(collection, cles, unique, entree):
+            continue
+        if corriger_doublons:
+            entree["doublons_supprimes"] = supprimer_doublons(collection, cles)
+            if _creer_index(collection, cles, unique, entree):
+                continue
+        entree["statut"] = "doublons"
+        entree["doublons"] = chercher_doublons(collection, cles)
+        logger.warning(
+            "Index unique %s sur %s non créé : %d groupe(s) de doublons",
+            entree["index"], nom_collection, len(entree["doublons"])
+        )
+    for nom_collection, champ in INDEX_TTL:
+        entree = {"collection": nom_collection, "index": f"{champ}_ttl", "unique": False,
+                  "statut": "ok", "doublons": []}
+        try:
+            db[nom_collection].create_index([(champ, ASCENDING)], expireAfterSeconds=0, name=entree["index"])
+        except OperationFailure as err:
+            entree["statut"] = "erreur"
+            entree["erreur"] = str(err)
+            logger.error("Création de l'index %s sur %s impossible : %s", entree["index"], nom_collection, err)
+        rapport.append(entree)
+    return rapport
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, UTC
+from pymongo.errors import DuplicateKeyError
+from repositories.database import get_client, get_db
+
+class VerrouRepository:
+    """
+    Dépôt des verrous (baux) partagés entre workers, stockés dans MongoDB.
+    Un bail expire automatiquement (champ expire_a, index TTL).
+    """
+
+    def __init__(self):
+        self.client = get_client()
+        self.db = get_db()
+        self.collection = self.db["verrous"]
+
+    def acquerir(self, cle, proprietaire, duree_secondes):
+        """
+        Tente de prendre le bail pour la clé donnée. Retourne True si le bail est obtenu.
+        Un bail expiré (mais pas encore purgé par l'index TTL) peut être repris.
+        """
+        maintenant = datetime.now(UTC)
+        try:
+            self.collection.update_one(
+                {"_id": cle, "expire_a": {"$lte": maintenant}},
+                {"$set": {
+                    "proprietaire": proprietaire,
+                    "acquis_a": maintenant,
+                    "expire_a": maintenant + timedelta(seconds=duree_secondes)
+                }},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # Le bail existe et n'est pas expiré : il appartient à un autre worker
+            return False
+
+    def liberer(self, cle, proprietaire):
+        """
+        Libère le bail s'il appartient encore au propriétaire donné.
+        """
+        self.collection.delete_one({"_id": cle, "proprietaire": proprietaire})
+
+    def est_actif(self, cle):
+        """
+        Indique si un bail non expiré existe pour la clé donnée.
+        """
+        return self.collection.find_one(
+            {"_id": cle, "expire_a": {"$gt": datetime.now(UTC)}}, {"_id": 1}
+        ) is not None
@@ -0,0 +1,27 @@
+from datetime import UTC
+from repositories.database import get_client, get_db
+
+class PlanificateurRepository:
+    """
+    Dépôt de l'état du planificateur partagé entre workers : un document par tâche
+    ({"_id": "actions", "dernier_passage": ...}), pour que le processus qui obtient le bail
+    d'une échéance sache quand la tâche a été faite par un autre.
+    """
+
+    def __init__(self):
+        self.client = get_client()
+        self.db = get_db()
+        self.collection = self.db["planificateur"]
+
+    def lire_dernier_passage(self, tache):
+        """
+        Retourne la date (UTC) du dernier passage de la tâche, ou None.
+        """
+        doc = self.collection.find_one({"_id": tache}, {"dernier_passage": 1})
+        if not doc or doc.get("dernier_passage") is None:
+            return None
+        # MongoDB renvoie des dates UTC naïves
+        return doc["dernier_passage"].replace(tzinfo=UTC)
+
+    def enregistrer_passage(self, tache, date):
+        self.collection.update_one({"_id": tache}, {"$set": {"dernier_passage": date}}, upsert=True)
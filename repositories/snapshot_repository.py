@@ -0,0 +1,45 @@
+from datetime import datetime, UTC
+from repositories.database import get_client, get_db
+
+class InstantaneRepository:
+    """
+    Dépôt des instantanés quotidiens des listes populaires (devises, actions, sociétés).
+    Un document par liste et par jour, identifié par "<liste>:<date>", contenant la réponse prête à envoyer.
+    """
+
+    def __init__(self):
+        self.client = get_client()
+        self.db = get_db()
+        self.collection = self.db["instantanes_populaires"]
+
+    @staticmethod
+    def _id(liste, date):
+        return f"{liste}:{date}"
+
+    def lire(self, liste, date, champs=None):
+        """
+        Retourne la réponse précalculée de la liste pour la date, ou None.
+        Avec `champs`, seuls ces champs (et les marqueurs manquant/message) sont lus pour chaque élément.
+        """
+        if champs is None:
+            projection = {"payload": 1}
+        else:
+            projection = {f"payload.{champ}": 1 for champ in (*champs, "manquant", "message")}
+        doc = self.collection.find_one({"_id": self._id(liste, date)}, projection)
+        return doc["payload"] if doc else None
+
+    def enregistrer(self, liste, date, payload):
+        """
+        Enregistre (ou remplace) l'instantané de la liste pour la date.
+        """
+        self.collection.replace_one(
+            {"_id": self._id(liste, date)},
+            {"liste": liste, "date": date, "payload": payload, "genere_a": datetime.now(UTC)},
+            upsert=True
+        )
+
+    def invalider(self, liste, date):
+        """
+        Supprime l'instantané : il sera reconstruit à la prochaine lecture.
+        """
+        self.collection.delete_one({"_id": self._id(liste, date)})
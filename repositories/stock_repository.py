@@ -1,71 +1,171 @@
-from pymongo import MongoClient
-import os
+from pymongo.errors import DuplicateKeyError
+from repositories.database import get_client, get_db
+from repositories.cache import cache_documents, document_cachable
+from repositories.stock_storage import CHAMPS_BARRE, stockage_actions
 from models.stock import Action
 
+COLONNES = ("date", "open", "high", "low", "close", "volume")
+
+
 class StockRepository:
     """
     Dépôt pour la gestion des actions en base MongoDB.
     """
 
     def __init__(self):
-        uri = os.getenv("MONGODB_URI")
-        dbname = os.getenv("MONGODB_DBNAME")
-        self.client = MongoClient(uri)
-        self.db = self.client[dbname]
-        self.collection = self.db["actions"]
+        self.client = get_client()
+        self.db = get_db()
+        # Barres quotidiennes : un document par jour ou un document par mois (STOCK_STORAGE_MODE)
+        self.stockage = stockage_actions(self.db)
+        self.collection = self.stockage.collection
+        # Dernière cotation connue de chaque symbole (_id = symbole)
+        self.dernieres = self.db["actions_dernieres"]
+        # État de synchronisation avec le fournisseur par symbole (_id = symbole)
+        self.synchro = self.db["synchro_actions"]
         self.favoris_collection = self.db["favoris_actions"]
 
     def chercher_par_symbole_et_date(self, symbole, date):
         """
         Cherche une action par son symbole et sa date.
         """
-        doc = self.collection.find_one({"symbole": symbole, "date": date})
+        doc = cache_documents.obtenir_ou_charger(
+            ("actions", symbole, date),
+            lambda: self.stockage.chercher(symbole, date)
+        )
         if doc:
             return Action.from_dict(doc)
         return None
 
+    def chercher_derniere_avant(self, symbole, date=None):
+        """
+        Retourne la dernière action connue à la date donnée ou avant (la plus récente si date est None).
+        """
+        doc = self.stockage.derniere_avant(symbole, date)
+        return Action.from_dict(doc) if doc else None
+
+    def chercher_derniere(self, symbole):
+        """
+        Dernière cotation matérialisée d'un symbole (lecture par clé primaire), reconstruite
+        depuis l'historique si elle n'existe pas encore.
+        """
+        doc = self.dernieres.find_one({"_id": symbole})
+        if doc is None:
+            barre = self.stockage.derniere_avant(symbole)
+            if barre is None:
+                return None
+            self._avancer_derniere(barre)
+            return Action.from_dict(barre)
+        return Action.from_dict({**doc, "_id": doc.get("barre_id")})
+
+    def lire_synchro(self, symbole):
+        """
+        État de synchronisation d'un symbole : {"derniere_date", "recupere_le", "resultat", "nouvelles",
+        "analyse_apres"}, ou None.
+        """
+        return self.synchro.find_one({"_id": symbole}, {"_id": 0})
+
+    def enregistrer_synchro(self, symbole, recupere_le, resultat, derniere_date=None, nouvelles=0, analyse_apres=None):
+        """
+        Enregistre le résultat d'une récupération. derniere_date ne peut qu'avancer ($max) ;
+        analyse_apres est la date après laquelle la réponse a été analysée (None : réponse entière).
+        """
+        modification = {"$set": {"recupere_le": recupere_le, "resultat": resultat, "nouvelles": nouvelles,
+                                 "analyse_apres": analyse_apres}}
+        if derniere_date:
+            modification["$max"] = {"derniere_date": derniere_date}
+        self.synchro.update_one({"_id": symbole}, modification, upsert=True)
+
+    def _avancer_derniere(self, data):
+        # Remplace la dernière cotation seulement si `data` est plus récente : le filtre sur la date
+        # rend la mise à jour atomique entre workers
+        derniere = {"symbole": data["symbole"], "date": data["date"], "barre_id": data.get("_id"),
+                    **{champ: data.get(champ) for champ in CHAMPS_BARRE}}
+        try:
+            self.dernieres.update_one(
+                {"_id": data["symbole"], "date": {"$lt": data["date"]}}, {"$set": derniere}, upsert=True
+            )
+        except DuplicateKeyError:
+            # Une cotation aussi récente est déjà enregistrée
+            pass
+
     def creer(self, action: Action):
         """
         Ajoute une nouvelle action à la base de données.
         """
         data = action.to_dict()
-        result = self.collection.insert_one(data)
-        action.id = str(result.inserted_id)
+        cache_documents.invalider(("actions", action.symbole, action.date))
+        try:
+            inserted_id = self.stockage.inserer(data)
+        except DuplicateKeyError:
+            # Déjà insérée par une autre requête : on reprend l'identifiant existant
+            existant = self.stockage.chercher(action.symbole, action.date)
+            action.id = str(existant["_id"]) if existant else None
+            return action
+        action.id = str(inserted_id)
+        data["_id"] = inserted_id
+        self._avancer_derniere(data)
+        # Écriture traversante : le nouveau document est servi par le cache à tous les workers
+        cache_documents.stocker(("actions", action.symbole, action.date), document_cachable(data))
         return action
 
     def chercher_dates_existantes(self, symbole, dates):
         """
         Retourne la liste des dates déjà présentes pour un symbole donné.
         """
-        cursor = self.collection.find(
-            {"symbole": symbole, "date": {"$in": dates}},
-            {"date": 1, "_id": 0}
-        )
-        return [doc["date"] for doc in cursor]
+        return self.stockage.dates(symbole, dates)
 
     def lire_historique_sur_periode(self, symbole, date_debut, date_fin):
         """
         Retrieve the history of a stock for a given period (inclusive dates).
         """
-        cursor = self.collection.find({
-            "symbole": symbole,
-            "date": {"$gte": date_debut, "$lte": date_fin}
-        }).sort("date", 1)
+        cursor = self.stockage.iterer_periode(symbole, date_debut, date_fin)
         return [Action.from_dict(doc) for doc in cursor]
 
+    def iterer_historique_sur_periode(self, symbole, date_debut, date_fin, taille_lot=500):
+        """
+        Comme lire_historique_sur_periode, mais parcourt le curseur par lots sans construire de liste.
+        """
+        cursor = self.stockage.iterer_periode(symbole, date_debut, date_fin, taille_lot=taille_lot)
+        for doc in cursor:
+            yield Action.from_dict(doc)
+
     def lire_historique_par_jours(self, symbole, dates):
         """
         Retrieve the history of a stock for a list of dates.
         """
-        cursor = self.collection.find({
-            "symbole": symbole,
-            "date": {"$in": dates}
-        }).sort("date", 1)
+        cursor = self.stockage.iterer_dates(symbole, dates)
         return [Action.from_dict(doc) for doc in cursor]
 
+    def lire_colonnes_sur_periode(self, symbole, date_debut, date_fin):
+        """
+        Historique d'une période au format colonnes, construit directement depuis le curseur
+        (sans objets Action) : {"symbole": ..., "date": [...], "open": [...], ...}.
+        """
+        cursor = self.stockage.iterer_periode(symbole, date_debut, date_fin, self._projection_colonnes())
+        return self._en_colonnes(symbole, cursor)
+
+    def lire_colonnes_par_jours(self, symbole, dates):
+        """
+        Historique d'une liste de dates au format colonnes.
+        """
+        cursor = self.stockage.iterer_dates(symbole, dates, self._projection_colonnes())
+        return self._en_colonnes(symbole, cursor)
+
+    @staticmethod
+    def _projection_colonnes():
+        return {"_id": 0, **dict.fromkeys(COLONNES, 1)}
+
+    @staticmethod
+    def _en_colonnes(symbole, cursor):
+        colonnes = {nom: [] for nom in COLONNES}
+        ajouts = [(nom, colonnes[nom].append) for nom in COLONNES]
+        for doc in cursor:
+            for nom, ajouter in ajouts:
+                ajouter(doc.get(nom))
+        return {"symbole": symbole, **colonnes}
+
     def get_all_dates_for_symbol(self, symbole):
-        cursor = self.collection.find({"symbole": symbole}, {"date": 1, "_id": 0})
-        return [doc["date"] for doc in cursor]
+        return self.stockage.dates(symbole)
 
     def creer_plusieurs(self, actions):
         """
@@ -74,9 +174,17 @@ class StockRepository:
         data = [a.to_dict() for a in actions]
         if not data:
             return []
-        result = self.collection.insert_many(data)
-        for action, inserted_id in zip(actions, result.inserted_ids):
-            action.id = str(inserted_id)
+        for action in actions:
+            cache_documents.invalider(("actions", action.symbole, action.date))
+        # Les dates déjà présentes sont ignorées (identifiant None)
+        inserted_ids = self.stockage.inserer_plusieurs(data)
+        plus_recentes = {}
+        for action, doc, inserted_id in zip(actions, data, inserted_ids):
+            action.id = str(inserted_id) if inserted_id else None
+            if inserted_id and doc["date"] > plus_recentes.get(doc["symbole"], {}).get("date", ""):
+                plus_recentes[doc["symbole"]] = {**doc, "_id": inserted_id}
+        for doc in plus_recentes.values():
+            self._avancer_derniere(doc)
         return actions
 
     def ajouter_favori(self, user_id, symbole):
@@ -94,4 +202,10 @@ class StockRepository:
 
     def lire_favoris_par_utilisateur(self, user_id):
         doc = self.favoris_collection.find_one({"user_id": user_id})
-        return doc["actions"] if doc and "actions" in doc else []
\ No newline at end of file
+        return doc["actions"] if doc and "actions" in doc else []
+
+    def lire_tous_les_favoris(self):
+        """
+        Retourne la liste distincte des symboles mis en favori par au moins un utilisateur.
+        """
+        return self.favoris_collection.distinct("actions")
\ No newline at end of file
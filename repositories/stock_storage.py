@@ -0,0 +1,266 @@
+import os
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+# Champs d'une barre quotidienne (en plus de "_id", "symbole" et "date")
+CHAMPS_BARRE = ("open", "high", "low", "close", "volume")
+
+
+def cle_mensuelle(symbole, date):
+    """
+    Identifiant du document mensuel contenant la barre d'une date : "<symbole>:<AAAA-MM>".
+    """
+    return f"{symbole}:{date[:7]}"
+
+
+def aplatir(bucket, jours=None):
+    """
+    Documents quotidiens (même forme que la collection "actions") d'un document mensuel,
+    triés par date. `jours` limite le résultat à un ensemble de dates.
+    """
+    docs = []
+    for jour, barre in sorted(bucket.get("jours", {}).items()):
+        date = f"{bucket['mois']}-{jour}"
+        if jours is None or date in jours:
+            docs.append({"_id": barre.get("_id"), "symbole": bucket["symbole"], "date": date,
+                         **{champ: barre.get(champ) for champ in CHAMPS_BARRE}})
+    return docs
+
+
+def projeter(doc, projection):
+    """
+    Applique une projection d'inclusion ({"champ": 1, "_id": 0}) à un document aplati,
+    pour que les deux stockages renvoient des documents de même forme.
+    """
+    if not projection:
+        return doc
+    gardes = {champ for champ, valeur in projection.items() if valeur}
+    if projection.get("_id", 1):
+        gardes.add("_id")
+    return {champ: valeur for champ, valeur in doc.items() if champ in gardes}
+
+
+class StockageDocuments:
+    """
+    Stockage d'origine : un document par (symbole, date) dans la collection "actions".
+    """
+    nom = "documents"
+
+    def __init__(self, db):
+        self.collection = db["actions"]
+
+    def chercher(self, symbole, date):
+        return self.collection.find_one({"symbole": symbole, "date": date})
+
+    def inserer(self, data):
+        """
+        Insère une barre et retourne son _id ; DuplicateKeyError si la date existe déjà.
+        """
+        return self.collection.insert_one(data).inserted_id
+
+    def inserer_plusieurs(self, data):
+        """
+        Insère les barres et retourne leurs _id, None pour les dates déjà présentes.
+        """
+        try:
+            return self.collection.insert_many(data, ordered=False).inserted_ids
+        except BulkWriteError as err:
+            # Les doublons (code 11000) sont ignorés : ces dates existent déjà
+            erreurs = err.details.get("writeErrors", [])
+            if any(e.get("code") != 11000 for e in erreurs):
+                raise
+            en_erreur = {e["index"] for e in erreurs}
+            return [None if i in en_erreur else doc["_id"] for i, doc in enumerate(data)]
+
+    def iterer_periode(self, symbole, date_debut, date_fin, projection=None, taille_lot=None):
+        curseur = self.collection.find({
+            "symbole": symbole,
+            "date": {"$gte": date_debut, "$lte": date_fin}
+        }, projection).sort("date", 1)
+        return curseur.batch_size(taille_lot) if taille_lot else curseur
+
+    def iterer_dates(self, symbole, dates, projection=None):
+        return self.collection.find({
+            "symbole": symbole,
+            "date": {"$in": dates}
+        }, projection).sort("date", 1)
+
+    def dates(self, symbole, dates=None):
+        filtre = {"symbole": symbole}
+        if dates is not None:
+            filtre["date"] = {"$in": dates}
+        return [doc["date"] for doc in self.collection.find(filtre, {"date": 1, "_id": 0})]
+
+    def derniere_avant(self, symbole, date=None):
+        """
+        Dernière barre à la date donnée ou avant (la plus récente si date est None) :
+        une seule requête sur l'index (symbole, date), triée et limitée à un document.
+        """
+        filtre = {"symbole": symbole}
+        if date is not None:
+            filtre["date"] = {"$lte": date}
+        return self.collection.find_one(filtre, sort=[("date", -1)])
+
+    def iterer_tout(self, taille_lot=500):
+        return self.collection.find().sort([("symbole", 1), ("date", 1)]).batch_size(taille_lot)
+
+
+class StockageMensuel:
+    """
+    Une barre par jour regroupée dans un document par symbole et par mois (collection "actions_mensuelles") :
+    {"_id": "AAPL:2025-06", "symbole": "AAPL", "mois": "2025-06", "jours": {"05": {"_id": ..., "open": ...}}}.
+    Chaque barre garde son propre _id, exposé comme l'identifiant de l'action.
+    """
+    nom = "mensuel"
+
+    def __init__(self, db):
+        self.collection = db["actions_mensuelles"]
+
+    @staticmethod
+    def _ecriture(data):
+        """
+        (_id de la barre, filtre, modification) : la barre n'est écrite que si ce jour est absent,
+        sinon l'upsert échoue en doublon (11000).
+        """
+        jour = data["date"][8:]
+        barre = {"_id": data.get("_id") or ObjectId(), **{champ: data.get(champ) for champ in CHAMPS_BARRE}}
+        return (
+            barre["_id"],
+            {"_id": cle_mensuelle(data["symbole"], data["date"]), f"jours.{jour}": {"$exists": False}},
+            {"$set": {f"jours.{jour}": barre},
+             "$setOnInsert": {"symbole": data["symbole"], "mois": data["date"][:7]}},
+        )
+
+    def chercher(self, symbole, date):
+        bucket = self.collection.find_one(
+            {"_id": cle_mensuelle(symbole, date)},
+            {"symbole": 1, "mois": 1, f"jours.{date[8:]}": 1}
+        )
+        docs = aplatir(bucket, {date}) if bucket else []
+        return docs[0] if docs else None
+
+    def inserer(self, data):
+        _id, filtre, modification = self._ecriture(data)
+        try:
+            self.collection.update_one(filtre, modification, upsert=True)
+        except DuplicateKeyError:
+            # Soit le jour existe déjà, soit le mois vient d'être créé par une écriture concurrente :
+            # un second essai tranche (DuplicateKeyError à nouveau si le jour existe)
+            self.collection.update_one(filtre, modification, upsert=True)
+        return _id
+
+    def inserer_plusieurs(self, data):
+        ecritures = [self._ecriture(d) for d in data]
+        ids = [_id for _id, _, _ in ecritures]
+        operations = [UpdateOne(filtre, modification, upsert=True) for _, filtre, modification in ecritures]
+        en_erreur = self._ecrire(operations)
+        if en_erreur:
+            # Plusieurs jours d'un mois nouveau : seul le premier upsert crée le document,
+            # les autres sont rejoués une fois sur le document existant
+            reessais = sorted(en_erreur)
+            en_erreur = {reessais[i] for i in self._ecrire([operations[i] for i in reessais])}
+        return [None if i in en_erreur else _id for i, _id in enumerate(ids)]
+
+    def _ecrire(self, operations):
+        if not operations:
+            return set()
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as err:
+            erreurs = err.details.get("writeErrors", [])
+            if any(e.get("code") != 11000 for e in erreurs):
+                raise
+            return {e["index"] for e in erreurs}
+        return set()
+
+    def iterer_periode(self, symbole, date_debut, date_fin, projection=None, taille_lot=None):
+        """
+        Les clés des jours étant dynamiques, MongoDB ne peut pas projeter un champ de chaque barre :
+        les mois sont lus entiers et la projection est appliquée aux documents aplatis.
+        """
+        curseur = self.collection.find({
+            "symbole": symbole,
+            "mois": {"$gte": date_debut[:7], "$lte": date_fin[:7]}
+        }).sort("mois", 1)
+        for bucket in curseur:
+            for doc in aplatir(bucket):
+                if date_debut <= doc["date"] <= date_fin:
+                    yield projeter(doc, projection)
+
+    def iterer_dates(self, symbole, dates, projection=None):
+        """
+        Seuls les jours demandés sont lus ; la projection est appliquée aux documents aplatis.
+        """
+        if not dates:
+            return
+        demandees = set(dates)
+        curseur = self.collection.find(
+            {"_id": {"$in": list({cle_mensuelle(symbole, d) for d in demandees})}},
+            {"symbole": 1, "mois": 1, **{f"jours.{d[8:]}": 1 for d in demandees}}
+        ).sort("mois", 1)
+        for bucket in curseur:
+            for doc in aplatir(bucket, demandees):
+                yield projeter(doc, projection)
+
+    def dates(self, symbole, dates=None):
+        if dates is not None:
+            return [doc["date"] for doc in self.iterer_dates(symbole, dates)]
+        curseur = self.collection.aggregate([
+            {"$match": {"symbole": symbole}},
+            {"$project": {"_id": 0, "mois": 1, "jours": {"$map": {
+                "input": {"$objectToArray": {"$ifNull": ["$jours", {}]}}, "in": "$$this.k"
+            }}}},
+        ])
+        return [f"{doc['mois']}-{jour}" for doc in curseur for jour in doc["jours"]]
+
+    def derniere_avant(self, symbole, date=None):
+        """
+        Dernière barre à la date donnée ou avant : mois parcourus à rebours sur l'index (symbole, mois).
+        Le mois de la date peut ne contenir que des jours postérieurs, d'où le mois précédent.
+        """
+        filtre = {"symbole": symbole}
+        if date is not None:
+            filtre["mois"] = {"$lte": date[:7]}
+        for bucket in self.collection.find(filtre).sort("mois", -1).batch_size(2):
+            docs = [doc for doc in aplatir(bucket) if date is None or doc["date"] <= date]
+            if docs:
+                return docs[-1]
+        return None
+
+    def iterer_tout(self, taille_lot=500):
+        for bucket in self.collection.find().sort([("symbole", 1), ("mois", 1)]).batch_size(taille_lot):
+            yield from aplatir(bucket)
+
+
+MODES_STOCKAGE = {classe.nom: classe for classe in (StockageDocuments, StockageMensuel)}
+
+
+def stockage_actions(db, mode=None):
+    """
+    Stockage des actions selon STOCK_STORAGE_MODE : "documents" (défaut) ou "mensuel".
+    """
+    mode = (mode or os.getenv("STOCK_STORAGE_MODE", "documents")).lower()
+    if mode not in MODES_STOCKAGE:
+        raise ValueError(f"STOCK_STORAGE_MODE inconnu : {mode} (attendu : {', '.join(MODES_STOCKAGE)})")
+    return MODES_STOCKAGE[mode](db)
+
+
+def migrer_stockage(source, destination, taille_lot=500):
+    """
+    Copie toutes les barres d'un stockage vers un autre en conservant leurs _id.
+    Idempotent : les dates déjà présentes dans la destination sont ignorées.
+    Retourne {"lues": n, "copiees": n}.
+    """
+    lues = copiees = 0
+    lot = []
+    for doc in source.iterer_tout(taille_lot):
+        lot.append(doc)
+        if len(lot) >= taille_lot:
+            copiees += sum(1 for _id in destination.inserer_plusieurs(lot) if _id is not None)
+            lues += len(lot)
+            lot = []
+    if lot:
+        copiees += sum(1 for _id in destination.inserer_plusieurs(lot) if _id is not None)
+        lues += len(lot)
+    return {"lues": lues, "copiees": copiees}
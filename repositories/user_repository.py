@@ -1,17 +1,23 @@
-from pymongo import MongoClient
 from bson.objectid import ObjectId
 from models.user import Utilisateur
-import os
+from repositories.database import get_client, get_db
+
+# Projection des lectures publiques : le mot de passe n'est jamais lu
+PROJECTION_PUBLIQUE = {"mot_de_passe": 0}
+
 
 class UserRepository:
+    # La vérification de l'existence de la base n'est faite qu'une fois par processus
+    _base_verifiee = False
+
     def __init__(self):
-        uri = os.getenv("MONGODB_URI")
-        dbname = os.getenv("MONGODB_DBNAME")
-        self.client = MongoClient(uri)
+        self.client = get_client()
+        self.db = get_db()
         # Vérifier si la base de données existe, sinon la créer
-        if dbname not in self.client.list_database_names():
-            self.client[dbname].create_collection("utilisateurs")
-        self.db = self.client[dbname]
+        if not UserRepository._base_verifiee:
+            if self.db.name not in self.client.list_database_names():
+                self.db.create_collection("utilisateurs")
+            UserRepository._base_verifiee = True
         self.collection = self.db["utilisateurs"]
 
     # Méthodes CRUD pour les utilisateurs
@@ -23,10 +29,24 @@ class UserRepository:
 
     def lire_tous(self):
         utilisateurs = []
-        for doc in self.collection.find():
+        for doc in self.collection.find({}, PROJECTION_PUBLIQUE):
             utilisateurs.append(Utilisateur.from_dict(doc))
         return utilisateurs
 
+    def lire_page(self, limite, apres=None):
+        """
+        Pagination par clé sur _id : au plus `limite` utilisateurs dont l'_id suit `apres`, sans mot de passe.
+        """
+        filtre = {"_id": {"$gt": ObjectId(apres)}} if apres else {}
+        cursor = self.collection.find(filtre, PROJECTION_PUBLIQUE).sort("_id", 1).limit(limite)
+        return [Utilisateur.from_dict(doc) for doc in cursor]
+
+    def compter_estimation(self):
+        """
+        Nombre d'utilisateurs d'après les métadonnées de la collection (sans parcours).
+        """
+        return self.collection.estimated_document_count()
+
     def lire_par_id(self, user_id):
         doc = self.collection.find_one({"_id": ObjectId(user_id)})
         if doc:
@@ -1,6 +1,11 @@
 from flask import request
 from flask_restful import Resource
 from services.company_service import SocieteService
+from resources.representations import preferer_ndjson, reponse_ndjson
+from resources.http_cache import (
+    calculer_etag, entetes_validation, est_non_modifie, reponse_non_modifiee,
+    cache_control_court, cache_control_frais, cache_control_immuable, cache_control_liste, cache_control_pour_date, est_periode_passee
+)
 import os
 from datetime import datetime
 
@@ -14,14 +19,24 @@ class SocieteRessource(Resource):
         Récupère les informations d'une société par son symbole.
         JWT requis.
         """
-        result = self.service.obtenir_societe(symbole.upper())
+        try:
+            champs = self.service.analyser_champs(request.args.get("fields"))
+        except ValueError as err:
+            return {"message": str(err)}, 400
+        result = self.service.charger_societe(symbole.upper(), champs)
         if result is None:
             return {"message": f"Société avec le symbole '{symbole}' non trouvée."}, 404
 
         if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], dict) and "message" in result[0]:
             return result[0], result[1]
 
-        return result, 200
+        # Réponse 304 si le client a déjà ce document (avant toute sérialisation)
+        etag = calculer_etag(result.symbole, result.id, result.date_maj, *(champs or ()))
+        entetes = entetes_validation(etag, result.date_maj)
+        entetes["Cache-Control"] = cache_control_pour_date(result.date_maj)
+        if est_non_modifie(etag, result.date_maj):
+            return reponse_non_modifiee(entetes)
+        return self.service.serialiseur_pour(champs).dump(result), 200, entetes
 
 class SocieteHistoriqueRessource(Resource):
 
@@ -35,11 +50,14 @@ class SocieteHistoriqueRessource(Resource):
         nb_jours = request.args.get("jours", type=int)
         date_debut = request.args.get("date_debut")
         date_fin = request.args.get("date_fin")
+        try:
+            champs = self.service.analyser_champs(request.args.get("fields"))
+        except ValueError as err:
+            return {"message": str(err)}, 400
 
         if nb_jours is not None:
             if nb_jours < 2:
                 return {"message": "Le nombre de jours doit être au moins 2."}, 400
-            result = self.service.obtenir_historique(symbole.upper(), nb_jours)
         elif date_debut and date_fin:
             try:
                 _date_debut_dt = datetime.strptime(date_debut, '%Y-%m-%d')
@@ -49,18 +67,49 @@ class SocieteHistoriqueRessource(Resource):
 
             if _date_debut_dt > _date_fin_dt:
                 return {"message": "La date de début ne peut pas être postérieure à la date de fin."}, 400
-
-            result = self.service.obtenir_historique_periode(symbole.upper(), date_debut, date_fin)
         else:
             return {"message": "Paramètres manquants ou invalides. Fournissez 'jours' ou 'date_debut' et 'date_fin'."}, 400
 
+        cache_control = self._cache_control_periode(symbole.upper(), nb_jours, date_fin)
+        if preferer_ndjson():
+            # Flux NDJSON : le curseur est parcouru par lots, sans liste complète en mémoire
+            if nb_jours is not None:
+                societes = self.service.iterer_historique(symbole.upper(), nb_jours, champs)
+            else:
+                societes = self.service.iterer_historique_periode(symbole.upper(), date_debut, date_fin, champs)
+            reponse = reponse_ndjson(societes, self.service.serialiseur_pour(champs).dump,
+                                     {"Cache-Control": cache_control, "Vary": "Accept"})
+            if reponse is None:
+                return {"message": "Aucune donnée disponible pour cette période ou symbole introuvable."}, 404
+            return reponse
+
+        if nb_jours is not None:
+            result = self.service.charger_historique(symbole.upper(), nb_jours, champs)
+        else:
+            result = self.service.charger_historique_periode(symbole.upper(), date_debut, date_fin, champs)
+
         if not result:
             return {"message": "Aucune donnée disponible pour cette période ou symbole introuvable."}, 404
 
         if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], dict) and "message" in result[0]:
             return result[0], result[1]
 
-        return result, 200
+        etag = calculer_etag(symbole.upper(), *(s.id for s in result), *(champs or ()))
+        date_modif = max(s.date_maj for s in result)
+        entetes = entetes_validation(etag, date_modif)
+        entetes["Cache-Control"] = cache_control
+        entetes["Vary"] = "Accept"
+        if est_non_modifie(etag, date_modif):
+            return reponse_non_modifiee(entetes)
+        return self.service.serialiseur_pour(champs).dump(result, many=True), 200, entetes
+
+    def _cache_control_periode(self, symbole, nb_jours, date_fin):
+        # Une période passée n'est immuable que si une cotation postérieure confirme qu'elle est close
+        if nb_jours is not None or not est_periode_passee(date_fin):
+            return cache_control_frais()
+        if self.service.periode_complete(symbole, date_fin):
+            return cache_control_immuable()
+        return cache_control_court()
 
 class SocietesPopulairesRessource(Resource):
     def __init__(self):
@@ -71,5 +120,9 @@ class SocietesPopulairesRessource(Resource):
         Récupère les informations des sociétés les plus populaires.
         Pas d'authentification requise.
         """
-        result = self.service.obtenir_societes_populaires()
-        return result, 200
\ No newline at end of file
+        try:
+            champs = self.service.analyser_champs(request.args.get("fields"))
+        except ValueError as err:
+            return {"message": str(err)}, 400
+        result = self.service.obtenir_societes_populaires(champs=champs)
+        return result, 200, {"Cache-Control": cache_control_liste(result)}
\ No newline at end of file
@@ -0,0 +1,86 @@
+import gzip
+import hashlib
+import os
+from flask import request
+from repositories.cache import CacheLRU
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : gzip seul
+    brotli = None
+
+TYPES_COMPRESSIBLES = {"application/json", "application/x-ndjson", "text/html", "text/plain"}
+
+
+class Compression:
+    """
+    Compression négociée (Accept-Encoding) des réponses : brotli si disponible, sinon gzip.
+    Les corps compressés sont gardés en cache (clé : empreinte du corps et encodage),
+    pour ne pas recompresser une réponse identique.
+    """
+
+    def __init__(self):
+        self.taille_min = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.niveau_gzip = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.qualite_brotli = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+        self.cache = CacheLRU(
+            max_entrees=int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", "512")),
+            max_octets=int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            ttl_secondes=float(os.getenv("COMPRESSION_CACHE_TTL_SECONDS", "3600"))
+        )
+
+    def init_app(self, app):
+        app.after_request(self.compresser_reponse)
+
+    def choisir_encodage(self, accept_encodings):
+        """
+        Retourne "br", "gzip" ou None selon les préférences du client (brotli à qualité égale).
+        """
+        candidats = ["br", "gzip"] if brotli is not None else ["gzip"]
+        meilleur, qualite_max = None, 0
+        for encodage in candidats:
+            qualite = accept_encodings[encodage]
+            if qualite > qualite_max:
+                meilleur, qualite_max = encodage, qualite
+        return meilleur
+
+    def compresser(self, corps, encodage):
+        """
+        Compresse le corps, en réutilisant le résultat d'un corps identique déjà compressé.
+        """
+        cle = (hashlib.blake2b(corps, digest_size=16).digest(), encodage)
+        compresse = self.cache.obtenir(cle)
+        if compresse is None:
+            if encodage == "br":
+                compresse = brotli.compress(corps, quality=self.qualite_brotli)
+            else:
+                compresse = gzip.compress(corps, compresslevel=self.niveau_gzip, mtime=0)
+            self.cache.stocker(cle, compresse)
+        return compresse
+
+    def compresser_reponse(self, response):
+        if response.mimetype not in TYPES_COMPRESSIBLES:
+            return response
+        response.vary.add("Accept-Encoding")
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers):
+            return response
+        encodage = self.choisir_encodage(request.accept_encodings)
+        if encodage is None:
+            return response
+        corps = response.get_data()
+        if len(corps) < self.taille_min:
+            return response
+        response.set_data(self.compresser(corps, encodage))
+        response.headers["Content-Encoding"] = encodage
+        # Le corps transmis diffère de la représentation d'origine : ETag faible
+        etag, faible = response.get_etag()
+        if etag and not faible:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def statistiques(self):
+        return self.cache.statistiques()
+
+
+compression = Compression()
@@ -1,8 +1,13 @@
-import os
 from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.currency_service import CurrencyService
+from models.currency import Devise
+from resources.representations import preferer_ndjson, reponse_ndjson
+from resources.http_cache import (
+    calculer_etag, entetes_validation, est_non_modifie, reponse_non_modifiee,
+    cache_control_court, cache_control_frais, cache_control_immuable, cache_control_liste, cache_control_pour_date, est_periode_passee
+)
 
 class DeviseRessource(Resource):
     def __init__(self):
@@ -10,8 +15,16 @@ class DeviseRessource(Resource):
 
     def get(self, nom):
         # Obtain currency information by name
-        result = self.service.obtenir_devise(nom.upper())
-        return result, 200 if isinstance(result, dict) and "message" not in result else result[1]
+        devise = self.service.charger_devise(nom.upper())
+        if not isinstance(devise, Devise):
+            return devise
+        # Réponse 304 si le client a déjà ce document (avant toute sérialisation)
+        etag = calculer_etag(devise.nom, devise.id, devise.date_maj)
+        entetes = entetes_validation(etag, devise.date_maj)
+        entetes["Cache-Control"] = cache_control_pour_date(devise.date_maj)
+        if est_non_modifie(etag, devise.date_maj):
+            return reponse_non_modifiee(entetes)
+        return self.service.serialiseur.dump(devise), 200, entetes
 
 class ConversionRessource(Resource):
     method_decorators = [jwt_required()]
@@ -65,13 +78,8 @@ class PopulairesRessource(Resource):
 
     def get(self):
         # Returne les devises les plus populaires
-        popular = [c.strip().upper() for c in os.getenv("POPULAR_CURRENCIES", "USD,EUR,GBP,JPY,CAD").split(",")]
-        results = []
-        for code in popular:
-            result = self.service.obtenir_devise(code)
-            if isinstance(result, dict) and "nom" in result:
-                results.append(result)
-        return results, 200
+        result = self.service.obtenir_devises_populaires()
+        return result, 200, {"Cache-Control": cache_control_liste(result)}
 
 class DeviseHistoriqueRessource(Resource):
     def __init__(self):
@@ -87,12 +95,42 @@ class DeviseHistoriqueRessource(Resource):
                 jours = int(jours)
             except ValueError:
                 return {"message": "Paramètre 'jours' invalide."}, 400
-            historique = self.service.obtenir_historique(nom.upper(), jours)
-        elif date_debut and date_fin:
-            historique = self.service.obtenir_historique_periode(nom.upper(), date_debut, date_fin)
-        else:
+        elif not (date_debut and date_fin):
             return {"message": "Paramètres requis: 'jours' ou 'date_debut' et 'date_fin'."}, 400
 
+        cache_control = self._cache_control_periode(nom.upper(), jours, date_fin)
+        if preferer_ndjson():
+            # Flux NDJSON : le curseur est parcouru par lots, sans liste complète en mémoire
+            if jours:
+                devises = self.service.iterer_historique(nom.upper(), jours)
+            else:
+                devises = self.service.iterer_historique_periode(nom.upper(), date_debut, date_fin)
+            reponse = reponse_ndjson(devises, self.service.serialiseur.dump,
+                                     {"Cache-Control": cache_control, "Vary": "Accept"})
+            if reponse is None:
+                return {"message": "Aucune donnée disponible pour cette période."}, 404
+            return reponse
+
+        if jours:
+            historique = self.service.charger_historique(nom.upper(), jours)
+        else:
+            historique = self.service.charger_historique_periode(nom.upper(), date_debut, date_fin)
+
         if not historique:
             return {"message": "Aucune donnée disponible pour cette période."}, 404
-        return historique, 200
\ No newline at end of file
+        etag = calculer_etag(nom.upper(), *(d.id for d in historique))
+        date_modif = max(d.date_maj for d in historique)
+        entetes = entetes_validation(etag, date_modif)
+        entetes["Cache-Control"] = cache_control
+        entetes["Vary"] = "Accept"
+        if est_non_modifie(etag, date_modif):
+            return reponse_non_modifiee(entetes)
+        return self.service.serialiseur.dump(historique, many=True), 200, entetes
+
+    def _cache_control_periode(self, nom, jours, date_fin):
+        # Une période passée n'est immuable que si une devise postérieure confirme qu'elle est close
+        if jours or not est_periode_passee(date_fin):
+            return cache_control_frais()
+        if self.service.periode_complete(nom, date_fin):
+            return cache_control_immuable()
+        return cache_control_court()
@@ -0,0 +1,115 @@
+import hashlib
+import os
+from datetime import datetime, timedelta, UTC
+from flask import Response, request
+from werkzeug.http import http_date, quote_etag
+
+
+def calculer_etag(*parties):
+    """
+    Calcule un ETag fort à partir des identifiants et dates des documents servis.
+    """
+    return hashlib.blake2b("|".join(str(p) for p in parties).encode(), digest_size=16).hexdigest()
+
+
+def date_vers_datetime(date_str):
+    """
+    Convertit une date AAAA-MM-JJ en datetime UTC (minuit), ou None si le format est invalide.
+    """
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=UTC)
+    except (TypeError, ValueError):
+        return None
+
+
+def entetes_validation(etag, date_modif=None):
+    """
+    En-têtes ETag et Last-Modified d'une réponse.
+    """
+    entetes = {"ETag": quote_etag(etag)}
+    derniere_modif = date_vers_datetime(date_modif)
+    if derniere_modif:
+        entetes["Last-Modified"] = http_date(derniere_modif)
+    return entetes
+
+
+def est_non_modifie(etag, date_modif=None):
+    """
+    Indique si le client possède déjà cette version (If-None-Match, sinon If-Modified-Since).
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        derniere_modif = date_vers_datetime(date_modif)
+        return derniere_modif is not None and derniere_modif <= request.if_modified_since
+    return False
+
+
+def reponse_non_modifiee(entetes):
+    """
+    Réponse 304 sans corps, avec les en-têtes de validation.
+    """
+    return Response(status=304, headers=entetes)
+
+
+def secondes_avant_rafraichissement(maintenant=None):
+    """
+    Secondes restantes avant la prochaine bascule du jour UTC (préchauffage du planificateur compris).
+    """
+    maintenant = maintenant or datetime.now(UTC)
+    minuit = (maintenant + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    delai_bascule = float(os.getenv("REFRESH_ROLLOVER_DELAY_SECONDS", "30"))
+    return max(0, int((minuit - maintenant).total_seconds() + delai_bascule))
+
+
+def cache_control_frais(maintenant=None):
+    """
+    Donnée du jour : cachable jusqu'au prochain rafraichissement, puis servie périmée le temps de la revalider.
+    """
+    return "public, max-age={}, stale-while-revalidate={}".format(
+        secondes_avant_rafraichissement(maintenant),
+        int(os.getenv("HTTP_CACHE_STALE_WHILE_REVALIDATE", "300"))
+    )
+
+
+def cache_control_court():
+    """
+    Donnée de repli (fournisseur indisponible) ou liste incomplète : cache bref pour réessayer bientôt.
+    """
+    return "public, max-age={}".format(int(os.getenv("HTTP_CACHE_SHORT_MAX_AGE", "60")))
+
+
+def cache_control_immuable():
+    """
+    Donnée entièrement passée : elle ne changera plus.
+    """
+    return "public, max-age={}, immutable".format(int(os.getenv("HTTP_CACHE_IMMUTABLE_MAX_AGE", "31536000")))
+
+
+def aujourdhui():
+    return datetime.now(UTC).strftime("%Y-%m-%d")
+
+
+def cache_control_pour_date(date_donnee):
+    """
+    Cache-Control d'un document quotidien : frais s'il date d'aujourd'hui, court s'il s'agit d'un repli.
+    """
+    if date_donnee and date_donnee >= aujourdhui():
+        return cache_control_frais()
+    return cache_control_court()
+
+
+def est_periode_passee(date_fin):
+    """
+    Indique si une période se termine strictement avant aujourd'hui (UTC).
+    """
+    return date_vers_datetime(date_fin) is not None and date_fin < aujourdhui()
+
+
+def cache_control_liste(elements):
+    """
+    Cache-Control d'une liste populaire : court si un élément manque encore.
+    """
+    if any(isinstance(e, dict) and e.get("manquant") for e in elements):
+        return cache_control_court()
+    return cache_control_frais()
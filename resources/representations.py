@@ -0,0 +1,95 @@
+import json
+import math
+import os
+from itertools import chain
+from flask import Response, make_response, request
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur le module json standard
+    orjson = None
+
+
+def _nettoyer(objet):
+    """
+    Remplace récursivement NaN et ±Infini par None (le JSON standard ne les accepte pas).
+    """
+    if isinstance(objet, float):
+        return objet if math.isfinite(objet) else None
+    if isinstance(objet, dict):
+        return {cle: _nettoyer(valeur) for cle, valeur in objet.items()}
+    if isinstance(objet, (list, tuple)):
+        return [_nettoyer(valeur) for valeur in objet]
+    return objet
+
+
+def encoder_json_standard(data):
+    """
+    Encodage avec le module json standard (NaN et Infini encodés en null).
+    """
+    return json.dumps(_nettoyer(data), ensure_ascii=False, allow_nan=False, default=str).encode("utf-8")
+
+
+def encoder_json_rapide(data):
+    """
+    Encodage avec orjson (NaN et Infini encodés en null nativement).
+    """
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def choisir_encodeur():
+    """
+    Encodeur choisi par JSON_ENCODER : "orjson", "json", ou "auto" (orjson s'il est installé).
+    """
+    choix = os.getenv("JSON_ENCODER", "auto").lower()
+    if choix == "json" or orjson is None:
+        return encoder_json_standard
+    return encoder_json_rapide
+
+
+encoder_json = choisir_encodeur()
+
+
+def output_json(data, code, headers=None):
+    """
+    Représentation application/json des ressources Flask-RESTful.
+    """
+    resp = make_response(encoder_json(data), code)
+    resp.headers.extend(headers or {})
+    resp.mimetype = "application/json"
+    return resp
+
+
+NDJSON = "application/x-ndjson"
+
+
+def preferer_ndjson():
+    """
+    Indique si le client demande un flux NDJSON (Accept: application/x-ndjson) plutôt que du JSON.
+    """
+    return request.accept_mimetypes.best_match(["application/json", NDJSON]) == NDJSON
+
+
+def reponse_ndjson(objets, serialiser, entetes=None, taille_lot=None):
+    """
+    Réponse en flux NDJSON : un enregistrement par ligne, écrit par lots de taille_lot lignes
+    au fil de l'itération (mémoire constante quelle que soit la longueur de la période).
+    Retourne None si `objets` est vide.
+    """
+    taille_lot = taille_lot or int(os.getenv("HISTORY_STREAM_BATCH_SIZE", "500"))
+    objets = iter(objets)
+    premier = next(objets, None)
+    if premier is None:
+        return None
+
+    def lignes():
+        lot = []
+        for objet in chain([premier], objets):
+            lot.append(encoder_json(serialiser(objet)))
+            if len(lot) >= taille_lot:
+                yield b"\n".join(lot) + b"\n"
+                lot = []
+        if lot:
+            yield b"\n".join(lot) + b"\n"
+
+    return Response(lignes(), status=200, headers=entetes, mimetype=NDJSON)
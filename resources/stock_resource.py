@@ -2,7 +2,13 @@ from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.stock_service import StockService
-import os
+from models.stock import Action
+from resources.representations import preferer_ndjson, reponse_ndjson
+from resources.http_cache import (
+    calculer_etag, entetes_validation, est_non_modifie, reponse_non_modifiee,
+    cache_control_court, cache_control_frais, cache_control_immuable, cache_control_liste, cache_control_pour_date,
+    est_periode_passee
+)
 
 class ActionRessource(Resource):
     def __init__(self):
@@ -11,8 +17,21 @@ class ActionRessource(Resource):
     def get(self, symbole):
         # Obtenir les données d'une action pour un symbole donné
         date = request.args.get("date")
-        result = self.service.obtenir_action(symbole.upper(), date)
-        return result, 200 if isinstance(result, dict) and "message" not in result else result[1]
+        action = self.service.charger_action(symbole.upper(), date)
+        if not isinstance(action, Action):
+            return action
+        # Réponse 304 si le client a déjà ce document (avant toute sérialisation)
+        etag = calculer_etag(action.symbole, action.id, action.date)
+        entetes = entetes_validation(etag, action.date)
+        # Une cotation passée demandée explicitement ne changera plus ; une cotation de repli
+        # (pas celle du jour) n'est gardée que brièvement
+        if date == action.date and est_periode_passee(date):
+            entetes["Cache-Control"] = cache_control_immuable()
+        else:
+            entetes["Cache-Control"] = cache_control_pour_date(action.date)
+        if est_non_modifie(etag, action.date):
+            return reponse_non_modifiee(entetes)
+        return self.service.serialiseur.dump(action), 200, entetes
 
 class CalculerAchatRessource(Resource):
     method_decorators = [jwt_required()]
@@ -37,22 +56,9 @@ class PopulairesActionsRessource(Resource):
         self.service = StockService()
 
     def get(self):
-        popular = [s.strip().upper() for s in os.getenv("POPULAR_STOCKS", "AAPL,MSFT,GOOGL,AMZN,TSLA").split(",")]
-        results = []
-        for symbole in popular:
-            res = self.service.obtenir_action(symbole)
-            # Si la réponse est un dictionnaire avec le symbole, on l'ajoute à la liste des résultats
-            if isinstance(res, dict) and "symbole" in res:
-                results.append(res)
-            elif isinstance(res, tuple) and res[1] == 404:
-                # Tentative de récupérer l'action depuis l'API si elle n'est pas trouvée
-                latest_dates = self.service.repo.get_all_dates_for_symbol(symbole)
-                if latest_dates:
-                    latest_date = sorted(latest_dates, reverse=True)[0]
-                    action = self.service.repo.chercher_par_symbole_et_date(symbole, latest_date)
-                    if action:
-                        results.append(self.service.schema.dump(action))
-        return results, 200
+        # Retourne les actions les plus populaires
+        result = self.service.obtenir_actions_populaires()
+        return result, 200, {"Cache-Control": cache_control_liste(result)}
 
 class FavorisActionsRessource(Resource):
     method_decorators = [jwt_required()]
@@ -91,14 +97,66 @@ class ActionHistoriqueRessource(Resource):
         nb_jours = request.args.get("jours", type=int)
         date_debut = request.args.get("date_debut")
         date_fin = request.args.get("date_fin")
+        format_ = request.args.get("format", "lignes")
+        if format_ not in ("lignes", "colonnes"):
+            return {"message": "Paramètre 'format' invalide (lignes ou colonnes)."}, 400
         if nb_jours:
             if nb_jours < 4:
                 return {"message": "Le nombre de jours doit être au moins 4."}, 400
-            result = self.service.obtenir_historique(symbole.upper(), nb_jours)
-        elif date_debut and date_fin:
-            result = self.service.obtenir_historique_periode(symbole.upper(), date_debut, date_fin)
-        else:
+        elif not (date_debut and date_fin):
             return {"message": "Paramètres manquants ou invalides."}, 400
+        if format_ == "colonnes":
+            return self._get_colonnes(symbole.upper(), nb_jours, date_debut, date_fin)
+        cache_control = self._cache_control_periode(symbole.upper(), nb_jours, date_fin)
+        if preferer_ndjson():
+            # Flux NDJSON : le curseur est parcouru par lots, sans liste complète en mémoire
+            if nb_jours:
+                actions = self.service.iterer_historique(symbole.upper(), nb_jours)
+            else:
+                actions = self.service.iterer_historique_periode(symbole.upper(), date_debut, date_fin)
+            reponse = reponse_ndjson(actions, self.service.serialiseur.dump,
+                                     {"Cache-Control": cache_control, "Vary": "Accept"})
+            if reponse is None:
+                return {"message": "Aucune donnée disponible pour cette période."}, 404
+            return reponse
+
+        if nb_jours:
+            result = self.service.charger_historique(symbole.upper(), nb_jours)
+        else:
+            result = self.service.charger_historique_periode(symbole.upper(), date_debut, date_fin)
         if not result:
             return {"message": "Aucune donnée disponible pour cette période."}, 404
-        return result, 200
\ No newline at end of file
+        etag = calculer_etag(symbole.upper(), *(a.id for a in result))
+        date_modif = max(a.date for a in result)
+        entetes = entetes_validation(etag, date_modif)
+        entetes["Cache-Control"] = cache_control
+        entetes["Vary"] = "Accept"
+        if est_non_modifie(etag, date_modif):
+            return reponse_non_modifiee(entetes)
+        return self.service.serialiseur.dump(result, many=True), 200, entetes
+
+    def _cache_control_periode(self, symbole, nb_jours, date_fin):
+        # Les historiques ne déclenchent pas de synchronisation : une période passée n'est immuable
+        # que si une barre postérieure (ou le filigrane de synchronisation) confirme qu'elle est complète
+        if nb_jours or not est_periode_passee(date_fin):
+            return cache_control_frais()
+        if self.service.periode_complete(symbole, date_fin):
+            return cache_control_immuable()
+        return cache_control_court()
+
+    def _get_colonnes(self, symbole, nb_jours, date_debut, date_fin):
+        # Format colonnes : un seul symbole puis un tableau par champ, lu directement depuis le curseur
+        if nb_jours:
+            colonnes = self.service.charger_historique_colonnes(symbole, nb_jours)
+        else:
+            colonnes = self.service.charger_historique_periode_colonnes(symbole, date_debut, date_fin)
+        if not colonnes["date"]:
+            return {"message": "Aucune donnée disponible pour cette période."}, 404
+        # (symbole, date) est unique et une cotation n'est jamais modifiée : les dates identifient le contenu
+        etag = calculer_etag(symbole, "colonnes", *colonnes["date"])
+        date_modif = colonnes["date"][-1]
+        entetes = entetes_validation(etag, date_modif)
+        entetes["Cache-Control"] = self._cache_control_periode(symbole, nb_jours, date_fin)
+        if est_non_modifie(etag, date_modif):
+            return reponse_non_modifiee(entetes)
+        return colonnes, 200, entetes
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+from urllib.parse import urlencode
 from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required
@@ -9,8 +11,25 @@ class UtilisateurListRessource(Resource):
         self.service = UserService()
 
     def get(self):
-        # Récupérer tous les utilisateurs
-        return self.service.get_all(), 200
+        # Récupérer une page d'utilisateurs (pagination par clé : limit, after)
+        limite_max = int(os.getenv("USERS_PAGE_MAX_LIMIT", "1000"))
+        limite = request.args.get("limit", default=int(os.getenv("USERS_PAGE_DEFAULT_LIMIT", "100")), type=int)
+        if not 1 <= limite <= limite_max:
+            return {"message": f"Paramètre 'limit' invalide (entre 1 et {limite_max})."}, 400
+        apres = request.args.get("after")
+        avec_total = request.args.get("total", "false").lower() == "true"
+
+        result = self.service.lister(limite, apres, avec_total)
+        if isinstance(result[0], dict):
+            return result
+        utilisateurs, suivant, total = result
+        entetes = {}
+        if suivant:
+            entetes["X-Next-Cursor"] = suivant
+            entetes["Link"] = f'<{request.base_url}?{urlencode({"limit": limite, "after": suivant})}>; rel="next"'
+        if total is not None:
+            entetes["X-Total-Count"] = str(total)
+        return utilisateurs, 200, entetes
 
     def post(self):
         # Créer un nouvel utilisateur
@@ -34,6 +53,8 @@ class UtilisateurRessource(Resource):
         # Mettre à jour un utilisateur
         data = request.get_json()
         updated = self.service.update(id, data)
+        if isinstance(updated, tuple):
+            return updated
         if updated:
             return {"message": "Utilisateur mis à jour"}, 200
         return {"message": "Utilisateur non trouvé"}, 404
@@ -0,0 +1,102 @@
+from functools import lru_cache
+from marshmallow import fields
+
+_MANQUANT = object()
+
+
+def _expression(champ):
+    """
+    Expression Python sérialisant une valeur `v` non nulle, identique à champ._serialize,
+    ou None si le type de champ n'est pas spécialisé.
+    """
+    type_champ = type(champ)
+    if type_champ in (fields.String, fields.Email, fields.Url):
+        return "v if type(v) is str else _ensure_text(v)"
+    if type_champ is fields.Float and not champ.as_string:
+        return "float(v)"
+    if type_champ is fields.Integer and not champ.as_string:
+        return "int(v)"
+    if (type_champ is fields.Dict and type(champ.key_field) is fields.String
+            and type(champ.value_field) is fields.Float and not champ.value_field.as_string):
+        return "{str(k): (None if x is None else float(x)) for k, x in v.items()}"
+    return None
+
+
+def _ensure_text(valeur):
+    if isinstance(valeur, bytes):
+        return valeur.decode("utf-8")
+    return str(valeur)
+
+
+class SerialiseurCompile:
+    """
+    Sérialiseur généré à partir d'un schéma marshmallow, pour les objets de nos propres dépôts.
+    Produit la même sortie que schema.dump (champs dump, data_key, attribute, valeurs manquantes
+    omises) sans la répartition champ par champ de marshmallow. Pas de validation.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        # Les hooks (post_dump, ...) ne sont pas reproduits : ces schémas restent sur marshmallow
+        self.compile = not any(getattr(schema, "_hooks", {}).values())
+        self._dump_un = self._generer(schema) if self.compile else None
+
+    @staticmethod
+    def _generer(schema):
+        contexte = {"_MANQUANT": _MANQUANT, "_ensure_text": _ensure_text}
+        lignes = ["def dump_un(obj):", "    d = {}"]
+        for index, (nom, champ) in enumerate(schema.dump_fields.items()):
+            contexte[f"_c{index}"] = champ
+            attribut = champ.attribute or nom
+            cle = champ.data_key if champ.data_key is not None else nom
+            expression = _expression(champ)
+            if expression is None:
+                # Type non spécialisé : délégation au champ marshmallow
+                valeur = f"_c{index}._serialize(v, {attribut!r}, obj)"
+            else:
+                valeur = f"None if v is None else {expression}"
+            lignes += [
+                f"    v = getattr(obj, {attribut!r}, _MANQUANT)",
+                "    if v is not _MANQUANT:",
+                f"        d[{cle!r}] = {valeur}",
+            ]
+        lignes.append("    return d")
+        exec("\n".join(lignes), contexte)
+        return contexte["dump_un"]
+
+    def dump(self, obj, many=False):
+        """
+        Même signature que Schema.dump. Les dictionnaires (non générés) passent par marshmallow.
+        """
+        if not self.compile:
+            return self.schema.dump(obj, many=many)
+        if many:
+            dump_un = self._dump_un
+            return [self.schema.dump(o) if isinstance(o, dict) else dump_un(o) for o in obj]
+        if isinstance(obj, dict):
+            return self.schema.dump(obj)
+        return self._dump_un(obj)
+
+
+_compiles = {}
+
+
+def compiler(schema):
+    """
+    Retourne le sérialiseur compilé d'une instance de schéma.
+    Le code généré est partagé par classe de schéma (les services sont instanciés à chaque requête).
+    """
+    if schema.only is not None or schema.exclude:
+        return SerialiseurCompile(schema)
+    serialiseur = _compiles.get(type(schema))
+    if serialiseur is None:
+        serialiseur = _compiles.setdefault(type(schema), SerialiseurCompile(schema))
+    return serialiseur
+
+
+@lru_cache(maxsize=256)
+def compiler_projection(classe_schema, champs):
+    """
+    Sérialiseur compilé limité aux champs demandés (tuple), partagé entre les requêtes.
+    """
+    return SerialiseurCompile(classe_schema(only=champs))
@@ -1,9 +1,17 @@
 import os
-import requests
 from datetime import datetime, UTC, timedelta
 from repositories.company_repository import SocieteRepository
+from repositories.snapshot_repository import InstantaneRepository
 from models.company import Societe
 from schemas.company import SocieteSchema
+from schemas.serialiseur import compiler, compiler_projection
+from services.upstream import get_client_amont
+from services.single_flight import vols_amont
+from services.fetch_lease import BailImport
+from services.fan_out import executer_en_parallele, message_erreur, EN_RETARD
+
+# Champs toujours renvoyés avec fields= : ils identifient la société et la version
+CHAMPS_TOUJOURS = ("symbole", "date_maj")
 
 class SocieteService:
     """
@@ -12,28 +20,88 @@ class SocieteService:
 
     def __init__(self):
         self.repo = SocieteRepository()
+        self.instantanes = InstantaneRepository()
         self.schema = SocieteSchema()
+        # Sérialisation générée (même sortie que self.schema.dump, sans validation)
+        self.serialiseur = compiler(self.schema)
         self.api_key = os.getenv("API_KEY_FMP")
         self.api_url = os.getenv("FMP_PROFILE_API_URL", "https://financialmodelingprep.com/stable/profile")
+        self.client_amont = get_client_amont("fmp")
+        self.bail = BailImport()
 
     def _get_today_str(self):
         return datetime.now(UTC).strftime("%Y-%m-%d")
 
+    def analyser_champs(self, valeur):
+        """
+        Convertit le paramètre fields=price,change,image en tuple de champs dans l'ordre du schéma
+        (symbole et date_maj toujours inclus), ou None s'il est absent. ValueError si un champ est inconnu.
+        """
+        if not valeur:
+            return None
+        demandes = {champ.strip() for champ in valeur.split(",") if champ.strip()}
+        inconnus = demandes - set(self.schema.dump_fields)
+        if inconnus:
+            raise ValueError(f"Champs inconnus : {', '.join(sorted(inconnus))}.")
+        demandes.update(CHAMPS_TOUJOURS)
+        return tuple(champ for champ in self.schema.dump_fields if champ in demandes)
+
+    def serialiseur_pour(self, champs):
+        """
+        Sérialiseur limité aux champs demandés (tous si champs vaut None).
+        """
+        return self.serialiseur if champs is None else compiler_projection(SocieteSchema, champs)
+
     def obtenir_societe(self, symbole):
         """
         Récupère les informations d'une société pour aujourd'hui.
         1. Cherche dans la base par symbole et date_maj.
         2. Si non trouvée, requête à l'API FMP, sauvegarde et retourne.
         """
+        societe = self.charger_societe(symbole)
+        return self.serialiseur.dump(societe) if isinstance(societe, Societe) else societe
+
+    def charger_societe(self, symbole, champs=None):
+        """
+        Comme obtenir_societe, mais retourne l'objet Societe (ou l'erreur) sans le sérialiser.
+        Avec `champs`, seuls ces champs sont lus en base (l'import depuis l'API reste complet).
+        """
         date_maj = self._get_today_str()
-        societe = self.repo.chercher_par_symbole_et_date(symbole, date_maj)
+        societe = self.repo.chercher_par_symbole_et_date(symbole, date_maj, champs)
+        if societe:
+            return societe
+
+        # Une seule requête à l'API par symbole, partagée entre les appels concurrents
+        return vols_amont.executer(("fmp", symbole), lambda: self._importer_societe(symbole, date_maj))
+
+    def _importer_societe(self, symbole, date_maj):
+        """
+        Importe la société du jour. Un seul worker appelle l'API (bail partagé en base),
+        les autres attendent son résultat ou servent la dernière version connue.
+        """
+        return self.bail.executer(
+            f"fmp:{symbole}:{date_maj}",
+            importer=lambda: self._telecharger_societe(symbole, date_maj),
+            relire=lambda: self._relire_societe(symbole, date_maj),
+            repli=lambda: self._derniere_societe_connue(symbole)
+        )
+
+    def _relire_societe(self, symbole, date_maj):
+        return self.repo.chercher_par_symbole_et_date(symbole, date_maj)
+
+    def _derniere_societe_connue(self, symbole):
+        societe = self.repo.chercher_derniere(symbole)
         if societe:
-            return self.schema.dump(societe)
+            return societe
+        return {"message": "Erreur lors de la récupération des données société."}, 502
 
+    def _telecharger_societe(self, symbole, date_maj):
+        """
+        Récupère la société depuis l'API FMP, la sauvegarde et la retourne.
+        """
         # Requête à l'API FMP
-        url = f"{self.api_url}?symbol={symbole}&apikey={self.api_key}"
-        response = requests.get(url)
-        if response.status_code != 200:
+        response = self.client_amont.get(self.api_url, params={"symbol": symbole, "apikey": self.api_key})
+        if response is None or response.status_code != 200:
             return {"message": "Erreur lors de la récupération des données société."}, 502
 
         data = response.json()
@@ -81,28 +149,80 @@ class SocieteService:
             isFund=societe_data.get("isFund")
         )
         self.repo.creer(societe)
-        return self.schema.dump(societe)
+        if societe.symbole in self._societes_populaires():
+            # La liste populaire du jour sera reconstruite avec cette nouvelle société
+            self.instantanes.invalider("societes", date_maj)
+        return societe
 
     def obtenir_historique(self, symbole, nb_jours):
         """
         Récupère l'historique des informations société pour les derniers nb_jours jours.
         """
+        return self.serialiseur.dump(self.charger_historique(symbole, nb_jours), many=True)
+
+    def charger_historique(self, symbole, nb_jours, champs=None):
         dates = [(datetime.now(UTC) - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(nb_jours)]
-        records = self.repo.lire_historique_par_symbole(symbole, dates)
-        return self.schema.dump(records, many=True)
+        return self.repo.lire_historique_par_symbole(symbole, dates, champs)
 
     def obtenir_historique_periode(self, symbole, date_debut, date_fin):
         """
         Récupère l'historique des informations société pour une période donnée.
         """
-        records = self.repo.lire_historique_sur_periode(symbole, date_debut, date_fin)
-        return self.schema.dump(records, many=True)
+        return self.serialiseur.dump(self.charger_historique_periode(symbole, date_debut, date_fin), many=True)
+
+    def charger_historique_periode(self, symbole, date_debut, date_fin, champs=None):
+        return self.repo.lire_historique_sur_periode(symbole, date_debut, date_fin, champs)
+
+    def iterer_historique(self, symbole, nb_jours, champs=None):
+        """
+        Itère l'historique des nb_jours derniers jours (flux NDJSON), sans le charger en mémoire.
+        """
+        date_fin = datetime.now(UTC)
+        date_debut = date_fin - timedelta(days=nb_jours - 1)
+        return self.iterer_historique_periode(
+            symbole, date_debut.strftime("%Y-%m-%d"), date_fin.strftime("%Y-%m-%d"), champs
+        )
 
-    def obtenir_societes_populaires(self):
-        popular = [s.strip().upper() for s in os.getenv("POPULAR_COMPANIES", "AAPL,MSFT,GOOGL,AMZN,TSLA").split(",")]
+    def iterer_historique_periode(self, symbole, date_debut, date_fin, champs=None):
+        return self.repo.iterer_historique_sur_periode(
+            symbole, date_debut, date_fin, int(os.getenv("HISTORY_STREAM_BATCH_SIZE", "500")), champs
+        )
+
+    def periode_complete(self, symbole, date_fin):
+        """
+        Indique si l'historique jusqu'à date_fin ne peut plus changer : seule la cotation du jour
+        est importée, donc une cotation enregistrée après date_fin clôt la période.
+        """
+        derniere = self.repo.chercher_date_derniere(symbole)
+        return derniere is not None and date_fin < derniere
+
+    def _societes_populaires(self):
+        return [s.strip().upper() for s in os.getenv("POPULAR_COMPANIES", "AAPL,MSFT,GOOGL,AMZN,TSLA").split(",")]
+
+    def obtenir_societes_populaires(self, reconstruire=False, champs=None):
+        """
+        Récupère les sociétés populaires (POPULAR_COMPANIES) depuis l'instantané du jour,
+        ou en parallèle si l'instantané n'existe pas encore (ou si reconstruire est vrai).
+        Les sociétés non obtenues avant l'échéance sont signalées comme manquantes.
+        Avec `champs`, chaque société est limitée à ces champs (projetés dès la lecture de l'instantané).
+        """
+        date_today = self._get_today_str()
+        instantane = None if reconstruire else self.instantanes.lire("societes", date_today, champs)
+        if instantane is not None:
+            return instantane
         results = []
-        for symbole in popular:
-            res = self.obtenir_societe(symbole)
-            if isinstance(res, dict) and "symbole" in res:
+        for symbole, res in executer_en_parallele(self.obtenir_societe, self._societes_populaires()):
+            if res is EN_RETARD:
+                results.append({"symbole": symbole, "manquant": True, "message": "Délai dépassé, société en cours de récupération."})
+            elif isinstance(res, dict) and "symbole" in res:
                 results.append(res)
+            else:
+                # Erreur (404, 502) ou échec : signalée, pour ne jamais enregistrer une liste partielle
+                results.append({"symbole": symbole, "manquant": True, "message": message_erreur(res, "Société indisponible.")})
+        # L'instantané n'est enregistré que s'il est complet
+        if results and not any(r.get("manquant") for r in results):
+            self.instantanes.enregistrer("societes", date_today, results)
+        if champs is not None:
+            gardes = set(champs) | {"manquant", "message"}
+            results = [{cle: valeur for cle, valeur in r.items() if cle in gardes} for r in results]
         return results
\ No newline at end of file
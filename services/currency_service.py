@@ -1,9 +1,14 @@
 import os
-import requests
 from datetime import datetime, UTC, timedelta
 from repositories.currency_repository import CurrencyRepository
+from repositories.snapshot_repository import InstantaneRepository
 from models.currency import Devise
 from schemas.currency import DeviseSchema
+from schemas.serialiseur import compiler
+from services.upstream import get_client_amont
+from services.single_flight import vols_amont
+from services.fetch_lease import BailImport
+from services.fan_out import executer_en_parallele, message_erreur, EN_RETARD
 
 class CurrencyService:
     """
@@ -12,10 +17,15 @@ class CurrencyService:
 
     def __init__(self):
         self.repo = CurrencyRepository()
+        self.instantanes = InstantaneRepository()
         self.schema = DeviseSchema()
+        # Sérialisation générée (même sortie que self.schema.dump, sans validation)
+        self.serialiseur = compiler(self.schema)
         self.api_key = os.getenv("API_KEY_ERAPI")
         self.base_currency = os.getenv("BASE_CURRENCY")
         self.api_url = os.getenv("EXCHANGERATE_API_URL")
+        self.client_amont = get_client_amont("exchangerate")
+        self.bail = BailImport()
 
     def _get_today_str(self):
         return datetime.now(UTC).strftime("%Y-%m-%d")
@@ -33,15 +43,49 @@ class CurrencyService:
         """
         Récupère la devise pour aujourd'hui, depuis la base ou l'API si besoin.
         """
+        devise = self.charger_devise(nom)
+        return self.serialiseur.dump(devise) if isinstance(devise, Devise) else devise
+
+    def charger_devise(self, nom):
+        """
+        Comme obtenir_devise, mais retourne l'objet Devise (ou l'erreur) sans le sérialiser.
+        """
         date_maj = self._get_today_str()
         devise = self.repo.chercher_par_nom_et_date(nom, date_maj)
         if devise:
-            return self.schema.dump(devise)
+            return devise
+
+        # Si non trouvée, une seule requête à l'API par devise, partagée entre les appels concurrents
+        return vols_amont.executer(("exchangerate", nom), lambda: self._importer_devise(nom, date_maj))
+
+    def _importer_devise(self, nom, date_maj):
+        """
+        Importe la devise du jour. Un seul worker appelle l'API (bail partagé en base),
+        les autres attendent son résultat ou servent la dernière devise connue.
+        """
+        return self.bail.executer(
+            f"exchangerate:{nom}:{date_maj}",
+            importer=lambda: self._telecharger_devise(nom),
+            relire=lambda: self._relire_devise(nom, date_maj),
+            repli=lambda: self._derniere_devise_connue(nom)
+        )
+
+    def _relire_devise(self, nom, date_maj):
+        return self.repo.chercher_par_nom_et_date(nom, date_maj)
+
+    def _derniere_devise_connue(self, nom):
+        devise = self.repo.chercher_derniere(nom)
+        if devise:
+            return devise
+        return {"message": "Erreur lors de la récupération des taux de change."}, 502
 
-        # Si non trouvée, requête à l'API ExchangeRate
+    def _telecharger_devise(self, nom):
+        """
+        Récupère la devise depuis l'API ExchangeRate, la sauvegarde et la retourne.
+        """
         url = f"{self.api_url}/{self.api_key}/latest/{nom}"
-        response = requests.get(url)
-        if response.status_code != 200:
+        response = self.client_amont.get(url)
+        if response is None or response.status_code != 200:
             return {"message": "Erreur lors de la récupération des taux de change."}, 502
 
         data = response.json()
@@ -56,7 +100,7 @@ class CurrencyService:
         # Vérifier à nouveau si la devise existe (race condition possible)
         devise = self.repo.chercher_par_nom_et_date(base_code, date_maj)
         if devise:
-            return self.schema.dump(devise)
+            return devise
 
         # Ajouter la devise à la base de données
         devise = Devise(
@@ -67,24 +111,78 @@ class CurrencyService:
             conversion_rates=conversion_rates
         )
         self.repo.creer(devise)
-        return self.schema.dump(devise)
+        if base_code in self._devises_populaires():
+            # La liste populaire du jour sera reconstruite avec cette nouvelle devise
+            self.instantanes.invalider("devises", self._get_today_str())
+        return devise
+
+    def _devises_populaires(self):
+        return [c.strip().upper() for c in os.getenv("POPULAR_CURRENCIES", "USD,EUR,GBP,JPY,CAD").split(",")]
+
+    def obtenir_devises_populaires(self, reconstruire=False):
+        """
+        Récupère les devises populaires (POPULAR_CURRENCIES) depuis l'instantané du jour,
+        ou en parallèle si l'instantané n'existe pas encore (ou si reconstruire est vrai).
+        Les devises non obtenues avant l'échéance sont signalées comme manquantes.
+        """
+        date_today = self._get_today_str()
+        instantane = None if reconstruire else self.instantanes.lire("devises", date_today)
+        if instantane is not None:
+            return instantane
+        results = []
+        for code, result in executer_en_parallele(self.obtenir_devise, self._devises_populaires()):
+            if result is EN_RETARD:
+                results.append({"nom": code, "manquant": True, "message": "Délai dépassé, devise en cours de récupération."})
+            elif isinstance(result, dict) and "nom" in result:
+                results.append(result)
+            else:
+                # Erreur (404, 502) ou échec : signalée, pour ne jamais enregistrer une liste partielle
+                results.append({"nom": code, "manquant": True, "message": message_erreur(result, "Devise indisponible.")})
+        # L'instantané n'est enregistré que s'il est complet
+        if results and not any(r.get("manquant") for r in results):
+            self.instantanes.enregistrer("devises", date_today, results)
+        return results
 
     def obtenir_historique(self, nom, nb_jours):
         """
         Récupère l'historique des taux de change d'une devise pour les derniers nb_jours jours.
         """
-        today = datetime.now(UTC).strftime("%Y-%m-%d")
+        return self.serialiseur.dump(self.charger_historique(nom, nb_jours), many=True)
+
+    def charger_historique(self, nom, nb_jours):
         dates = [(datetime.now(UTC) - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(nb_jours)]
-        records = self.repo.lire_historique_par_nom(nom, dates)
-        return self.schema.dump(records, many=True)
+        return self.repo.lire_historique_par_nom(nom, dates)
 
     def obtenir_historique_periode(self, nom, date_debut, date_fin):
         """
         Récupère l'historique des taux de change d'une devise pour une période donnée
         """
-        records = self.repo.lire_historique_sur_periode(nom, date_debut, date_fin)
-        return self.schema.dump(records, many=True)
+        return self.serialiseur.dump(self.charger_historique_periode(nom, date_debut, date_fin), many=True)
 
+    def charger_historique_periode(self, nom, date_debut, date_fin):
+        return self.repo.lire_historique_sur_periode(nom, date_debut, date_fin)
+
+    def iterer_historique(self, nom, nb_jours):
+        """
+        Itère l'historique des nb_jours derniers jours (flux NDJSON), sans le charger en mémoire.
+        """
+        date_fin = datetime.now(UTC)
+        date_debut = date_fin - timedelta(days=nb_jours - 1)
+        return self.iterer_historique_periode(nom, date_debut.strftime("%Y-%m-%d"), date_fin.strftime("%Y-%m-%d"))
+
+    def iterer_historique_periode(self, nom, date_debut, date_fin):
+        return self.repo.iterer_historique_sur_periode(
+            nom, date_debut, date_fin, int(os.getenv("HISTORY_STREAM_BATCH_SIZE", "500"))
+        )
+
+
+    def periode_complete(self, nom, date_fin):
+        """
+        Indique si l'historique jusqu'à date_fin ne peut plus changer : seule la devise du jour
+        est importée, donc une devise enregistrée après date_fin clôt la période.
+        """
+        derniere = self.repo.chercher_date_derniere(nom)
+        return derniere is not None and date_fin < derniere
 
     def convertir(self, code_source, code_cible, montant):
         """
@@ -96,7 +194,7 @@ class CurrencyService:
         date_maj = self._get_today_str()
         devise = self.repo.chercher_par_nom_et_date(code_source, date_maj)
         if not devise:
-            self.obtenir_devise(code_source)
+            self.charger_devise(code_source)
             devise = self.repo.chercher_par_nom_et_date(code_source, date_maj)
             if not devise:
                 return {"message": "Taux de change non disponible."}, 404
@@ -0,0 +1,62 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Marqueur des éléments qui n'ont pas été résolus avant l'échéance
+EN_RETARD = object()
+
+_verrou = threading.Lock()
+_executeur = None
+_pid = None
+
+
+def get_executeur():
+    """
+    Retourne le pool de threads partagé (borné par POPULAR_MAX_WORKERS), recréé après un fork.
+    """
+    global _executeur, _pid
+    if _executeur is not None and _pid == os.getpid():
+        return _executeur
+    with _verrou:
+        if _executeur is None or _pid != os.getpid():
+            _executeur = ThreadPoolExecutor(
+                max_workers=int(os.getenv("POPULAR_MAX_WORKERS", "8")),
+                thread_name_prefix="fan-out"
+            )
+            _pid = os.getpid()
+    return _executeur
+
+
+def executer_en_parallele(fonction, cles, delai=None, executeur=None):
+    """
+    Appelle fonction(cle) pour chaque clé sur le pool partagé (ou `executeur`) et attend au plus `delai` secondes.
+    Retourne [(cle, resultat), ...] dans l'ordre des clés ; resultat vaut EN_RETARD si l'appel
+    n'est pas terminé à l'échéance (il continue en arrière-plan), ou None s'il a échoué.
+    """
+    if delai is None:
+        delai = float(os.getenv("POPULAR_DEADLINE_SECONDS", "8"))
+    executeur = executeur or get_executeur()
+    futures = [(cle, executeur.submit(fonction, cle)) for cle in cles]
+    wait([future for _, future in futures], timeout=delai)
+    resultats = []
+    for cle, future in futures:
+        if not future.done():
+            resultats.append((cle, EN_RETARD))
+        elif future.exception() is not None:
+            logger.error("Échec de la récupération de %s : %s", cle, future.exception())
+            resultats.append((cle, None))
+        else:
+            resultats.append((cle, future.result()))
+    return resultats
+
+
+def message_erreur(resultat, defaut):
+    """
+    Message d'un résultat en erreur ((corps, code) retourné par un service), ou le message par défaut.
+    """
+    if isinstance(resultat, tuple) and resultat and isinstance(resultat[0], dict):
+        return resultat[0].get("message", defaut)
+    return defaut
@@ -0,0 +1,49 @@
+import os
+import time
+import uuid
+from repositories.lease_repository import VerrouRepository
+
+
+class BailImport:
+    """
+    Coordonne les imports depuis les fournisseurs externes entre tous les workers.
+    Le worker qui obtient le bail d'une clé fait l'appel à l'API ; les autres attendent
+    que le document apparaisse en base, ou servent le dernier document connu.
+    """
+
+    def __init__(self):
+        self.repo = VerrouRepository()
+        self.duree = float(os.getenv("LEASE_DURATION_SECONDS", "60"))
+        self.attente_max = float(os.getenv("LEASE_WAIT_SECONDS", "15"))
+        self.intervalle = float(os.getenv("LEASE_POLL_INTERVAL_SECONDS", "0.25"))
+
+    def executer(self, cle, importer, relire, repli):
+        """
+        - importer() : appelle l'API et sauvegarde le résultat (exécuté par le détenteur du bail) ;
+        - relire() : retourne le document déjà importé, ou None ;
+        - repli() : résultat à servir si l'import d'un autre worker n'aboutit pas (dernier document connu).
+        """
+        proprietaire = f"{os.getpid()}:{uuid.uuid4().hex}"
+        if self.repo.acquerir(cle, proprietaire, self.duree):
+            try:
+                # Un autre worker a pu terminer l'import juste avant que le bail ne soit libéré
+                resultat = relire()
+                if resultat is not None:
+                    return resultat
+                return importer()
+            finally:
+                self.repo.liberer(cle, proprietaire)
+
+        # Un autre worker importe cette clé : attendre son résultat
+        fin = time.monotonic() + self.attente_max
+        while time.monotonic() < fin:
+            time.sleep(self.intervalle)
+            resultat = relire()
+            if resultat is not None:
+                return resultat
+            if not self.repo.est_actif(cle):
+                break
+        resultat = relire()
+        if resultat is not None:
+            return resultat
+        return repli()
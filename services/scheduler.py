@@ -0,0 +1,152 @@
+import logging
+import os
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, UTC
+from services.fan_out import executer_en_parallele
+
+logger = logging.getLogger(__name__)
+
+
+class PlanificateurRafraichissement:
+    """
+    Rafraîchit en arrière-plan les devises, actions et sociétés populaires ainsi que
+    les favoris des utilisateurs, pour que les requêtes interactives trouvent la donnée
+    du jour déjà en base.
+
+    - Exécution régulière toutes les REFRESH_INTERVAL_SECONDS (± REFRESH_JITTER_SECONDS).
+    - Préchauffage juste après la bascule du jour UTC (REFRESH_ROLLOVER_DELAY_SECONDS,
+      plus un jitter) : une exécution régulière qui tomberait dans la fenêtre
+      REFRESH_ROLLOVER_WINDOW_SECONDS précédant la bascule est remplacée par ce préchauffage.
+    - Les actions (quota Alpha Vantage) ne sont rafraîchies qu'au préchauffage
+      et au plus toutes les REFRESH_STOCKS_INTERVAL_SECONDS (date du dernier passage en base,
+      partagée entre workers).
+    - Les favoris sont rafraîchis sur un pool dédié (REFRESH_MAX_WORKERS), distinct du pool
+      des requêtes interactives.
+    """
+
+    def __init__(self, horloge=None, exclusif=False):
+        self.intervalle = float(os.getenv("REFRESH_INTERVAL_SECONDS", "3600"))
+        self.jitter = float(os.getenv("REFRESH_JITTER_SECONDS", "120"))
+        self.fenetre_bascule = float(os.getenv("REFRESH_ROLLOVER_WINDOW_SECONDS", "600"))
+        self.delai_bascule = float(os.getenv("REFRESH_ROLLOVER_DELAY_SECONDS", "30"))
+        self.intervalle_actions = float(os.getenv("REFRESH_STOCKS_INTERVAL_SECONDS", "21600"))
+        self.delai_execution = float(os.getenv("REFRESH_DEADLINE_SECONDS", "120"))
+        self.max_workers = int(os.getenv("REFRESH_MAX_WORKERS", "2"))
+        self._horloge = horloge or (lambda: datetime.now(UTC))
+        self._arret = threading.Event()
+        self._thread = None
+        self._executeur = None
+        self._pid = None
+        # Dans les workers web (plusieurs processus) : un seul passage par échéance, via un bail MongoDB
+        self.exclusif = exclusif
+
+    def calculer_prochaine_execution(self, maintenant):
+        """
+        Retourne (date de la prochaine exécution, True s'il s'agit du préchauffage de bascule).
+        """
+        minuit = (maintenant + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        bascule = minuit + timedelta(seconds=self.delai_bascule + random.uniform(0, self.jitter))
+        reguliere = maintenant + timedelta(
+            seconds=max(1.0, self.intervalle + random.uniform(-self.jitter, self.jitter))
+        )
+        if reguliere >= minuit - timedelta(seconds=self.fenetre_bascule):
+            return bascule, True
+        return reguliere, False
+
+    def _actions_dues(self, maintenant):
+        from repositories.scheduler_repository import PlanificateurRepository
+        dernier = PlanificateurRepository().lire_dernier_passage("actions")
+        return dernier is None or (maintenant - dernier).total_seconds() >= self.intervalle_actions
+
+    def _get_executeur(self):
+        # Pool propre au planificateur (recréé après un fork) : un rafraîchissement long
+        # n'occupe pas les threads des listes populaires interactives
+        if self._executeur is None or self._pid != os.getpid():
+            self._executeur = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="planificateur")
+            self._pid = os.getpid()
+        return self._executeur
+
+    def executer_une_fois(self, inclure_actions=True):
+        """
+        Rafraîchit toutes les listes et retourne un rapport {liste: nombre d'éléments obtenus}.
+        """
+        # Import local : les services ouvrent leurs dépôts à l'instanciation
+        from services.currency_service import CurrencyService
+        from services.company_service import SocieteService
+        from services.stock_service import StockService
+        from repositories.scheduler_repository import PlanificateurRepository
+
+        rapport = {}
+        devises = CurrencyService()
+        rapport["devises_populaires"] = len(devises.obtenir_devises_populaires(reconstruire=True))
+        rapport["devises_favorites"] = self._rafraichir(devises.obtenir_devise, devises.repo.lire_tous_les_favoris())
+
+        societes = SocieteService()
+        rapport["societes_populaires"] = len(societes.obtenir_societes_populaires(reconstruire=True))
+
+        if inclure_actions:
+            actions = StockService()
+            rapport["actions_populaires"] = len(actions.obtenir_actions_populaires(reconstruire=True))
+            rapport["actions_favorites"] = self._rafraichir(actions.obtenir_action, actions.repo.lire_tous_les_favoris())
+            PlanificateurRepository().enregistrer_passage("actions", self._horloge())
+        logger.info("Rafraîchissement planifié terminé : %s", rapport)
+        return rapport
+
+    def _rafraichir(self, fonction, cles):
+        resultats = executer_en_parallele(fonction, sorted(set(cles)), self.delai_execution, self._get_executeur())
+        return sum(1 for _, res in resultats if isinstance(res, dict) and "message" not in res)
+
+    def boucle(self):
+        """
+        Boucle principale : rafraîchit au démarrage, puis à chaque échéance jusqu'à arreter().
+        """
+        self._executer_sans_echec(est_bascule=False)
+        while not self._arret.is_set():
+            maintenant = self._horloge()
+            prochaine, est_bascule = self.calculer_prochaine_execution(maintenant)
+            if self._arret.wait((prochaine - maintenant).total_seconds()):
+                break
+            self._executer_sans_echec(est_bascule=est_bascule)
+
+    def _obtenir_tour(self, est_bascule):
+        """
+        Prend le bail de l'échéance (non libéré : il expire avec elle). Seul le processus qui
+        l'obtient rafraîchit ; les autres workers sautent ce passage.
+        """
+        from repositories.lease_repository import VerrouRepository
+        if est_bascule:
+            cle, duree = f"planificateur:bascule:{self._horloge():%Y-%m-%d}", self.fenetre_bascule + self.jitter
+        else:
+            cle, duree = "planificateur:regulier", max(1.0, self.intervalle - self.jitter)
+        return VerrouRepository().acquerir(cle, f"{os.getpid()}:{uuid.uuid4().hex}", duree)
+
+    def _executer_sans_echec(self, est_bascule=False):
+        try:
+            if self.exclusif and not self._obtenir_tour(est_bascule):
+                logger.info("Rafraîchissement planifié effectué par un autre processus")
+                return
+            # Décidé après le bail : la date du dernier passage est lue par le seul processus qui rafraîchit
+            self.executer_une_fois(inclure_actions=est_bascule or self._actions_dues(self._horloge()))
+        except Exception:
+            logger.exception("Échec du rafraîchissement planifié")
+
+    def demarrer(self):
+        """
+        Démarre la boucle dans un thread d'arrière-plan (daemon), en mode exclusif : avec plusieurs
+        workers, un seul processus effectue chaque passage.
+        """
+        self.exclusif = True
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._arret.clear()
+        self._thread = threading.Thread(target=self.boucle, name="planificateur", daemon=True)
+        self._thread.start()
+
+    def arreter(self):
+        self._arret.set()
+
+
+planificateur = PlanificateurRafraichissement()
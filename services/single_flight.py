@@ -0,0 +1,65 @@
+import threading
+
+
+class _Vol:
+    __slots__ = ("evenement", "resultat", "erreur")
+
+    def __init__(self):
+        self.evenement = threading.Event()
+        self.resultat = None
+        self.erreur = None
+
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents portant sur la même clé :
+    un seul appel exécute la fonction, les autres attendent et partagent son résultat
+    (ou son exception).
+    """
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._vols = {}
+        self._compteurs = {"executions": 0, "regroupes": 0}
+
+    def executer(self, cle, fonction):
+        """
+        Exécute fonction() pour la clé donnée, sauf si un appel est déjà en cours
+        pour cette clé : dans ce cas, attend et retourne son résultat.
+        """
+        with self._verrou:
+            vol = self._vols.get(cle)
+            meneur = vol is None
+            if meneur:
+                vol = self._vols[cle] = _Vol()
+                self._compteurs["executions"] += 1
+            else:
+                self._compteurs["regroupes"] += 1
+
+        if not meneur:
+            vol.evenement.wait()
+            if vol.erreur is not None:
+                raise vol.erreur
+            return vol.resultat
+
+        try:
+            vol.resultat = fonction()
+        except BaseException as err:
+            vol.erreur = err
+            raise
+        finally:
+            with self._verrou:
+                del self._vols[cle]
+            vol.evenement.set()
+        return vol.resultat
+
+    def statistiques(self):
+        with self._verrou:
+            stats = dict(self._compteurs)
+            stats["en_cours"] = len(self._vols)
+        return stats
+
+
+# Instance partagée par les services pour les appels aux fournisseurs externes,
+# avec des clés de la forme (fournisseur, symbole_ou_devise).
+vols_amont = SingleFlight()
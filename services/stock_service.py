@@ -1,10 +1,100 @@
 import os
-import requests
-from datetime import datetime, timedelta, UTC
+from datetime import date as Date, datetime, timedelta, UTC
 from repositories.stock_repository import StockRepository
+from repositories.snapshot_repository import InstantaneRepository
 from models.stock import Action
 from schemas.stock import ActionSchema
+from schemas.serialiseur import compiler
 from services.currency_service import CurrencyService
+from services.upstream import get_client_amont
+from services.single_flight import vols_amont
+from services.fetch_lease import BailImport
+from services.fan_out import executer_en_parallele, EN_RETARD
+
+def derniere_seance_possible(jour):
+    """
+    Dernier jour de semaine (lundi à vendredi) à cette date ou avant, au format AAAA-MM-JJ.
+    """
+    return (jour - timedelta(days=max(0, jour.weekday() - 4))).strftime("%Y-%m-%d")
+
+
+def synchro_inutile(etat, maintenant, intervalle_min):
+    """
+    Indique si une récupération ne peut rien apporter : la barre de la dernière séance possible
+    est déjà enregistrée, ou une récupération réussie date de moins de intervalle_min secondes.
+    """
+    if not etat:
+        return False
+    derniere_date = etat.get("derniere_date")
+    if derniere_date and derniere_date >= derniere_seance_possible(maintenant.date()):
+        return True
+    return etat.get("resultat") == "ok" and _secondes_depuis_recuperation(etat, maintenant) < intervalle_min
+
+
+def synchro_en_attente(etat, maintenant, intervalle_erreur):
+    """
+    Indique si la dernière récupération a échoué il y a moins de intervalle_erreur secondes
+    (limite de débit, réponse "Information") : le fournisseur n'est pas rappelé avant ce délai.
+    """
+    return bool(etat) and etat.get("resultat") == "erreur" and \
+        _secondes_depuis_recuperation(etat, maintenant) < intervalle_erreur
+
+
+def date_a_completer(date, derniere_date):
+    """
+    Date demandée manquante mais antérieure au filigrane (trou dans l'historique) : retournée si
+    c'est un jour de semaine valide, sinon None (synchronisation incrémentale normale).
+    """
+    if not date or not derniere_date or date > derniere_date:
+        return None
+    try:
+        jour = Date.fromisoformat(date)
+    except ValueError:
+        return None
+    return date if jour.weekday() < 5 else None
+
+
+def completion_inutile(etat, depuis, maintenant, intervalle_min):
+    """
+    Indique si une récupération réussie récente a déjà analysé la réponse à partir de `depuis` :
+    la date manquante n'existe pas chez le fournisseur.
+    """
+    if not etat or etat.get("resultat") != "ok" or _secondes_depuis_recuperation(etat, maintenant) >= intervalle_min:
+        return False
+    return analyse_depuis(etat, depuis)
+
+
+def analyse_depuis(etat, depuis):
+    """
+    Indique si la dernière récupération a analysé la réponse à partir de `depuis`
+    (toujours vrai sans date à combler).
+    """
+    if depuis is None:
+        return True
+    analyse_apres = etat.get("analyse_apres")
+    return analyse_apres is None or analyse_apres < depuis
+
+
+def _secondes_depuis_recuperation(etat, maintenant):
+    recupere_le = etat.get("recupere_le")
+    if recupere_le is None:
+        return float("inf")
+    if recupere_le.tzinfo is None:
+        # MongoDB renvoie des dates UTC naïves
+        recupere_le = recupere_le.replace(tzinfo=UTC)
+    return (maintenant - recupere_le).total_seconds()
+
+
+def taille_sortie(derniere_date, jour):
+    """
+    outputsize Alpha Vantage : "compact" (100 dernières séances) suffit si la dernière barre
+    enregistrée est assez récente, "full" sinon ; ALPHAVANTAGE_INITIAL_OUTPUT_SIZE pour un nouveau symbole.
+    """
+    if derniere_date is None:
+        return os.getenv("ALPHAVANTAGE_INITIAL_OUTPUT_SIZE", "compact")
+    ecart = (jour - Date.fromisoformat(derniere_date)).days
+    return "compact" if ecart <= int(os.getenv("ALPHAVANTAGE_COMPACT_MAX_DAYS", "140")) else "full"
+
 
 class StockService:
     """
@@ -13,9 +103,14 @@ class StockService:
 
     def __init__(self):
         self.repo = StockRepository()
+        self.instantanes = InstantaneRepository()
         self.schema = ActionSchema()
+        # Sérialisation générée (même sortie que self.schema.dump, sans validation)
+        self.serialiseur = compiler(self.schema)
         self.api_key = os.getenv("API_KEY_AV")
         self.currency_service = CurrencyService()
+        self.client_amont = get_client_amont("alphavantage")
+        self.bail = BailImport()
 
     def _get_today_str(self):
         return datetime.now(UTC).strftime("%Y-%m-%d")
@@ -24,62 +119,143 @@ class StockService:
         """
         Récupère les données d'une action pour un symbole donné, avec option de date.
         """
+        action = self.charger_action(symbole, date)
+        return self.serialiseur.dump(action) if isinstance(action, Action) else action
+
+    def charger_action(self, symbole, date=None):
+        """
+        Comme obtenir_action, mais retourne l'objet Action (ou l'erreur) sans le sérialiser.
+        """
         if date:
             action = self.repo.chercher_par_symbole_et_date(symbole, date)
             if action:
-                return self.schema.dump(action)
-            api_data = self._fetch_action_from_api(symbole)
-            if not api_data or "series" not in api_data or "Information" in getattr(api_data, "keys", lambda: [])():
+                return action
+            if not self._synchroniser_depuis_api(symbole, date):
                 # Si l'API ne retourne pas de données, on essaie de récupérer la dernière date disponible
-                latest_dates = self.repo.get_all_dates_for_symbol(symbole)
-                if latest_dates:
-                    latest_date = sorted(latest_dates, reverse=True)[0]
-                    action = self.repo.chercher_par_symbole_et_date(symbole, latest_date)
-                    if action:
-                        return self.schema.dump(action)
+                action = self._derniere_action(symbole, date)
+                if action:
+                    return action
                 return {"message": "Données d'action non disponibles."}, 404
-            # Vérifier les dates existantes dans la base de données
-            all_dates = [a.date for a in api_data["series"]]
-            existing_dates = self.repo.chercher_dates_existantes(symbole, all_dates)
-            # Filtrer les nouvelles actions à ajouter
-            new_actions = [a for a in api_data["series"] if a.date not in existing_dates]
-            if new_actions:
-                self.repo.creer_plusieurs(new_actions)
             action = self.repo.chercher_par_symbole_et_date(symbole, date)
             if action:
-                return self.schema.dump(action)
+                return action
             # Si aucune action trouvée pour la date spécifique, on retourne la dernière date disponible
-            latest_dates = self.repo.get_all_dates_for_symbol(symbole)
-            if latest_dates:
-                latest_date = sorted(latest_dates, reverse=True)[0]
-                action = self.repo.chercher_par_symbole_et_date(symbole, latest_date)
-                if action:
-                    return self.schema.dump(action)
+            action = self._derniere_action(symbole, date)
+            if action:
+                return action
             return {"message": "Données d'action non disponibles."}, 404
         else:
+            # Dernière cotation matérialisée : à jour si elle date d'aujourd'hui ; sinon la
+            # synchronisation n'interroge le fournisseur que si une barre nouvelle peut exister
             date_today = self._get_today_str()
-            action = self.repo.chercher_par_symbole_et_date(symbole, date_today)
+            action = self.repo.chercher_derniere(symbole)
+            if action and action.date >= date_today:
+                return action
+            if self._synchroniser_depuis_api(symbole):
+                action = self.repo.chercher_derniere(symbole)
             if action:
-                return self.schema.dump(action)
-            api_data = self._fetch_action_from_api(symbole)
-            if not api_data or "series" not in api_data:
-                return {"message": "Données d'action non disponibles."}, 404
-            all_dates = [a.date for a in api_data["series"]]
-            existing_dates = self.repo.chercher_dates_existantes(symbole, all_dates)
-            new_actions = [a for a in api_data["series"] if a.date not in existing_dates]
-            if new_actions:
-                self.repo.creer_plusieurs(new_actions)
-            latest_dates = self.repo.get_all_dates_for_symbol(symbole)
-            if latest_dates:
-                latest_date = sorted(latest_dates, reverse=True)[0]
-                action = self.repo.chercher_par_symbole_et_date(symbole, latest_date)
-                if action:
-                    return self.schema.dump(action)
+                # Fournisseur indisponible : dernière cotation connue
+                return action
             return {"message": "Données d'action non disponibles."}, 404
 
-    def _fetch_action_from_api(self, symbole):
+    def _derniere_action(self, symbole, date=None):
+        """
+        Dernière action connue à la date donnée ou avant, sinon la plus récente
+        (date antérieure à tout l'historique).
+        """
+        action = self.repo.chercher_derniere_avant(symbole, date)
+        if action is None and date is not None:
+            action = self.repo.chercher_derniere_avant(symbole)
+        return action
+
+    def _synchroniser_depuis_api(self, symbole, date=None):
+        """
+        Importe la série quotidienne d'un symbole depuis l'API et insère les nouvelles dates.
+        Un seul import par symbole à la fois, partagé entre les appels concurrents.
+        Retourne False si l'API ne retourne pas de données.
+        Une date demandée manquante et antérieure au filigrane est comblée depuis la réponse.
+        L'appel est évité quand l'état de synchronisation du symbole montre qu'il ne peut rien apporter.
+        """
+        etat, maintenant = self.repo.lire_synchro(symbole), datetime.now(UTC)
+        intervalle = float(os.getenv("ALPHAVANTAGE_MIN_REFETCH_SECONDS", "3600"))
+        depuis = date_a_completer(date, (etat or {}).get("derniere_date"))
+        if depuis is None and synchro_inutile(etat, maintenant, intervalle):
+            return True
+        if depuis is not None and completion_inutile(etat, depuis, maintenant, intervalle):
+            return True
+        if synchro_en_attente(etat, maintenant, float(os.getenv("ALPHAVANTAGE_ERROR_RETRY_SECONDS", "300"))):
+            # Échec récent : dernière cotation connue, sans rappeler le fournisseur
+            return False
+        return vols_amont.executer(
+            ("alphavantage", symbole, depuis), lambda: self._importer_series_avec_bail(symbole, depuis)
+        )
+
+    def _importer_series_avec_bail(self, symbole, depuis=None):
+        # Un seul worker importe la série d'un symbole à la fois ; les autres attendent la fin
+        # de son import puis lisent la base (dernière cotation connue).
+        date_today = self._get_today_str()
+        # Un import terminé depuis (au plus une durée de bail avant) ce moment suffit : le week-end
+        # ou avant la clôture, la barre du jour n'existe pas mais l'import a bien eu lieu
+        seuil = datetime.now(UTC) - timedelta(seconds=self.bail.duree)
+        return self.bail.executer(
+            f"alphavantage:{symbole}:{date_today}" + (f":{depuis}" if depuis else ""),
+            importer=lambda: self._importer_series(symbole, depuis),
+            relire=lambda: self._import_termine_depuis(symbole, seuil, depuis),
+            repli=lambda: True
+        )
+
+    def _import_termine_depuis(self, symbole, seuil, depuis=None):
+        """
+        Résultat (True/False) d'un import terminé après `seuil` d'après l'état de synchronisation, ou None.
+        En comblement, seul un import ayant analysé la réponse à partir de `depuis` compte :
+        une synchronisation ordinaire terminée juste avant n'a pas cherché la date manquante.
+        """
+        etat = self.repo.lire_synchro(symbole)
+        if not etat or _secondes_depuis_recuperation(etat, seuil) > 0 or not analyse_depuis(etat, depuis):
+            return None
+        return etat.get("resultat") == "ok"
+
+    def _importer_series(self, symbole, date=None):
+        # Filigrane : date de la dernière barre importée (à défaut, de la dernière barre enregistrée)
+        etat = self.repo.lire_synchro(symbole) or {}
+        derniere_date = etat.get("derniere_date")
+        if derniere_date is None:
+            derniere = self.repo.chercher_derniere(symbole)
+            derniere_date = derniere.date if derniere else None
+        # Date manquante antérieure au filigrane : la réponse est analysée à partir de cette date
+        depuis = date_a_completer(date, derniere_date)
+        if depuis is None:
+            apres, reference = derniere_date, derniere_date
+        else:
+            apres, reference = (Date.fromisoformat(depuis) - timedelta(days=1)).isoformat(), depuis
+        maintenant = datetime.now(UTC)
+        api_data = self._fetch_action_from_api(symbole, taille_sortie(reference, maintenant.date()), apres)
+        if not api_data or "series" not in api_data:
+            self.repo.enregistrer_synchro(symbole, maintenant, "erreur", analyse_apres=apres)
+            return False
+        # Seules les barres postérieures à `apres` sont renvoyées ; en comblement, celles
+        # déjà enregistrées (jusqu'au filigrane) sont écartées
+        new_actions = api_data["series"]
+        if depuis is not None:
+            existantes = set(self.repo.chercher_dates_existantes(
+                symbole, [a.date for a in new_actions if a.date <= derniere_date]
+            ))
+            new_actions = [a for a in new_actions if a.date not in existantes]
+        if new_actions:
+            self.repo.creer_plusieurs(new_actions)
+            if symbole in self._actions_populaires():
+                # La liste populaire du jour sera reconstruite avec ces nouvelles cotations
+                self.instantanes.invalider("actions", self._get_today_str())
+        self.repo.enregistrer_synchro(
+            symbole, maintenant, "ok", max((a.date for a in new_actions), default=derniere_date), len(new_actions),
+            analyse_apres=apres
+        )
+        return True
+
+    def _fetch_action_from_api(self, symbole, outputsize="compact", apres=None):
         """
         Récupère les données d'une action depuis l'API Alpha Vantage.
+        Seules les séances postérieures à `apres` (AAAA-MM-JJ) sont converties.
         Si l'API ne retourne pas de données, retourne None.
         """
         url = os.getenv("ALPHAVANTAGE_API_URL", "https://www.alphavantage.co/query")
@@ -89,10 +265,11 @@ class StockService:
         params = {
             "function": function,
             "symbol": symbole,
+            "outputsize": outputsize,
             "apikey": self.api_key
         }
-        response = requests.get(url, params=params)
-        if response.status_code != 200:
+        response = self.client_amont.get(url, params=params)
+        if response is None or response.status_code != 200:
             return None
         data = response.json()
         time_series = data.get("Time Series (Daily)", {})
@@ -100,6 +277,8 @@ class StockService:
             return None
         series = []
         for d, day_data in time_series.items():
+            if apres is not None and d <= apres:
+                continue
             series.append(Action(
                 symbole=symbole,
                 date=d,
@@ -111,15 +290,91 @@ class StockService:
             ))
         return {"series": series}
 
+    def _actions_populaires(self):
+        return [s.strip().upper() for s in os.getenv("POPULAR_STOCKS", "AAPL,MSFT,GOOGL,AMZN,TSLA").split(",")]
+
+    def obtenir_actions_populaires(self, reconstruire=False):
+        """
+        Récupère les actions populaires (POPULAR_STOCKS) depuis l'instantané du jour,
+        ou en parallèle si l'instantané n'existe pas encore (ou si reconstruire est vrai).
+        Les actions non obtenues avant l'échéance sont signalées comme manquantes.
+        """
+        date_today = self._get_today_str()
+        instantane = None if reconstruire else self.instantanes.lire("actions", date_today)
+        if instantane is not None:
+            return instantane
+        results = []
+        for symbole, res in executer_en_parallele(self._obtenir_action_populaire, self._actions_populaires()):
+            if res is EN_RETARD:
+                results.append({"symbole": symbole, "manquant": True, "message": "Délai dépassé, action en cours de récupération."})
+            elif res is not None:
+                results.append(res)
+            else:
+                # Aucune cotation (même ancienne) ou échec : signalée, pour ne jamais enregistrer une liste partielle
+                results.append({"symbole": symbole, "manquant": True, "message": "Action indisponible."})
+        # L'instantané n'est enregistré que s'il est complet
+        if results and not any(r.get("manquant") for r in results):
+            self.instantanes.enregistrer("actions", date_today, results)
+        return results
+
+    def _obtenir_action_populaire(self, symbole):
+        res = self.obtenir_action(symbole)
+        # Si la réponse est un dictionnaire avec le symbole, on l'ajoute à la liste des résultats
+        if isinstance(res, dict) and "symbole" in res:
+            return res
+        if isinstance(res, tuple) and res[1] == 404:
+            # Tentative de récupérer la dernière action connue si elle n'est pas trouvée
+            action = self._derniere_action(symbole)
+            if action:
+                return self.serialiseur.dump(action)
+        return None
+
     def obtenir_historique(self, symbole, nb_jours):
-        today = datetime.now(UTC).strftime("%Y-%m-%d")
+        return self.serialiseur.dump(self.charger_historique(symbole, nb_jours), many=True)
+
+    def charger_historique(self, symbole, nb_jours):
         dates = [(datetime.now(UTC) - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(nb_jours)]
-        records = self.repo.lire_historique_par_jours(symbole, dates)
-        return self.schema.dump(records, many=True)
+        return self.repo.lire_historique_par_jours(symbole, dates)
+
+    def charger_historique_colonnes(self, symbole, nb_jours):
+        """
+        Comme charger_historique, au format colonnes (un tableau par champ).
+        """
+        dates = [(datetime.now(UTC) - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(nb_jours)]
+        return self.repo.lire_colonnes_par_jours(symbole, dates)
+
+    def charger_historique_periode_colonnes(self, symbole, date_debut, date_fin):
+        return self.repo.lire_colonnes_sur_periode(symbole, date_debut, date_fin)
 
     def obtenir_historique_periode(self, symbole, date_debut, date_fin):
-        records = self.repo.lire_historique_sur_periode(symbole, date_debut, date_fin)
-        return self.schema.dump(records, many=True)
+        return self.serialiseur.dump(self.charger_historique_periode(symbole, date_debut, date_fin), many=True)
+
+    def charger_historique_periode(self, symbole, date_debut, date_fin):
+        return self.repo.lire_historique_sur_periode(symbole, date_debut, date_fin)
+
+    def iterer_historique(self, symbole, nb_jours):
+        """
+        Itère l'historique des nb_jours derniers jours (flux NDJSON), sans le charger en mémoire.
+        """
+        date_fin = datetime.now(UTC)
+        date_debut = date_fin - timedelta(days=nb_jours - 1)
+        return self.iterer_historique_periode(symbole, date_debut.strftime("%Y-%m-%d"), date_fin.strftime("%Y-%m-%d"))
+
+    def iterer_historique_periode(self, symbole, date_debut, date_fin):
+        return self.repo.iterer_historique_sur_periode(
+            symbole, date_debut, date_fin, int(os.getenv("HISTORY_STREAM_BATCH_SIZE", "500"))
+        )
+
+    def periode_complete(self, symbole, date_fin):
+        """
+        Indique si toutes les barres jusqu'à date_fin sont enregistrées : date_fin est antérieure
+        au filigrane de synchronisation, ou à la dernière barre enregistrée.
+        """
+        reference = (self.repo.lire_synchro(symbole) or {}).get("derniere_date")
+        derniere = self.repo.chercher_derniere(symbole)
+        if derniere and (reference is None or derniere.date > reference):
+            reference = derniere.date
+        return reference is not None and date_fin < reference
 
     def calculer_cout_achat(self, symbole, date, quantite, code_devise):
         """
@@ -128,16 +383,13 @@ class StockService:
         action = self.repo.chercher_par_symbole_et_date(symbole, date)
         if not action:
             # Essayer de récupérer et sauvegarder depuis l'API
-            self.obtenir_action(symbole, date)
+            self.charger_action(symbole, date)
             action = self.repo.chercher_par_symbole_et_date(symbole, date)
             if not action:
-                # Fallback: utiliser la dernière date disponible
-                latest_dates = self.repo.get_all_dates_for_symbol(symbole)
-                if latest_dates:
-                    latest_date = sorted(latest_dates, reverse=True)[0]
-                    action = self.repo.chercher_par_symbole_et_date(symbole, latest_date)
-                    if action:
-                        date = latest_date  # Mettre à jour la date utilisée
+                # Fallback: utiliser la dernière date disponible à cette date ou avant
+                action = self._derniere_action(symbole, date)
+                if action:
+                    date = action.date  # Mettre à jour la date utilisée
                 if not action:
                     return {"message": "Données d'action non disponibles."}, 404
 
@@ -0,0 +1,144 @@
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Statuts HTTP pour lesquels une nouvelle tentative a un sens
+STATUTS_A_REESSAYER = {429, 500, 502, 503, 504}
+
+
+def _env(fournisseur, nom, defaut):
+    """
+    Lit UPSTREAM_<FOURNISSEUR>_<NOM>, puis UPSTREAM_<NOM>, puis la valeur par défaut.
+    """
+    valeur = os.getenv(f"UPSTREAM_{fournisseur.upper()}_{nom}") or os.getenv(f"UPSTREAM_{nom}")
+    return type(defaut)(valeur) if valeur else defaut
+
+
+class ClientAmont:
+    """
+    Client HTTP partagé pour un fournisseur de données (FMP, ExchangeRate, Alpha Vantage).
+    Garde les connexions ouvertes (keep-alive), applique des timeouts de connexion et de lecture,
+    réessaie un nombre borné de fois avec un backoff exponentiel aléatoire,
+    et tient des compteurs de latence et d'erreurs.
+    """
+
+    def __init__(self, fournisseur):
+        self.fournisseur = fournisseur
+        self.timeout = (
+            _env(fournisseur, "CONNECT_TIMEOUT", 3.05),
+            _env(fournisseur, "READ_TIMEOUT", 10.0),
+        )
+        self.tentatives_max = _env(fournisseur, "MAX_RETRIES", 2)
+        self.backoff_base = _env(fournisseur, "BACKOFF_BASE", 0.5)
+        self.backoff_max = _env(fournisseur, "BACKOFF_MAX", 4.0)
+        taille_pool = _env(fournisseur, "POOL_SIZE", 10)
+
+        self.session = requests.Session()
+        adaptateur = HTTPAdapter(pool_connections=1, pool_maxsize=taille_pool, max_retries=0)
+        self.session.mount("https://", adaptateur)
+        self.session.mount("http://", adaptateur)
+
+        self._verrou = threading.Lock()
+        self._compteurs = {
+            "requetes": 0,
+            "succes": 0,
+            "erreurs": 0,
+            "erreurs_reseau": 0,
+            "erreurs_http": 0,
+            "nouvelles_tentatives": 0,
+            "latence_totale_ms": 0.0,
+            "latence_max_ms": 0.0,
+        }
+
+    def _attendre(self, tentative):
+        # Backoff exponentiel avec jitter complet
+        plafond = min(self.backoff_max, self.backoff_base * (2 ** tentative))
+        time.sleep(random.uniform(0, plafond))
+
+    def _enregistrer(self, debut, reponse, erreur_reseau, nouvelles_tentatives):
+        latence_ms = (time.perf_counter() - debut) * 1000
+        with self._verrou:
+            c = self._compteurs
+            c["requetes"] += 1
+            c["nouvelles_tentatives"] += nouvelles_tentatives
+            c["latence_totale_ms"] += latence_ms
+            c["latence_max_ms"] = max(c["latence_max_ms"], latence_ms)
+            if erreur_reseau:
+                c["erreurs"] += 1
+                c["erreurs_reseau"] += 1
+            elif reponse.status_code != 200:
+                c["erreurs"] += 1
+                c["erreurs_http"] += 1
+            else:
+                c["succes"] += 1
+
+    def get(self, url, params=None):
+        """
+        Effectue une requête GET. Retourne la réponse (éventuellement en erreur HTTP),
+        ou None si le fournisseur est injoignable après toutes les tentatives.
+        """
+        debut = time.perf_counter()
+        reponse = None
+        erreur_reseau = False
+        tentative = 0
+        while True:
+            try:
+                reponse = self.session.get(url, params=params, timeout=self.timeout)
+                erreur_reseau = False
+                if reponse.status_code not in STATUTS_A_REESSAYER:
+                    break
+            except (requests.ConnectionError, requests.Timeout):
+                reponse = None
+                erreur_reseau = True
+            if tentative >= self.tentatives_max:
+                break
+            self._attendre(tentative)
+            tentative += 1
+        self._enregistrer(debut, reponse, erreur_reseau, tentative)
+        return reponse
+
+    def statistiques(self):
+        with self._verrou:
+            stats = dict(self._compteurs)
+        stats["latence_moyenne_ms"] = round(stats["latence_totale_ms"] / stats["requetes"], 2) if stats["requetes"] else 0.0
+        stats["latence_totale_ms"] = round(stats["latence_totale_ms"], 2)
+        stats["latence_max_ms"] = round(stats["latence_max_ms"], 2)
+        return stats
+
+
+_clients = {}
+_verrou_clients = threading.Lock()
+
+
+def get_client_amont(fournisseur):
+    """
+    Retourne le client partagé du fournisseur ("fmp", "exchangerate", "alphavantage").
+    """
+    client = _clients.get(fournisseur)
+    if client is None:
+        with _verrou_clients:
+            client = _clients.get(fournisseur)
+            if client is None:
+                client = _clients[fournisseur] = ClientAmont(fournisseur)
+    return client
+
+
+def statistiques_amont():
+    """
+    Retourne les compteurs de chaque fournisseur utilisé depuis le démarrage du processus.
+    """
+    return {nom: client.statistiques() for nom, client in list(_clients.items())}
+
+
+def _reinitialiser_apres_fork():
+    # Les sessions héritées partagent leurs sockets avec le parent
+    global _verrou_clients
+    _verrou_clients = threading.Lock()
+    _clients.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinitialiser_apres_fork)
@@ -1,12 +1,17 @@
 from repositories.user_repository import UserRepository
 from schemas.user import UtilisateurSchema
+from schemas.serialiseur import compiler
+from bson.objectid import ObjectId
 from models.user import Utilisateur
 from marshmallow import ValidationError
+from pymongo.errors import DuplicateKeyError
 
 class UserService:
     def __init__(self):
         self.repo = UserRepository()
         self.schema = UtilisateurSchema()
+        # Sérialisation générée (même sortie que self.schema.dump, sans validation)
+        self.serialiseur = compiler(self.schema)
 
     def register(self, data):
         # Validation le schéma des données d'entrée
@@ -20,8 +25,12 @@ class UserService:
             return {"message": "Un utilisateur avec cet email existe déjà."}, 409
 
         utilisateur = Utilisateur(**user_data)
-        created_user = self.repo.creer(utilisateur)
-        return self.schema.dump(created_user), 201
+        try:
+            created_user = self.repo.creer(utilisateur)
+        except DuplicateKeyError:
+            # Index unique sur l'email : inscription concurrente avec le même email
+            return {"message": "Un utilisateur avec cet email existe déjà."}, 409
+        return self.serialiseur.dump(created_user), 201
 
     def authenticate(self, email, mot_de_passe):
         # Authentification de l'utilisateur
@@ -32,20 +41,34 @@ class UserService:
         if not user_doc:
             return None
         utilisateur = Utilisateur.from_dict(user_doc)
-        return self.schema.dump(utilisateur)
+        return self.serialiseur.dump(utilisateur)
 
     def get_all(self):
         users = self.repo.lire_tous()
-        return self.schema.dump(users, many=True)
+        return self.serialiseur.dump(users, many=True)
+
+    def lister(self, limite, apres=None, avec_total=False):
+        # Page d'utilisateurs : (liste, curseur de la page suivante ou None, total estimé ou None)
+        if apres and not ObjectId.is_valid(apres):
+            return {"message": "Paramètre 'after' invalide."}, 400
+        # Un utilisateur de plus que demandé indique s'il existe une page suivante
+        users = self.repo.lire_page(limite + 1, apres)
+        suivant = users[limite - 1].id if len(users) > limite else None
+        total = self.repo.compter_estimation() if avec_total else None
+        return self.serialiseur.dump(users[:limite], many=True), suivant, total
 
     def get_by_id(self, user_id):
         user = self.repo.lire_par_id(user_id)
         if user:
-            return self.schema.dump(user)
+            return self.serialiseur.dump(user)
         return None
 
     def update(self, user_id, data):
-        updated = self.repo.mettre_a_jour(user_id, data)
+        try:
+            updated = self.repo.mettre_a_jour(user_id, data)
+        except DuplicateKeyError:
+            # Index unique sur l'email : l'email demandé appartient à un autre utilisateur
+            return {"message": "Un utilisateur avec cet email existe déjà."}, 409
         return updated
 
     def delete(self, user_id):
@@ -0,0 +1,172 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+from repositories.cache import CacheLRU, CacheDeuxNiveaux, estimer_taille
+from repositories.cache_l2 import CacheL2Memoire
+
+class BackendEnPanne:
+    def get(self, cle):
+        raise ConnectionError("L2 injoignable")
+
+    def set(self, cle, valeur, ex=None):
+        raise ConnectionError("L2 injoignable")
+
+    def delete(self, cle):
+        raise ConnectionError("L2 injoignable")
+
+class BackendIntermittent(CacheL2Memoire):
+    def __init__(self):
+        super().__init__()
+        self.en_panne = False
+
+    def delete(self, cle):
+        if self.en_panne:
+            raise ConnectionError("L2 injoignable")
+        super().delete(cle)
+
+class FausseHorloge:
+    def __init__(self):
+        self.maintenant = 0.0
+
+    def __call__(self):
+        return self.maintenant
+
+def test_cache_hit_and_miss():
+    try:
+        cache = CacheLRU(max_entrees=10, ttl_secondes=60)
+        assert cache.obtenir(("devises", "USD", "2025-06-07")) is None
+        cache.stocker(("devises", "USD", "2025-06-07"), {"nom": "USD"})
+        assert cache.obtenir(("devises", "USD", "2025-06-07")) == {"nom": "USD"}
+        stats = cache.statistiques()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entrees"] == 1
+        log_test_result("test_cache_hit_and_miss", True)
+    except AssertionError:
+        log_test_result("test_cache_hit_and_miss", False)
+        raise
+
+def test_cache_lru_eviction():
+    try:
+        cache = CacheLRU(max_entrees=2, ttl_secondes=60)
+        cache.stocker("a", {"v": 1})
+        cache.stocker("b", {"v": 2})
+        cache.obtenir("a")
+        cache.stocker("c", {"v": 3})
+        assert cache.obtenir("b") is None
+        assert cache.obtenir("a") == {"v": 1}
+        assert cache.obtenir("c") == {"v": 3}
+        assert cache.statistiques()["evictions"] == 1
+        log_test_result("test_cache_lru_eviction", True)
+    except AssertionError:
+        log_test_result("test_cache_lru_eviction", False)
+        raise
+
+def test_cache_ttl_expiration():
+    try:
+        horloge = FausseHorloge()
+        cache = CacheLRU(max_entrees=10, ttl_secondes=30, horloge=horloge)
+        cache.stocker("a", {"v": 1})
+        horloge.maintenant = 29
+        assert cache.obtenir("a") == {"v": 1}
+        horloge.maintenant = 31
+        assert cache.obtenir("a") is None
+        stats = cache.statistiques()
+        assert stats["expirations"] == 1
+        assert stats["entrees"] == 0
+        assert stats["octets"] == 0
+        log_test_result("test_cache_ttl_expiration", True)
+    except AssertionError:
+        log_test_result("test_cache_ttl_expiration", False)
+        raise
+
+def test_cache_memory_bound_and_invalidation():
+    try:
+        document = {"conversion_rates": {f"C{i:02d}": float(i) for i in range(50)}}
+        taille = estimer_taille(document)
+        cache = CacheLRU(max_entrees=100, max_octets=taille * 2, ttl_secondes=60)
+        cache.stocker("a", document)
+        cache.stocker("b", document)
+        cache.stocker("c", document)
+        stats = cache.statistiques()
+        assert stats["entrees"] == 2
+        assert stats["octets"] <= taille * 2
+        cache.invalider("c")
+        assert cache.obtenir("c") is None
+        assert cache.statistiques()["invalidations"] == 1
+        log_test_result("test_cache_memory_bound_and_invalidation", True)
+    except AssertionError:
+        log_test_result("test_cache_memory_bound_and_invalidation", False)
+        raise
+
+def test_two_level_cache_shared_between_workers():
+    try:
+        l2 = CacheL2Memoire()
+        worker_a = CacheDeuxNiveaux(CacheLRU(), l2, ttl_par_espace={"devises": 60})
+        worker_b = CacheDeuxNiveaux(CacheLRU(), l2, ttl_par_espace={"devises": 60})
+        cle = ("devises", "EUR", "2025-06-07")
+        document = {"_id": "abc", "nom": "EUR", "conversion_rates": {"USD": 1.14}}
+        chargements = []
+        def chargeur():
+            chargements.append(1)
+            return document
+        assert worker_a.obtenir_ou_charger(cle, chargeur) == document
+        assert worker_b.obtenir_ou_charger(cle, chargeur) == document
+        assert len(chargements) == 1
+        assert worker_b.statistiques()["l2"]["hits"] == 1
+        worker_a.invalider(cle)
+        assert worker_b.l2.get("webcur:devises:EUR:2025-06-07") is None
+        log_test_result("test_two_level_cache_shared_between_workers", True)
+    except AssertionError:
+        log_test_result("test_two_level_cache_shared_between_workers", False)
+        raise
+
+def test_two_level_cache_falls_back_when_l2_unavailable():
+    try:
+        horloge = FausseHorloge()
+        cache = CacheDeuxNiveaux(CacheLRU(), BackendEnPanne(), pause_secondes=30, horloge=horloge)
+        cle = ("actions", "AAPL", "2025-06-06")
+        assert cache.obtenir_ou_charger(cle, lambda: {"symbole": "AAPL"}) == {"symbole": "AAPL"}
+        stats = cache.statistiques()
+        assert stats["l2"]["erreurs"] == 1
+        assert stats["l2"]["disponible"] is False
+        assert cache.obtenir(cle) == {"symbole": "AAPL"}
+        horloge.maintenant = 31
+        assert cache.statistiques()["l2"]["disponible"] is True
+        log_test_result("test_two_level_cache_falls_back_when_l2_unavailable", True)
+    except AssertionError:
+        log_test_result("test_two_level_cache_falls_back_when_l2_unavailable", False)
+        raise
+
+def test_two_level_cache_replays_invalidation_after_outage():
+    try:
+        horloge = FausseHorloge()
+        l2 = BackendIntermittent()
+        worker_a = CacheDeuxNiveaux(CacheLRU(), l2, pause_secondes=30, horloge=horloge)
+        worker_b = CacheDeuxNiveaux(CacheLRU(), l2, pause_secondes=30, horloge=horloge)
+        cle = ("actions", "AAPL", "2025-06-06")
+        worker_a.stocker(cle, {"symbole": "AAPL", "close": 1.0})
+        l2.en_panne = True
+        worker_a.invalider(cle)
+        assert worker_a.statistiques()["l2"]["suppressions_en_attente"] == 1
+        l2.en_panne = False
+        horloge.maintenant = 31
+        # Le L2 revenu ne sert pas l'ancien document : la suppression est rejouée d'abord
+        assert worker_a.obtenir(cle) is None
+        assert worker_b.obtenir(cle) is None
+        assert worker_a.statistiques()["l2"]["suppressions_en_attente"] == 0
+        log_test_result("test_two_level_cache_replays_invalidation_after_outage", True)
+    except AssertionError:
+        log_test_result("test_two_level_cache_replays_invalidation_after_outage", False)
+        raise
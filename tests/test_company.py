@@ -57,6 +57,28 @@ def test_get_company_info(client):
         log_test_result("test_get_company_info", False)
         raise
 
+def test_get_company_info_fields(client):
+    try:
+        token = get_jwt_token(client)
+        response = client.get(
+            '/societes/AAPL?fields=price,change,image',
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert set(data) == {"symbole", "date_maj", "price", "change", "image"}
+        response = client.get(
+            '/societes/AAPL?fields=price,inconnu',
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 400
+        populaires = client.get('/societes/populaires?fields=price').get_json()
+        assert all(set(s) <= {"symbole", "date_maj", "price", "manquant", "message"} for s in populaires)
+        log_test_result("test_get_company_info_fields", True)
+    except AssertionError:
+        log_test_result("test_get_company_info_fields", False)
+        raise
+
 def test_company_history_days(client):
     try:
         token = get_jwt_token(client)
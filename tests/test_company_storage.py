@@ -0,0 +1,59 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+from models.company import Societe
+from repositories.company_repository import separer, joindre, projection_champs, projection_profils
+
+def _societe(date_maj, price, description="Fabricant de matériel informatique."):
+    return Societe(
+        symbole="AAPL", date_maj=date_maj, companyName="Apple Inc.", price=price, volume=46607693.0,
+        description=description, range_="169.21-260.1", zip_="95014", image="https://example.com/aapl.png"
+    ).to_dict()
+
+def test_separer_et_joindre():
+    try:
+        data = _societe("2025-06-07", 203.92)
+        profil, cotation = separer(data)
+        assert "description" not in cotation and "price" not in profil
+        assert cotation["profil"] == profil["_id"] and profil["_id"].startswith("AAPL:")
+        assert joindre(cotation, profil) == data
+        log_test_result("test_separer_et_joindre", True)
+    except AssertionError:
+        log_test_result("test_separer_et_joindre", False)
+        raise
+
+def test_profil_inchange_partage():
+    try:
+        profil_1, _ = separer(_societe("2025-06-06", 200.1))
+        profil_2, _ = separer(_societe("2025-06-07", 203.92))
+        profil_3, _ = separer(_societe("2025-06-08", 204.0, description="Nouvelle description."))
+        assert profil_1["_id"] == profil_2["_id"]
+        assert profil_3["_id"] != profil_2["_id"]
+        log_test_result("test_profil_inchange_partage", True)
+    except AssertionError:
+        log_test_result("test_profil_inchange_partage", False)
+        raise
+
+def test_ancien_format_et_projection():
+    try:
+        ancien = _societe("2025-06-07", 203.92)
+        assert joindre(ancien, None) == ancien
+        assert projection_profils(("symbole", "date_maj", "price")) is False
+        assert "profil" not in projection_champs(("symbole", "date_maj", "price"))
+        assert projection_champs(("symbole", "price", "image"))["profil"] == 1
+        assert projection_profils(("symbole", "price", "image")) == {"image": 1}
+        log_test_result("test_ancien_format_et_projection", True)
+    except AssertionError:
+        log_test_result("test_ancien_format_et_projection", False)
+        raise
@@ -113,4 +113,19 @@ def test_get_popular_currencies(client):
         log_test_result("test_get_popular_currencies", True)
     except AssertionError:
         log_test_result("test_get_popular_currencies", False)
-        raise
\ No newline at end of file
+        raise
+
+def test_get_currency_not_modified(client):
+    try:
+        response = client.get('/devises/USD')
+        assert response.status_code == 200
+        etag = response.headers.get("ETag")
+        assert etag
+        response_304 = client.get('/devises/USD', headers={"If-None-Match": etag})
+        assert response_304.status_code == 304
+        assert response_304.data == b""
+        assert response_304.headers.get("ETag") == etag
+        log_test_result("test_get_currency_not_modified", True)
+    except AssertionError:
+        log_test_result("test_get_currency_not_modified", False)
+        raise
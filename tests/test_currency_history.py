@@ -2,6 +2,8 @@ import pytest
 import os
 import sys
 import logging
+import gzip
+import json
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from logging_config import setup_logging
@@ -15,6 +17,9 @@ def log_test_result(test_name, result):
 
 from app import app
 from repositories.user_repository import UserRepository
+from repositories.currency_repository import CurrencyRepository
+from models.currency import Devise
+from resources.compression import compression
 
 @pytest.fixture
 def client():
@@ -72,4 +77,61 @@ def test_history_cad_two_days_specific_dates(client):
         log_test_result("test_history_cad_two_days_specific_dates", True)
     except AssertionError:
         log_test_result("test_history_cad_two_days_specific_dates", False)
-        raise
\ No newline at end of file
+        raise
+
+def test_history_cache_control(client):
+    try:
+        token = get_jwt_token(client)
+        response = client.get(
+            '/devises/CAD/historique?jours=2',
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+        cache_control = response.headers.get("Cache-Control", "")
+        assert "public" in cache_control
+        assert "max-age=" in cache_control
+        assert "stale-while-revalidate=" in cache_control
+        assert "immutable" not in cache_control
+        log_test_result("test_history_cache_control", True)
+    except AssertionError:
+        log_test_result("test_history_cache_control", False)
+        raise
+
+def test_history_past_period_cache_control(client):
+    repo = CurrencyRepository()
+    try:
+        for date_maj in ("2025-06-06", "2025-06-10"):
+            repo.creer(Devise(nom="ZZT", taux=1.0, date_maj=date_maj, base_code="ZZT", conversion_rates={}))
+        # Une devise postérieure clôt la période : immuable
+        response = client.get('/devises/ZZT/historique?date_debut=2025-06-05&date_fin=2025-06-06')
+        assert response.status_code == 200
+        assert "immutable" in response.headers["Cache-Control"]
+        # Aucune devise après la fin de la période : elle peut encore changer, cache bref
+        response = client.get('/devises/ZZT/historique?date_debut=2025-06-05&date_fin=2025-06-10')
+        assert response.status_code == 200
+        assert "immutable" not in response.headers["Cache-Control"]
+        assert "stale-while-revalidate" not in response.headers["Cache-Control"]
+        log_test_result("test_history_past_period_cache_control", True)
+    except AssertionError:
+        log_test_result("test_history_past_period_cache_control", False)
+        raise
+    finally:
+        repo.collection.delete_many({"nom": "ZZT"})
+
+def test_history_gzip(client):
+    try:
+        token = get_jwt_token(client)
+        url = '/devises/CAD/historique?jours=7'
+        identite = client.get(url, headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "identity"})
+        compresse = client.get(url, headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"})
+        assert compresse.status_code == 200
+        # Sept jours de taux de change dépassent le seuil de compression
+        assert len(identite.data) >= compression.taille_min
+        assert "Accept-Encoding" in compresse.headers.get("Vary", "")
+        assert compresse.headers["Content-Encoding"] == "gzip"
+        assert "Content-Encoding" not in identite.headers
+        assert json.loads(gzip.decompress(compresse.data)) == identite.get_json()
+        log_test_result("test_history_gzip", True)
+    except AssertionError:
+        log_test_result("test_history_gzip", False)
+        raise
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import logging
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+import pytest
+from services.fan_out import EN_RETARD, executer_en_parallele, message_erreur
+from services.currency_service import CurrencyService
+
+@pytest.fixture
+def liberer():
+    # Débloque les appels lents à la fin du test pour libérer le pool partagé
+    evenement = threading.Event()
+    yield evenement
+    evenement.set()
+
+def recuperer(liberer):
+    def fonction(cle):
+        if cle == "LENT":
+            liberer.wait(5)
+        if cle == "ECHEC":
+            raise ConnectionError("fournisseur injoignable")
+        if cle == "ERREUR":
+            return {"message": "Réponse API ExchangeRate invalide."}, 502
+        return {"nom": cle}
+    return fonction
+
+class InstantanesMemoire:
+    def __init__(self):
+        self.enregistres = []
+
+    def lire(self, liste, date, champs=None):
+        return None
+
+    def enregistrer(self, liste, date, payload):
+        self.enregistres.append((liste, date, payload))
+
+def test_executer_en_parallele_echeance(liberer):
+    try:
+        cles = ["USD", "LENT", "ECHEC", "EUR"]
+        debut = time.monotonic()
+        resultats = executer_en_parallele(recuperer(liberer), cles, 0.2)
+        assert time.monotonic() - debut < 2
+        # Ordre des clés conservé, quel que soit l'ordre de fin des appels
+        assert [cle for cle, _ in resultats] == cles
+        assert resultats[0] == ("USD", {"nom": "USD"})
+        assert resultats[1] == ("LENT", EN_RETARD)
+        assert resultats[2] == ("ECHEC", None)
+        assert resultats[3] == ("EUR", {"nom": "EUR"})
+        log_test_result("test_executer_en_parallele_echeance", True)
+    except AssertionError:
+        log_test_result("test_executer_en_parallele_echeance", False)
+        raise
+
+def test_message_erreur():
+    try:
+        assert message_erreur(({"message": "Introuvable."}, 404), "défaut") == "Introuvable."
+        assert message_erreur(None, "défaut") == "défaut"
+        assert message_erreur(({}, 502), "défaut") == "défaut"
+        log_test_result("test_message_erreur", True)
+    except AssertionError:
+        log_test_result("test_message_erreur", False)
+        raise
+
+def test_devises_populaires_manquantes(liberer, monkeypatch):
+    try:
+        monkeypatch.setenv("POPULAR_CURRENCIES", "USD,LENT,ECHEC,ERREUR,EUR")
+        monkeypatch.setenv("POPULAR_DEADLINE_SECONDS", "0.2")
+        service = CurrencyService.__new__(CurrencyService)
+        service.instantanes = InstantanesMemoire()
+        service.obtenir_devise = recuperer(liberer)
+        resultats = service.obtenir_devises_populaires()
+        assert [r["nom"] for r in resultats] == ["USD", "LENT", "ECHEC", "ERREUR", "EUR"]
+        assert [r.get("manquant", False) for r in resultats] == [False, True, True, True, False]
+        assert resultats[1]["message"] == "Délai dépassé, devise en cours de récupération."
+        assert resultats[2]["message"] == "Devise indisponible."
+        assert resultats[3]["message"] == "Réponse API ExchangeRate invalide."
+        # Liste incomplète : jamais enregistrée comme instantané du jour
+        assert service.instantanes.enregistres == []
+        log_test_result("test_devises_populaires_manquantes", True)
+    except AssertionError:
+        log_test_result("test_devises_populaires_manquantes", False)
+        raise
@@ -0,0 +1,138 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+import time
+import uuid
+import threading
+import pytest
+from dotenv import load_dotenv
+from repositories.lease_repository import VerrouRepository
+from services.fetch_lease import BailImport
+
+load_dotenv()
+
+@pytest.fixture
+def cle():
+    # Clé propre au test, supprimée à la fin
+    cle = f"test:bail:{uuid.uuid4().hex}"
+    yield cle
+    VerrouRepository().collection.delete_one({"_id": cle})
+
+@pytest.fixture
+def bail():
+    bail = BailImport()
+    bail.attente_max = 0.5
+    bail.intervalle = 0.01
+    return bail
+
+def test_acquerir_bail(cle):
+    try:
+        repo = VerrouRepository()
+        assert repo.acquerir(cle, "worker-a", 60)
+        assert repo.est_actif(cle)
+        # Bail actif : un autre worker ne l'obtient pas
+        assert not repo.acquerir(cle, "worker-b", 60)
+        # Seul le propriétaire peut le libérer
+        repo.liberer(cle, "worker-b")
+        assert repo.est_actif(cle)
+        repo.liberer(cle, "worker-a")
+        assert not repo.est_actif(cle)
+        assert repo.acquerir(cle, "worker-b", 60)
+        log_test_result("test_acquerir_bail", True)
+    except AssertionError:
+        log_test_result("test_acquerir_bail", False)
+        raise
+
+def test_reprise_bail_expire(cle):
+    try:
+        repo = VerrouRepository()
+        assert repo.acquerir(cle, "worker-a", 0.05)
+        time.sleep(0.1)
+        # Expiré mais pas encore purgé par l'index TTL : il peut être repris
+        assert not repo.est_actif(cle)
+        assert repo.acquerir(cle, "worker-b", 60)
+        assert repo.collection.find_one({"_id": cle})["proprietaire"] == "worker-b"
+        # L'ancien propriétaire ne libère plus le bail repris
+        repo.liberer(cle, "worker-a")
+        assert repo.est_actif(cle)
+        log_test_result("test_reprise_bail_expire", True)
+    except AssertionError:
+        log_test_result("test_reprise_bail_expire", False)
+        raise
+
+def test_detenteur_importe_puis_libere(cle, bail):
+    try:
+        importes = []
+        resultat = bail.executer(cle, importer=lambda: importes.append(1) or "importé",
+                                 relire=lambda: None, repli=lambda: "repli")
+        assert resultat == "importé"
+        assert importes == [1]
+        assert not bail.repo.est_actif(cle)
+        # Le détenteur relit d'abord : un import terminé par un autre worker n'est pas refait
+        resultat = bail.executer(cle, importer=lambda: importes.append(2) or "importé",
+                                 relire=lambda: "déjà importé", repli=lambda: "repli")
+        assert resultat == "déjà importé"
+        assert importes == [1]
+        log_test_result("test_detenteur_importe_puis_libere", True)
+    except AssertionError:
+        log_test_result("test_detenteur_importe_puis_libere", False)
+        raise
+
+def test_attente_resultat_du_detenteur(cle, bail):
+    try:
+        # Un autre worker détient le bail ; son résultat apparaît au troisième essai de relecture
+        assert bail.repo.acquerir(cle, "autre-worker", 60)
+        relectures = []
+
+        def relire():
+            relectures.append(1)
+            return "importé par l'autre worker" if len(relectures) >= 3 else None
+
+        resultat = bail.executer(cle, importer=lambda: pytest.fail("seul le détenteur importe"),
+                                 relire=relire, repli=lambda: "repli")
+        assert resultat == "importé par l'autre worker"
+        assert len(relectures) == 3
+        log_test_result("test_attente_resultat_du_detenteur", True)
+    except AssertionError:
+        log_test_result("test_attente_resultat_du_detenteur", False)
+        raise
+
+def test_repli_apres_attente(cle, bail):
+    try:
+        assert bail.repo.acquerir(cle, "autre-worker", 60)
+        debut = time.monotonic()
+        resultat = bail.executer(cle, importer=lambda: pytest.fail("seul le détenteur importe"),
+                                 relire=lambda: None, repli=lambda: "dernier document connu")
+        assert resultat == "dernier document connu"
+        assert time.monotonic() - debut >= bail.attente_max
+        log_test_result("test_repli_apres_attente", True)
+    except AssertionError:
+        log_test_result("test_repli_apres_attente", False)
+        raise
+
+def test_repli_bail_libere_sans_resultat(cle, bail):
+    try:
+        # Le détenteur échoue et libère le bail : le repli est servi sans attendre l'échéance
+        bail.attente_max = 5
+        assert bail.repo.acquerir(cle, "autre-worker", 60)
+        threading.Timer(0.1, bail.repo.liberer, args=(cle, "autre-worker")).start()
+        debut = time.monotonic()
+        resultat = bail.executer(cle, importer=lambda: pytest.fail("seul le détenteur importe"),
+                                 relire=lambda: None, repli=lambda: "dernier document connu")
+        assert resultat == "dernier document connu"
+        assert time.monotonic() - debut < bail.attente_max
+        log_test_result("test_repli_bail_libere_sans_resultat", True)
+    except AssertionError:
+        log_test_result("test_repli_bail_libere_sans_resultat", False)
+        raise
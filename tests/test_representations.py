@@ -0,0 +1,40 @@
+import json
+import math
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+from resources.representations import encoder_json_standard, encoder_json_rapide, orjson
+
+def test_nan_encoded_as_null():
+    try:
+        data = [{"symbole": "AAPL", "close": math.nan, "high": math.inf, "low": 1.5, "volume": 10}]
+        attendu = [{"symbole": "AAPL", "close": None, "high": None, "low": 1.5, "volume": 10}]
+        assert json.loads(encoder_json_standard(data)) == attendu
+        if orjson is not None:
+            assert json.loads(encoder_json_rapide(data)) == attendu
+        log_test_result("test_nan_encoded_as_null", True)
+    except AssertionError:
+        log_test_result("test_nan_encoded_as_null", False)
+        raise
+
+def test_encoders_equivalent():
+    try:
+        data = {"nom": "EUR", "taux": 0.1 + 0.2, "conversion_rates": {"USD": 1.0834, "JPY": 169.52}, "note": "é"}
+        assert json.loads(encoder_json_standard(data)) == data
+        if orjson is not None:
+            assert json.loads(encoder_json_rapide(data)) == data
+        log_test_result("test_encoders_equivalent", True)
+    except AssertionError:
+        log_test_result("test_encoders_equivalent", False)
+        raise
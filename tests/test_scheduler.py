@@ -0,0 +1,84 @@
+import os
+import sys
+import logging
+from datetime import datetime, timedelta, UTC
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+from services.fan_out import get_executeur
+from services.scheduler import PlanificateurRafraichissement
+
+def planificateur_sans_jitter():
+    planificateur = PlanificateurRafraichissement()
+    planificateur.intervalle = 3600
+    planificateur.jitter = 0
+    planificateur.fenetre_bascule = 600
+    planificateur.delai_bascule = 30
+    return planificateur
+
+def test_prochaine_execution_reguliere():
+    try:
+        planificateur = planificateur_sans_jitter()
+        maintenant = datetime(2025, 6, 4, 12, tzinfo=UTC)
+        assert planificateur.calculer_prochaine_execution(maintenant) == (maintenant + timedelta(hours=1), False)
+        # Juste avant la fenêtre de bascule (23:50 - 1 h) : encore une exécution régulière
+        maintenant = datetime(2025, 6, 4, 22, 49, tzinfo=UTC)
+        assert planificateur.calculer_prochaine_execution(maintenant) == (maintenant + timedelta(hours=1), False)
+        log_test_result("test_prochaine_execution_reguliere", True)
+    except AssertionError:
+        log_test_result("test_prochaine_execution_reguliere", False)
+        raise
+
+def test_prochaine_execution_bascule():
+    try:
+        planificateur = planificateur_sans_jitter()
+        # L'exécution régulière tomberait dans la fenêtre : remplacée par le préchauffage
+        assert planificateur.calculer_prochaine_execution(datetime(2025, 6, 4, 22, 50, tzinfo=UTC)) == \
+            (datetime(2025, 6, 5, 0, 0, 30, tzinfo=UTC), True)
+        assert planificateur.calculer_prochaine_execution(datetime(2025, 6, 4, 23, 59, tzinfo=UTC)) == \
+            (datetime(2025, 6, 5, 0, 0, 30, tzinfo=UTC), True)
+        # Changement de mois et d'année
+        assert planificateur.calculer_prochaine_execution(datetime(2025, 12, 31, 23, 30, tzinfo=UTC)) == \
+            (datetime(2026, 1, 1, 0, 0, 30, tzinfo=UTC), True)
+        # Juste après minuit : la bascule suivante est celle du lendemain
+        maintenant = datetime(2025, 6, 5, 0, 0, 30, tzinfo=UTC)
+        assert planificateur.calculer_prochaine_execution(maintenant) == (maintenant + timedelta(hours=1), False)
+        log_test_result("test_prochaine_execution_bascule", True)
+    except AssertionError:
+        log_test_result("test_prochaine_execution_bascule", False)
+        raise
+
+def test_prochaine_execution_jitter():
+    try:
+        planificateur = planificateur_sans_jitter()
+        planificateur.jitter = 120
+        for _ in range(50):
+            maintenant = datetime(2025, 6, 4, 12, tzinfo=UTC)
+            prochaine, est_bascule = planificateur.calculer_prochaine_execution(maintenant)
+            assert not est_bascule
+            assert timedelta(seconds=3480) <= prochaine - maintenant <= timedelta(seconds=3720)
+            prochaine, est_bascule = planificateur.calculer_prochaine_execution(datetime(2025, 6, 4, 23, 55, tzinfo=UTC))
+            assert est_bascule
+            assert datetime(2025, 6, 5, 0, 0, 30, tzinfo=UTC) <= prochaine <= datetime(2025, 6, 5, 0, 2, 30, tzinfo=UTC)
+        log_test_result("test_prochaine_execution_jitter", True)
+    except AssertionError:
+        log_test_result("test_prochaine_execution_jitter", False)
+        raise
+
+def test_pool_dedie():
+    try:
+        planificateur = PlanificateurRafraichissement()
+        assert planificateur._get_executeur() is not get_executeur()
+        assert planificateur._get_executeur() is planificateur._get_executeur()
+        log_test_result("test_pool_dedie", True)
+    except AssertionError:
+        log_test_result("test_pool_dedie", False)
+        raise
@@ -0,0 +1,78 @@
+import math
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+from models.currency import Devise
+from models.stock import Action
+from models.company import Societe
+from models.user import Utilisateur
+from schemas.currency import DeviseSchema
+from schemas.stock import ActionSchema
+from schemas.company import SocieteSchema
+from schemas.user import UtilisateurSchema
+from schemas.serialiseur import compiler
+
+def _equivalent(schema, objets):
+    attendu = schema.dump(objets, many=True)
+    obtenu = compiler(schema).dump(objets, many=True)
+    assert repr(obtenu) == repr(attendu)
+    for objet, ligne in zip(objets, attendu):
+        assert repr(compiler(schema).dump(objet)) == repr(ligne)
+
+def test_action_equivalent():
+    try:
+        _equivalent(ActionSchema(), [
+            Action("AAPL", "2025-06-05", 190.1, 192.5, 189.0, 191.2, 51234567, _id="665f1c"),
+            Action("MSFT", "2025-06-05", "410.5", 412, 405.25, math.nan, 12.0),
+            Action("TSLA", "2025-06-05", None, None, None, None, None),
+        ])
+        log_test_result("test_action_equivalent", True)
+    except AssertionError:
+        log_test_result("test_action_equivalent", False)
+        raise
+
+def test_devise_equivalent():
+    try:
+        _equivalent(DeviseSchema(), [
+            Devise("EUR", 1, "2025-06-07", "EUR", {"USD": 1.0834, "JPY": 169, "XXX": None}, _id="665f1d"),
+            Devise("USD", 1.0, "2025-06-07", "USD", {}),
+        ])
+        log_test_result("test_devise_equivalent", True)
+    except AssertionError:
+        log_test_result("test_devise_equivalent", False)
+        raise
+
+def test_societe_equivalent():
+    try:
+        societe = Societe(
+            symbole="AAPL", date_maj="2025-06-07", companyName="Apple Inc.", price=203.92,
+            marketCap=3045000000000, beta=1.21, range_="169.21-260.1", volume=46607693.0,
+            currency="USD", description="Apple Inc. designs...", defaultImage=False, isEtf=0,
+            isActivelyTrading=True, zip_="95014", _id="665f1e"
+        )
+        _equivalent(SocieteSchema(), [societe, Societe(symbole="MSFT", date_maj="2025-06-07", companyName="Microsoft")])
+        log_test_result("test_societe_equivalent", True)
+    except AssertionError:
+        log_test_result("test_societe_equivalent", False)
+        raise
+
+def test_utilisateur_sans_mot_de_passe():
+    try:
+        utilisateurs = [Utilisateur("a@mail.com", "secret", "A", _id="665f1f"), Utilisateur("b@mail.com", "x", "B")]
+        _equivalent(UtilisateurSchema(), utilisateurs)
+        assert "mot_de_passe" not in compiler(UtilisateurSchema()).dump(utilisateurs[0])
+        log_test_result("test_utilisateur_sans_mot_de_passe", True)
+    except AssertionError:
+        log_test_result("test_utilisateur_sans_mot_de_passe", False)
+        raise
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import logging
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+from services.single_flight import SingleFlight
+
+APPELANTS = 8
+
+def attendre_regroupes(vols, nombre, delai=5):
+    fin = time.monotonic() + delai
+    while vols.statistiques()["regroupes"] < nombre:
+        assert time.monotonic() < fin, "les appelants concurrents ne se sont pas regroupés"
+        time.sleep(0.01)
+
+def lancer(vols, cle, fonction):
+    """
+    Lance APPELANTS appels concurrents ; retourne (threads, résultats, erreurs).
+    """
+    resultats, erreurs = [], []
+
+    def appeler():
+        try:
+            resultats.append(vols.executer(cle, fonction))
+        except Exception as err:
+            erreurs.append(err)
+
+    threads = [threading.Thread(target=appeler) for _ in range(APPELANTS)]
+    for thread in threads:
+        thread.start()
+    return threads, resultats, erreurs
+
+def test_single_flight_shares_result():
+    try:
+        vols = SingleFlight()
+        liberer = threading.Event()
+        appels = []
+
+        def importer():
+            appels.append(threading.current_thread().name)
+            liberer.wait(5)
+            return {"symbole": "AAPL"}
+
+        threads, resultats, erreurs = lancer(vols, ("alphavantage", "AAPL"), importer)
+        attendre_regroupes(vols, APPELANTS - 1)
+        assert vols.statistiques()["en_cours"] == 1
+        liberer.set()
+        for thread in threads:
+            thread.join(5)
+        assert len(appels) == 1
+        assert erreurs == []
+        assert len(resultats) == APPELANTS
+        # Tous les appelants reçoivent le même objet
+        assert all(resultat is resultats[0] for resultat in resultats)
+        assert vols.statistiques() == {"executions": 1, "regroupes": APPELANTS - 1, "en_cours": 0}
+        log_test_result("test_single_flight_shares_result", True)
+    except AssertionError:
+        log_test_result("test_single_flight_shares_result", False)
+        raise
+
+def test_single_flight_shares_exception():
+    try:
+        vols = SingleFlight()
+        liberer = threading.Event()
+        appels = []
+
+        def importer():
+            appels.append(1)
+            liberer.wait(5)
+            raise ConnectionError("fournisseur injoignable")
+
+        threads, resultats, erreurs = lancer(vols, ("fmp", "MSFT"), importer)
+        attendre_regroupes(vols, APPELANTS - 1)
+        liberer.set()
+        for thread in threads:
+            thread.join(5)
+        assert len(appels) == 1
+        assert resultats == []
+        assert len(erreurs) == APPELANTS
+        assert all(isinstance(err, ConnectionError) for err in erreurs)
+        assert vols.statistiques()["en_cours"] == 0
+        log_test_result("test_single_flight_shares_exception", True)
+    except AssertionError:
+        log_test_result("test_single_flight_shares_exception", False)
+        raise
+
+def test_single_flight_releases_key():
+    try:
+        vols = SingleFlight()
+        compteur = []
+
+        def importer():
+            compteur.append(1)
+            return len(compteur)
+
+        # Appels successifs : la clé est libérée, chaque appel exécute la fonction
+        assert vols.executer(("exchangerate", "EUR"), importer) == 1
+        assert vols.executer(("exchangerate", "EUR"), importer) == 2
+
+        def echouer():
+            raise ValueError("réponse invalide")
+
+        try:
+            vols.executer(("exchangerate", "EUR"), echouer)
+            assert False, "l'exception aurait dû être propagée"
+        except ValueError:
+            pass
+        # Après un échec aussi
+        assert vols.executer(("exchangerate", "EUR"), importer) == 3
+        # Des clés différentes ne sont pas regroupées
+        assert vols.executer(("exchangerate", "USD"), importer) == 4
+        assert vols.statistiques() == {"executions": 5, "regroupes": 0, "en_cours": 0}
+        log_test_result("test_single_flight_releases_key", True)
+    except AssertionError:
+        log_test_result("test_single_flight_releases_key", False)
+        raise
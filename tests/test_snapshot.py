@@ -0,0 +1,95 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+import pytest
+from dotenv import load_dotenv
+from repositories.snapshot_repository import InstantaneRepository
+from services.currency_service import CurrencyService
+
+load_dotenv()
+
+LISTE = "test_devises"
+DATE = "2000-01-03"
+
+class ReponseFactice:
+    status_code = 200
+
+    def __init__(self, nom):
+        self.nom = nom
+
+    def json(self):
+        return {"result": "success", "base_code": self.nom, "conversion_rates": {"USD": 1.0},
+                "time_last_update_utc": "Mon, 03 Jan 2000 00:00:01 +0000"}
+
+class ClientFactice:
+    def get(self, url, params=None):
+        return ReponseFactice(url.rsplit("/", 1)[-1])
+
+@pytest.fixture
+def instantanes():
+    repo = InstantaneRepository()
+    yield repo
+    repo.collection.delete_many({"liste": {"$in": [LISTE, "devises"]}, "date": DATE})
+
+@pytest.fixture
+def service(instantanes, monkeypatch):
+    # Devises fictives, absentes des données réelles ; instantanés datés du jour DATE
+    monkeypatch.setenv("POPULAR_CURRENCIES", "ZZA,ZZB")
+    service = CurrencyService()
+    service._get_today_str = lambda: DATE
+    yield service
+    service.repo.collection.delete_many({"nom": {"$in": ["ZZA", "ZZB"]}})
+
+def test_instantane_enregistrer_lire_invalider(instantanes):
+    try:
+        payload = [{"symbole": "AAPL", "close": 1.5, "volume": 10}, {"symbole": "MSFT", "close": 2.5, "volume": 20}]
+        assert instantanes.lire(LISTE, DATE) is None
+        instantanes.enregistrer(LISTE, DATE, payload)
+        assert instantanes.lire(LISTE, DATE) == payload
+        assert instantanes.lire(LISTE, DATE, ["close"]) == [{"close": 1.5}, {"close": 2.5}]
+        instantanes.invalider(LISTE, DATE)
+        assert instantanes.lire(LISTE, DATE) is None
+        log_test_result("test_instantane_enregistrer_lire_invalider", True)
+    except AssertionError:
+        log_test_result("test_instantane_enregistrer_lire_invalider", False)
+        raise
+
+def test_liste_incomplete_non_enregistree(service, instantanes):
+    try:
+        service.obtenir_devise = lambda nom: {"nom": nom} if nom == "ZZA" else ({"message": "Introuvable."}, 404)
+        resultats = service.obtenir_devises_populaires()
+        assert resultats[1] == {"nom": "ZZB", "manquant": True, "message": "Introuvable."}
+        assert instantanes.lire("devises", DATE) is None
+        log_test_result("test_liste_incomplete_non_enregistree", True)
+    except AssertionError:
+        log_test_result("test_liste_incomplete_non_enregistree", False)
+        raise
+
+def test_instantane_supprime_par_nouvelle_donnee(service, instantanes):
+    try:
+        appels = []
+        service.obtenir_devise = lambda nom: appels.append(nom) or {"nom": nom}
+        assert service.obtenir_devises_populaires() == [{"nom": "ZZA"}, {"nom": "ZZB"}]
+        assert instantanes.lire("devises", DATE) == [{"nom": "ZZA"}, {"nom": "ZZB"}]
+        # Liste complète : servie depuis l'instantané, sans nouvel appel
+        assert service.obtenir_devises_populaires() == [{"nom": "ZZA"}, {"nom": "ZZB"}]
+        assert len(appels) == 2
+        # L'import d'une nouvelle devise de la liste supprime l'instantané
+        service.client_amont = ClientFactice()
+        service._telecharger_devise("ZZA")
+        assert instantanes.lire("devises", DATE) is None
+        log_test_result("test_instantane_supprime_par_nouvelle_donnee", True)
+    except AssertionError:
+        log_test_result("test_instantane_supprime_par_nouvelle_donnee", False)
+        raise
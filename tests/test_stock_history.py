@@ -2,6 +2,7 @@ import pytest
 import os
 import sys
 import logging
+import json
 from datetime import datetime, timedelta
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -78,4 +79,31 @@ def test_history_custom_period(client):
         log_test_result("test_history_custom_period", True)
     except AssertionError:
         log_test_result("test_history_custom_period", False)
-        raise
\ No newline at end of file
+        raise
+
+def test_history_columnar_format(client):
+    try:
+        lignes = client.get('/actions/AAPL/historique?jours=7').get_json()
+        response = client.get('/actions/AAPL/historique?jours=7&format=colonnes')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["symbole"] == "AAPL"
+        for champ in ("date", "open", "high", "low", "close", "volume"):
+            assert [ligne[champ] for ligne in lignes] == data[champ]
+        log_test_result("test_history_columnar_format", True)
+    except AssertionError:
+        log_test_result("test_history_columnar_format", False)
+        raise
+
+def test_history_ndjson_stream(client):
+    try:
+        lignes = client.get('/actions/AAPL/historique?jours=7').get_json()
+        response = client.get('/actions/AAPL/historique?jours=7', headers={"Accept": "application/x-ndjson"})
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        flux = [json.loads(ligne) for ligne in response.get_data(as_text=True).splitlines()]
+        assert flux == lignes
+        log_test_result("test_history_ndjson_stream", True)
+    except AssertionError:
+        log_test_result("test_history_ndjson_stream", False)
+        raise
@@ -0,0 +1,68 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+import pytest
+from dotenv import load_dotenv
+from models.stock import Action
+from repositories.stock_repository import StockRepository
+
+load_dotenv()
+
+SYMBOLE = "ZZDERNIERE"
+
+def barre(date, close):
+    return Action(symbole=SYMBOLE, date=date, open=close, high=close, low=close, close=close, volume=100)
+
+@pytest.fixture
+def repo():
+    repo = StockRepository()
+    yield repo
+    repo.dernieres.delete_one({"_id": SYMBOLE})
+    repo.collection.delete_many({"symbole": SYMBOLE})
+
+def test_derniere_ne_fait_qu_avancer(repo):
+    try:
+        repo.creer(barre("2025-06-05", 1.0))
+        assert repo.chercher_derniere(SYMBOLE).date == "2025-06-05"
+        plus_recente = repo.creer(barre("2025-06-06", 2.0))
+        derniere = repo.chercher_derniere(SYMBOLE)
+        assert (derniere.date, derniere.close, derniere.id) == ("2025-06-06", 2.0, plus_recente.id)
+        # Une barre plus ancienne (comblement) ne remplace pas la plus récente
+        repo.creer(barre("2025-06-03", 3.0))
+        repo.creer_plusieurs([barre("2025-06-02", 4.0), barre("2025-06-04", 5.0)])
+        derniere = repo.chercher_derniere(SYMBOLE)
+        assert (derniere.date, derniere.close) == ("2025-06-06", 2.0)
+        # Un lot avance jusqu'à sa barre la plus récente
+        repo.creer_plusieurs([barre("2025-06-10", 6.0), barre("2025-06-09", 7.0)])
+        assert repo.chercher_derniere(SYMBOLE).date == "2025-06-10"
+        log_test_result("test_derniere_ne_fait_qu_avancer", True)
+    except AssertionError:
+        log_test_result("test_derniere_ne_fait_qu_avancer", False)
+        raise
+
+def test_derniere_reconstruite_depuis_historique(repo):
+    try:
+        repo.creer_plusieurs([barre("2025-06-05", 1.0), barre("2025-06-06", 2.0)])
+        # Symbole importé avant l'ajout de la collection : pas encore de dernière cotation
+        repo.dernieres.delete_one({"_id": SYMBOLE})
+        derniere = repo.chercher_derniere(SYMBOLE)
+        assert (derniere.date, derniere.close) == ("2025-06-06", 2.0)
+        # Matérialisée à la première lecture
+        assert repo.dernieres.find_one({"_id": SYMBOLE})["date"] == "2025-06-06"
+        assert repo.chercher_derniere(SYMBOLE).id == derniere.id
+        assert repo.chercher_derniere("ZZINCONNU") is None
+        log_test_result("test_derniere_reconstruite_depuis_historique", True)
+    except AssertionError:
+        log_test_result("test_derniere_reconstruite_depuis_historique", False)
+        raise
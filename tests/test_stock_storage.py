@@ -0,0 +1,142 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+import pytest
+from datetime import date, timedelta
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
+from repositories.database import get_client
+from repositories.indexes import INDEX
+from repositories.stock_storage import (
+    StockageDocuments, StockageMensuel, aplatir, cle_mensuelle, projeter, stockage_actions
+)
+
+load_dotenv()
+
+def test_aplatir_document_mensuel():
+    try:
+        id_5, id_6 = ObjectId(), ObjectId()
+        bucket = {"_id": "AAPL:2025-06", "symbole": "AAPL", "mois": "2025-06", "jours": {
+            "06": {"_id": id_6, "open": 2.0, "high": 3.0, "low": 1.0, "close": 2.5, "volume": 20},
+            "05": {"_id": id_5, "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10},
+        }}
+        docs = aplatir(bucket)
+        assert [d["date"] for d in docs] == ["2025-06-05", "2025-06-06"]
+        assert docs[0] == {"_id": id_5, "symbole": "AAPL", "date": "2025-06-05",
+                           "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10}
+        assert [d["_id"] for d in aplatir(bucket, {"2025-06-06"})] == [id_6]
+        assert cle_mensuelle("AAPL", "2025-06-05") == "AAPL:2025-06"
+        log_test_result("test_aplatir_document_mensuel", True)
+    except AssertionError:
+        log_test_result("test_aplatir_document_mensuel", False)
+        raise
+
+def test_ecriture_si_jour_absent():
+    try:
+        _id = ObjectId()
+        data = {"_id": _id, "symbole": "AAPL", "date": "2025-06-05", "open": 1.0, "high": 2.0,
+                "low": 0.5, "close": 1.5, "volume": 10}
+        id_barre, filtre, modification = StockageMensuel._ecriture(data)
+        assert id_barre == _id
+        assert filtre == {"_id": "AAPL:2025-06", "jours.05": {"$exists": False}}
+        assert modification["$set"]["jours.05"]["close"] == 1.5
+        assert modification["$setOnInsert"] == {"symbole": "AAPL", "mois": "2025-06"}
+        log_test_result("test_ecriture_si_jour_absent", True)
+    except AssertionError:
+        log_test_result("test_ecriture_si_jour_absent", False)
+        raise
+
+def test_mode_stockage_inconnu():
+    try:
+        with pytest.raises(ValueError):
+            stockage_actions({}, "hebdomadaire")
+        log_test_result("test_mode_stockage_inconnu", True)
+    except AssertionError:
+        log_test_result("test_mode_stockage_inconnu", False)
+        raise
+
+def _barres(debut, fin, symbole="AAPL"):
+    jours = [debut + timedelta(days=i) for i in range((fin - debut).days + 1)]
+    return [
+        {"_id": ObjectId(), "symbole": symbole, "date": j.isoformat(), "open": 1.0 + i, "high": 2.0 + i,
+         "low": 0.5 + i, "close": 1.5 + i, "volume": 1000 + i}
+        for i, j in enumerate(jours) if j.weekday() < 5
+    ]
+
+@pytest.fixture
+def stockages():
+    # Base temporaire sur le serveur configuré, supprimée après le test
+    client = get_client()
+    nom = f"{os.getenv('MONGODB_DBNAME', 'webcur')}_test_stockage"
+    client.drop_database(nom)
+    db = client[nom]
+    for nom_collection, cles, unique in INDEX:
+        if nom_collection.startswith("actions"):
+            db[nom_collection].create_index(cles, unique=unique)
+    yield StockageDocuments(db), StockageMensuel(db)
+    client.drop_database(nom)
+
+def test_stockages_equivalents(stockages):
+    try:
+        documents, mensuel = stockages
+        barres = _barres(date(2025, 4, 28), date(2025, 6, 13)) + _barres(date(2025, 5, 1), date(2025, 5, 9), "MSFT")
+        ids = [b["_id"] for b in barres]
+        for stockage in stockages:
+            assert stockage.inserer_plusieurs([dict(b) for b in barres]) == ids
+
+        # Doublons : identifiant None pour les dates déjà présentes, dans les deux modes
+        suite = [dict(b) for b in barres[-3:]] + _barres(date(2025, 6, 16), date(2025, 6, 17))
+        attendu = [None, None, None] + [b["_id"] for b in suite[3:]]
+        for stockage in stockages:
+            assert stockage.inserer_plusieurs([dict(b) for b in suite]) == attendu
+
+        projection = {"_id": 0, "date": 1, "open": 1, "high": 1, "low": 1, "close": 1, "volume": 1}
+        dates = ["2025-04-30", "2025-05-01", "2025-05-03", "2025-06-02", "2025-06-17", "2025-07-01"]
+        for lire in (
+            lambda s: list(s.iterer_periode("AAPL", "2025-04-30", "2025-06-02")),
+            lambda s: list(s.iterer_periode("AAPL", "2025-05-10", "2025-05-11")),
+            lambda s: list(s.iterer_periode("AAPL", "2025-05-02", "2025-06-05", projection)),
+            lambda s: list(s.iterer_dates("AAPL", dates)),
+            lambda s: list(s.iterer_dates("AAPL", dates, projection)),
+            lambda s: sorted(s.dates("AAPL")),
+            lambda s: sorted(s.dates("MSFT", dates)),
+            lambda s: s.derniere_avant("AAPL"),
+            lambda s: s.derniere_avant("AAPL", "2025-05-31"),
+            lambda s: s.derniere_avant("AAPL", "2025-06-01"),
+            lambda s: s.derniere_avant("AAPL", "2025-01-01"),
+            lambda s: s.chercher("AAPL", "2025-05-15"),
+            lambda s: s.chercher("AAPL", "2025-05-17"),
+        ):
+            assert lire(mensuel) == lire(documents)
+        assert documents.derniere_avant("AAPL", "2025-06-01")["date"] == "2025-05-30"
+
+        for stockage in stockages:
+            with pytest.raises(DuplicateKeyError):
+                stockage.inserer(dict(barres[0]))
+        log_test_result("test_stockages_equivalents", True)
+    except AssertionError:
+        log_test_result("test_stockages_equivalents", False)
+        raise
+
+def test_projeter():
+    try:
+        doc = {"_id": 1, "symbole": "AAPL", "date": "2025-06-05", "close": 1.5}
+        assert projeter(doc, None) == doc
+        assert projeter(doc, {"_id": 0, "date": 1, "close": 1}) == {"date": "2025-06-05", "close": 1.5}
+        assert projeter(doc, {"close": 1}) == {"_id": 1, "close": 1.5}
+        log_test_result("test_projeter", True)
+    except AssertionError:
+        log_test_result("test_projeter", False)
+        raise
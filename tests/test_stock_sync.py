@@ -0,0 +1,134 @@
+import os
+import sys
+import logging
+from datetime import date, datetime, timedelta, UTC
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+from services.stock_service import (
+    StockService, completion_inutile, date_a_completer, derniere_seance_possible, synchro_en_attente, synchro_inutile,
+    taille_sortie
+)
+from services.fetch_lease import BailImport
+
+class DepotSynchro:
+    def __init__(self, etat):
+        self.etat = etat
+
+    def lire_synchro(self, symbole):
+        return self.etat
+
+class VerrouLibre:
+    def acquerir(self, cle, proprietaire, duree_secondes):
+        self.cle = cle
+        return True
+
+    def liberer(self, cle, proprietaire):
+        pass
+
+    def est_actif(self, cle):
+        return False
+
+def test_derniere_seance_possible():
+    try:
+        assert derniere_seance_possible(date(2025, 6, 4)) == "2025-06-04"  # mercredi
+        assert derniere_seance_possible(date(2025, 6, 7)) == "2025-06-06"  # samedi
+        assert derniere_seance_possible(date(2025, 6, 8)) == "2025-06-06"  # dimanche
+        log_test_result("test_derniere_seance_possible", True)
+    except AssertionError:
+        log_test_result("test_derniere_seance_possible", False)
+        raise
+
+def test_synchro_inutile():
+    try:
+        samedi = datetime(2025, 6, 7, 12, tzinfo=UTC)
+        assert synchro_inutile({"derniere_date": "2025-06-06", "resultat": "erreur"}, samedi, 3600)
+        assert not synchro_inutile(None, samedi, 3600)
+        mercredi = datetime(2025, 6, 4, 12, tzinfo=UTC)
+        recente = {"derniere_date": "2025-06-03", "resultat": "ok",
+                   "recupere_le": (mercredi - timedelta(minutes=10)).replace(tzinfo=None)}
+        assert synchro_inutile(recente, mercredi, 3600)
+        assert not synchro_inutile({**recente, "resultat": "erreur"}, mercredi, 3600)
+        assert not synchro_inutile(recente, mercredi + timedelta(hours=2), 3600)
+        log_test_result("test_synchro_inutile", True)
+    except AssertionError:
+        log_test_result("test_synchro_inutile", False)
+        raise
+
+def test_synchro_en_attente_apres_erreur():
+    try:
+        maintenant = datetime(2025, 6, 4, 12, tzinfo=UTC)
+        erreur = {"derniere_date": "2025-06-03", "resultat": "erreur",
+                  "recupere_le": (maintenant - timedelta(minutes=2)).replace(tzinfo=None)}
+        assert synchro_en_attente(erreur, maintenant, 300)
+        assert not synchro_en_attente(erreur, maintenant + timedelta(minutes=10), 300)
+        assert not synchro_en_attente({**erreur, "resultat": "ok"}, maintenant, 300)
+        assert not synchro_en_attente(None, maintenant, 300)
+        log_test_result("test_synchro_en_attente_apres_erreur", True)
+    except AssertionError:
+        log_test_result("test_synchro_en_attente_apres_erreur", False)
+        raise
+
+def test_taille_sortie():
+    try:
+        assert taille_sortie("2025-06-03", date(2025, 6, 7)) == "compact"
+        assert taille_sortie("2024-01-02", date(2025, 6, 7)) == "full"
+        assert taille_sortie(None, date(2025, 6, 7)) == os.getenv("ALPHAVANTAGE_INITIAL_OUTPUT_SIZE", "compact")
+        log_test_result("test_taille_sortie", True)
+    except AssertionError:
+        log_test_result("test_taille_sortie", False)
+        raise
+
+def test_completion_date_manquante():
+    try:
+        assert date_a_completer("2025-05-14", "2025-06-06") == "2025-05-14"
+        assert date_a_completer("2025-05-17", "2025-06-06") is None  # samedi
+        assert date_a_completer("2025-06-09", "2025-06-06") is None  # après le filigrane
+        assert date_a_completer("INVALID_DATE", "2025-06-06") is None
+        assert date_a_completer("2025-05-14", None) is None
+        maintenant = datetime(2025, 6, 7, 12, tzinfo=UTC)
+        etat = {"derniere_date": "2025-06-06", "resultat": "ok", "analyse_apres": "2025-06-05",
+                "recupere_le": (maintenant - timedelta(minutes=5)).replace(tzinfo=None)}
+        assert not completion_inutile(etat, "2025-05-14", maintenant, 3600)
+        assert completion_inutile({**etat, "analyse_apres": "2025-05-13"}, "2025-05-14", maintenant, 3600)
+        assert not completion_inutile({**etat, "analyse_apres": "2025-05-13"}, "2025-05-14",
+                                      maintenant + timedelta(hours=2), 3600)
+        log_test_result("test_completion_date_manquante", True)
+    except AssertionError:
+        log_test_result("test_completion_date_manquante", False)
+        raise
+
+def test_completion_apres_synchro_recente():
+    try:
+        # Une synchronisation ordinaire vient de se terminer (réponse analysée après le filigrane)
+        etat = {"derniere_date": "2025-06-06", "resultat": "ok", "analyse_apres": "2025-06-05",
+                "recupere_le": datetime.now(UTC).replace(tzinfo=None)}
+        service = StockService.__new__(StockService)
+        service.repo = DepotSynchro(etat)
+        service.bail = BailImport.__new__(BailImport)
+        service.bail.repo, service.bail.duree = VerrouLibre(), 60
+        importes = []
+        service._importer_series = lambda symbole, date=None: importes.append(date) or True
+        # La synchronisation ordinaire est reconnue comme terminée...
+        assert service._importer_series_avec_bail("AAPL") is True
+        assert importes == []
+        # ...mais pas comme un comblement de la date manquante, qui est donc importée
+        assert service._importer_series_avec_bail("AAPL", "2025-05-14") is True
+        assert importes == ["2025-05-14"]
+        assert service.bail.repo.cle.endswith(":2025-05-14")
+        # Un comblement terminé à partir de cette date suffit
+        etat["analyse_apres"] = "2025-05-13"
+        assert service._importer_series_avec_bail("AAPL", "2025-05-14") is True
+        assert importes == ["2025-05-14"]
+        log_test_result("test_completion_apres_synchro_recente", True)
+    except AssertionError:
+        log_test_result("test_completion_apres_synchro_recente", False)
+        raise
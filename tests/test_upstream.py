@@ -0,0 +1,134 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logging_config import setup_logging
+setup_logging('test_results.log')
+
+def log_test_result(test_name, result):
+    if result:
+        logging.info(f"{test_name}: PASSED")
+    else:
+        logging.error(f"{test_name}: FAILED")
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+import services.upstream as upstream
+from services.upstream import ClientAmont, STATUTS_A_REESSAYER
+
+class TransportFactice(BaseAdapter):
+    """
+    Adaptateur monté sur la session : rejoue une suite de statuts HTTP (ou d'exceptions réseau).
+    """
+
+    def __init__(self, reponses):
+        super().__init__()
+        self.reponses = list(reponses)
+        self.appels = 0
+
+    def send(self, request, **kwargs):
+        self.appels += 1
+        suivante = self.reponses.pop(0) if len(self.reponses) > 1 else self.reponses[0]
+        if isinstance(suivante, Exception):
+            raise suivante
+        reponse = requests.Response()
+        reponse.status_code = suivante
+        reponse.url = request.url
+        reponse.request = request
+        reponse._content = b"{}"
+        return reponse
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def attentes(monkeypatch):
+    # Pas de vraie attente : le plafond de chaque backoff est enregistré
+    plafonds = []
+    monkeypatch.setattr(upstream.random, "uniform", lambda bas, haut: plafonds.append(haut) or haut)
+    monkeypatch.setattr(upstream.time, "sleep", lambda secondes: None)
+    return plafonds
+
+def client_factice(reponses, tentatives_max=2, backoff_base=0.5, backoff_max=4.0):
+    client = ClientAmont("test")
+    client.tentatives_max, client.backoff_base, client.backoff_max = tentatives_max, backoff_base, backoff_max
+    transport = TransportFactice(reponses)
+    client.session.mount("https://", transport)
+    return client, transport
+
+def test_succes_sans_nouvelle_tentative(attentes):
+    try:
+        client, transport = client_factice([200])
+        reponse = client.get("https://api.test/quote", params={"symbol": "AAPL"})
+        assert reponse.status_code == 200
+        assert transport.appels == 1
+        assert attentes == []
+        stats = client.statistiques()
+        assert (stats["requetes"], stats["succes"], stats["erreurs"], stats["nouvelles_tentatives"]) == (1, 1, 0, 0)
+        log_test_result("test_succes_sans_nouvelle_tentative", True)
+    except AssertionError:
+        log_test_result("test_succes_sans_nouvelle_tentative", False)
+        raise
+
+def test_nouvelles_tentatives_puis_succes(attentes):
+    try:
+        client, transport = client_factice([503, 429, 200])
+        reponse = client.get("https://api.test/quote")
+        assert reponse.status_code == 200
+        assert transport.appels == 3
+        assert attentes == [0.5, 1.0]
+        stats = client.statistiques()
+        assert (stats["requetes"], stats["succes"], stats["erreurs"], stats["nouvelles_tentatives"]) == (1, 1, 0, 2)
+        log_test_result("test_nouvelles_tentatives_puis_succes", True)
+    except AssertionError:
+        log_test_result("test_nouvelles_tentatives_puis_succes", False)
+        raise
+
+def test_nombre_de_tentatives_borne(attentes):
+    try:
+        client, transport = client_factice([500], tentatives_max=5, backoff_base=1.0, backoff_max=4.0)
+        reponse = client.get("https://api.test/quote")
+        # La dernière réponse en erreur est retournée après 1 + tentatives_max appels
+        assert reponse.status_code == 500
+        assert transport.appels == 6
+        # Backoff exponentiel plafonné à backoff_max
+        assert attentes == [1.0, 2.0, 4.0, 4.0, 4.0]
+        stats = client.statistiques()
+        assert (stats["requetes"], stats["erreurs"], stats["erreurs_http"], stats["nouvelles_tentatives"]) == (1, 1, 1, 5)
+        log_test_result("test_nombre_de_tentatives_borne", True)
+    except AssertionError:
+        log_test_result("test_nombre_de_tentatives_borne", False)
+        raise
+
+def test_statut_non_reessaye(attentes):
+    try:
+        assert STATUTS_A_REESSAYER == {429, 500, 502, 503, 504}
+        for statut in (400, 401, 404):
+            client, transport = client_factice([statut, 200])
+            assert client.get("https://api.test/quote").status_code == statut
+            assert transport.appels == 1
+            assert client.statistiques()["erreurs_http"] == 1
+        assert attentes == []
+        log_test_result("test_statut_non_reessaye", True)
+    except AssertionError:
+        log_test_result("test_statut_non_reessaye", False)
+        raise
+
+def test_erreur_reseau(attentes):
+    try:
+        client, transport = client_factice([requests.ConnectionError("refusée"), requests.Timeout("lecture")])
+        assert client.get("https://api.test/quote") is None
+        assert transport.appels == 3
+        stats = client.statistiques()
+        assert (stats["requetes"], stats["erreurs"], stats["erreurs_reseau"], stats["nouvelles_tentatives"]) == (1, 1, 1, 2)
+        # Erreur réseau puis réponse : seule l'issue finale est comptée
+        client, transport = client_factice([requests.ConnectionError("refusée"), 200])
+        assert client.get("https://api.test/quote").status_code == 200
+        stats = client.statistiques()
+        assert (stats["succes"], stats["erreurs_reseau"], stats["nouvelles_tentatives"]) == (1, 0, 1)
+        log_test_result("test_erreur_reseau", True)
+    except AssertionError:
+        log_test_result("test_erreur_reseau", False)
+        raise
@@ -36,8 +36,12 @@ def cleanup_users():
         "testuser@mail.com",
         "authuser@mail.com",
         "updateuser@mail.com",
+        "updateuser2@mail.com",
         "loginuser@mail.com",
-        "deleteuser@mail.com"
+        "deleteuser@mail.com",
+        "pageuser1@mail.com",
+        "pageuser2@mail.com",
+        "pageuser3@mail.com"
     ]
     for email in test_emails:
         repo.supprimer_par_email(email)
@@ -92,6 +96,38 @@ def test_get_users(client):
         log_test_result("test_get_users", False)
         raise
 
+def test_get_users_paginated(client):
+    try:
+        for i in (1, 2, 3):
+            client.post('/utilisateurs', json={
+                "email": f"pageuser{i}@mail.com",
+                "mot_de_passe": "pagepass",
+                "nom_utilisateur": f"PageUser{i}"
+            })
+        vus = []
+        apres = None
+        while True:
+            url = '/utilisateurs?limit=2&total=true' + (f'&after={apres}' if apres else '')
+            response = client.get(url)
+            assert response.status_code == 200
+            page = response.get_json()
+            assert len(page) <= 2
+            assert all("mot_de_passe" not in u for u in page)
+            assert int(response.headers["X-Total-Count"]) >= 3
+            vus += [u["id"] for u in page]
+            apres = response.headers.get("X-Next-Cursor")
+            if not apres:
+                break
+        assert vus == sorted(vus)
+        assert len(vus) == len(set(vus))
+        emails = {u["email"] for u in client.get('/utilisateurs?limit=1000').get_json()}
+        assert {"pageuser1@mail.com", "pageuser2@mail.com", "pageuser3@mail.com"} <= emails
+        assert client.get('/utilisateurs?after=invalide').status_code == 400
+        log_test_result("test_get_users_paginated", True)
+    except AssertionError:
+        log_test_result("test_get_users_paginated", False)
+        raise
+
 # Tests pour les opérations CRUD sur un utilisateur spécifique
 def test_update_user(client):
     try:
@@ -113,6 +149,32 @@ def test_update_user(client):
         log_test_result("test_update_user", False)
         raise
 
+def test_update_user_duplicate_email(client):
+    try:
+        client.post('/utilisateurs', json={
+            "email": "updateuser2@mail.com",
+            "mot_de_passe": "updatepass",
+            "nom_utilisateur": "UpdateUser2"
+        })
+        res = client.post('/utilisateurs', json={
+            "email": "updateuser@mail.com",
+            "mot_de_passe": "updatepass",
+            "nom_utilisateur": "UpdateUser"
+        })
+        user_id = res.get_json()["id"]
+        token = get_jwt_token(client, "updateuser@mail.com", "updatepass")
+        response = client.put(
+            f'/utilisateurs/{user_id}',
+            json={"email": "updateuser2@mail.com"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 409
+        assert response.get_json()["message"] == "Un utilisateur avec cet email existe déjà."
+        log_test_result("test_update_user_duplicate_email", True)
+    except AssertionError:
+        log_test_result("test_update_user_duplicate_email", False)
+        raise
+
 # Tests pour la suppression d'un utilisateur
 def test_delete_user(client):
     try: